@@ -0,0 +1,287 @@
+"""
+AI分析结果缓存
+
+职位描述和简历都没有变化时，AI匹配分析的结果也不会变化。此模块按
+职位描述哈希 + 简历哈希 + 模型 + 提示词版本缓存分析结果并持久化到
+data/ai_cache.json，定时任务再次遇到同一职位时不再调用模型。
+
+- 条目超过有效期后失效
+- 条目数超过上限时淘汰最久未使用的条目
+- 简历变化后，基于旧简历的条目全部清除
+- 写入先保存在内存中，累计一定条数或运行结束时调用 save() 才写文件；写文件时在文件锁内
+  合并其他进程写入的条目，多个平台在不同进程中运行时不会互相覆盖
+
+打招呼语使用另一个实例，保存在 data/greeting_cache.json。
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from config import AI_CACHE_CONFIG, GREETING_CACHE_CONFIG
+from utils import file_lock
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.path.join("data", "ai_cache.json")
+GREETING_CACHE_PATH = os.path.join("data", "greeting_cache.json")
+
+def content_hash(text):
+    """
+    计算文本哈希
+
+    Args:
+        text: 文本
+
+    Returns:
+        str: 十六进制哈希
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+class AICache:
+    """
+    持久化的AI结果缓存
+
+    Args:
+        path: 缓存文件路径
+        ttl_hours: 条目有效期（小时）
+        max_entries: 最多保留的条目数
+        enabled: 为False时不读取也不写入
+        flush_every: 累计多少条未保存的写入后自动保存
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_hours=168, max_entries=5000, enabled=True, flush_every=100):
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self.profile_hash = None
+        self._entries = OrderedDict()
+        self._unsaved = 0
+        self.stats = {"hits": 0, "misses": 0}
+        if enabled:
+            self._load()
+
+    def _read(self):
+        """读取缓存文件"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"加载AI结果缓存失败: {e}")
+            return None
+
+    def _load(self):
+        """加载缓存文件，文件中的条目按最近使用顺序排列"""
+        data = self._read()
+        if data is None:
+            return
+        self.profile_hash = data.get("profile_hash")
+        self._entries = OrderedDict(data.get("entries", []))
+        logger.info(f"加载AI结果缓存，共 {len(self._entries)} 条")
+
+    def _merge(self):
+        """合并文件中其他进程写入、本进程没有的条目，调用方需持有锁和文件锁"""
+        data = self._read()
+        if data is None or data.get("profile_hash") != self.profile_hash:
+            return
+        now = datetime.now()
+        merged = OrderedDict()
+        for key, entry in data.get("entries", []):
+            if key in self._entries:
+                continue
+            created_at = datetime.strptime(entry["created_at"], "%Y-%m-%d %H:%M:%S")
+            if now - created_at <= self.ttl:
+                merged[key] = entry
+        if not merged:
+            return
+        # 其他进程的条目视为较早使用过，排在本进程条目之前，超过上限时先被淘汰
+        merged.update(self._entries)
+        self._entries = merged
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        """在文件锁内合并其他进程的条目后保存缓存，调用方需持有锁"""
+        try:
+            with file_lock(os.path.basename(self.path)):
+                self._merge()
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({
+                        "profile_hash": self.profile_hash,
+                        "entries": list(self._entries.items()),
+                    }, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            self._unsaved = 0
+        except Exception as e:
+            logger.error(f"保存AI结果缓存失败: {e}")
+
+    def save(self):
+        """保存尚未写入文件的条目，没有新条目时不写文件"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _check_profile(self, profile_hash):
+        """简历变化时清除基于旧简历的条目，调用方需持有锁"""
+        if profile_hash == self.profile_hash:
+            return
+        stale = [key for key, entry in self._entries.items() if entry["profile_hash"] != profile_hash]
+        for key in stale:
+            del self._entries[key]
+        if self.profile_hash is not None:
+            logger.info(f"简历已变化，清除 {len(stale)} 条AI结果缓存")
+        self.profile_hash = profile_hash
+        if stale:
+            self._unsaved += 1
+
+    @staticmethod
+    def make_key(kind, content, profile_hash, model, version):
+        """
+        生成缓存键
+
+        Args:
+            kind: 结果类型，如 "relevance"
+            content: 职位内容文本
+            profile_hash: 简历哈希
+            model: 模型名称
+            version: 提示词版本
+
+        Returns:
+            str: 缓存键
+        """
+        return AICache.make_key_for_hash(kind, content_hash(content), profile_hash, model, version)
+
+    @staticmethod
+    def make_key_for_hash(kind, digest, profile_hash, model, version):
+        """
+        由内容哈希生成缓存键，与 make_key 对同一内容生成的键相同
+
+        Args:
+            kind: 结果类型
+            digest: 内容的 content_hash
+            profile_hash: 简历哈希
+            model: 模型名称
+            version: 提示词版本
+
+        Returns:
+            str: 缓存键
+        """
+        return content_hash(f"{kind}|{model}|{version}|{profile_hash}|{digest}")
+
+    def get(self, key, profile_hash, count=True):
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            profile_hash: 当前简历哈希
+            count: 是否计入命中率，查找近似重复职位等试探性读取时传False
+
+        Returns:
+            dict: 缓存的结果，未命中或已过期时返回None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._check_profile(profile_hash)
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at = datetime.strptime(entry["created_at"], "%Y-%m-%d %H:%M:%S")
+                if datetime.now() - created_at > self.ttl:
+                    del self._entries[key]
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+
+            if count:
+                self.stats["hits" if entry is not None else "misses"] += 1
+            return None if entry is None else entry["result"]
+
+    def put(self, key, profile_hash, result):
+        """
+        写入缓存，超过条目上限时淘汰最久未使用的条目；累计 flush_every 条后保存一次
+
+        Args:
+            key: 缓存键
+            profile_hash: 当前简历哈希
+            result: 结果
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._check_profile(profile_hash)
+            self._entries[key] = {
+                "result": result,
+                "profile_hash": profile_hash,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            if self._unsaved >= self.flush_every:
+                self._save()
+
+    def hit_rate(self):
+        """本进程的缓存命中率"""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def log_stats(self, name):
+        """
+        输出本进程的命中情况，没有查询过时不输出
+
+        Args:
+            name: 缓存名称，用于日志
+        """
+        total = self.stats["hits"] + self.stats["misses"]
+        if total:
+            logger.info(f"{name}命中 {self.stats['hits']}/{total}，命中率 {self.hit_rate():.0%}")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_ai_cache():
+    """获取进程内共享的AI结果缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AICache(
+                ttl_hours=AI_CACHE_CONFIG["ttl_hours"],
+                max_entries=AI_CACHE_CONFIG["max_entries"],
+                enabled=AI_CACHE_CONFIG["enabled"],
+            )
+        return _cache
+
+_greeting_cache = None
+
+def get_greeting_cache():
+    """获取进程内共享的打招呼语缓存"""
+    global _greeting_cache
+    with _cache_lock:
+        if _greeting_cache is None:
+            _greeting_cache = AICache(
+                path=GREETING_CACHE_PATH,
+                ttl_hours=GREETING_CACHE_CONFIG["ttl_hours"],
+                max_entries=GREETING_CACHE_CONFIG["max_entries"],
+                enabled=GREETING_CACHE_CONFIG["enabled"],
+            )
+        return _greeting_cache
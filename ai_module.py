@@ -1,6 +1,15 @@
+import json
+import asyncio
 import logging
 import openai
-from config import AI_CONFIG, USER_PREFERENCES
+from config import AI_CONFIG, USER_PREFERENCES, PRERANK_CONFIG, EMBEDDING_CONFIG
+from text_normalizer import job_text, title_cluster
+from ai_cache import get_ai_cache, get_greeting_cache, content_hash
+from rate_limiter import TokenRateLimiter
+from tfidf_ranker import get_ranker
+from embedding_index import get_embedding_index
+from llm_metrics import get_llm_metrics
+from prompt_builder import count_tokens, job_prompt_text, profile_prompt_text, compact_prompt
 
 # 设置日志
 logging.basicConfig(level=logging.INFO)
@@ -8,29 +17,52 @@ logger = logging.getLogger(__name__)
 
 # 配置OpenAI API
 openai.api_key = AI_CONFIG["openai_api_key"]
+if AI_CONFIG["base_url"]:
+    # 模块级客户端直接拼接路径，地址需以 / 结尾
+    openai.base_url = AI_CONFIG["base_url"].rstrip("/") + "/"
 
-def analyze_job_relevance(job_description, user_profile):
+# 提示词版本，修改匹配分析提示词或输出格式后递增，使旧的缓存结果失效
+RELEVANCE_PROMPT_VERSION = 2
+
+# 打招呼语提示词版本，修改后递增，使缓存的打招呼语失效
+GREETING_PROMPT_VERSION = 2
+
+# 缓存的打招呼语中职位名称和公司名称的占位符，复用时填入当前职位的名称
+TITLE_SLOT = "{{职位名称}}"
+COMPANY_SLOT = "{{公司名称}}"
+
+# 分析失败时返回的默认结果
+DEFAULT_RELEVANCE = {
+    "total_score": 50,
+    "skill_score": 50,
+    "experience_score": 50,
+    "education_score": 50,
+    "industry_score": 50,
+    "analysis": "AI分析失败，无法提供详细匹配信息。",
+    "recommendation": False
+}
+
+_token_limiter = TokenRateLimiter(AI_CONFIG["tokens_per_minute"], AI_CONFIG["requests_per_minute"])
+
+def _relevance_messages(job_description, user_profile):
     """
-    分析职位与用户背景的匹配度
+    构建单个职位匹配分析的消息
     
     参数:
     - job_description: 职位描述文本
     - user_profile: 用户简历和技能信息
     
     返回:
-    - score: 0-100的匹配分数
-    - analysis: 匹配分析结果
+    - messages: 对话消息列表
     """
-    try:
-        # 构建提示词
-        prompt = f"""
+    prompt = f"""
         你是一位专业的职业顾问，请分析以下职位描述与求职者背景的匹配程度。
         
         ## 职位描述
-        {job_description}
+        {job_prompt_text(job_description)}
         
         ## 求职者背景
-        {user_profile}
+        {profile_prompt_text(user_profile)}
         
         ## 评分标准
         请基于以下因素给出0-100的匹配分数:
@@ -49,40 +81,481 @@ def analyze_job_relevance(job_description, user_profile):
         - analysis: 匹配分析(不超过200字)
         - recommendation: 是否推荐投递(true/false)
         """
+    return [
+        {"role": "system", "content": "你是一位专业的职业顾问，负责分析职位与求职者的匹配度。"},
+        {"role": "user", "content": compact_prompt(prompt)}
+    ]
+
+def _batch_messages(job_descriptions, user_profile):
+    """
+    构建多个职位批量匹配分析的消息
+    
+    参数:
+    - job_descriptions: {职位ID: 职位描述文本}
+    - user_profile: 用户简历和技能信息
+    
+    返回:
+    - messages: 对话消息列表
+    """
+    jobs_text = "\n".join(
+        f"### 职位 {job_id}\n{job_prompt_text(description)}\n" for job_id, description in job_descriptions.items()
+    )
+    prompt = f"""
+        你是一位专业的职业顾问，请分别分析以下每个职位描述与求职者背景的匹配程度。
+        
+        ## 求职者背景
+        {profile_prompt_text(user_profile)}
         
+        ## 职位列表
+        {jobs_text}
+        
+        ## 评分标准
+        请基于以下因素为每个职位给出0-100的匹配分数:
+        1. 技能匹配度: 求职者技能与职位要求的匹配程度
+        2. 经验匹配度: 求职者经验与职位要求的匹配程度
+        3. 教育背景匹配度: 求职者学历与职位要求的匹配程度
+        4. 行业相关度: 求职者从业背景与目标公司行业的匹配程度
+        
+        ## 输出格式
+        仅返回JSON格式数据，包含字段 results，为数组，每个职位一个元素，包含以下字段:
+        - job_id: 职位编号，与职位列表中的编号一致
+        - total_score: 总分(0-100)
+        - skill_score: 技能匹配分数(0-100)
+        - experience_score: 经验匹配分数(0-100)
+        - education_score: 教育背景匹配分数(0-100)
+        - industry_score: 行业相关度分数(0-100)
+        - analysis: 匹配分析(不超过200字)
+        - recommendation: 是否推荐投递(true/false)
+        """
+    return [
+        {"role": "system", "content": "你是一位专业的职业顾问，负责分析职位与求职者的匹配度。"},
+        {"role": "user", "content": compact_prompt(prompt)}
+    ]
+
+def _parse_batch(content, job_descriptions):
+    """
+    解析批量匹配分析结果
+    
+    参数:
+    - content: 模型返回的JSON文本
+    - job_descriptions: {职位ID: 职位描述文本}
+    
+    返回:
+    - results: {职位ID: 分析结果}，只包含成功解析的职位
+    """
+    items = json.loads(content).get("results", [])
+    results = {}
+    for item in items if isinstance(items, list) else []:
+        if _is_valid_result(item) and str(item.get("job_id")) in job_descriptions:
+            results[str(item.pop("job_id"))] = item
+    logger.info(f"批量分析 {len(job_descriptions)} 个职位，成功解析 {len(results)} 个")
+    return results
+
+def analyze_job_relevance(job_description, user_profile):
+    """
+    分析职位与用户背景的匹配度
+    
+    参数:
+    - job_description: 职位描述文本
+    - user_profile: 用户简历和技能信息
+    
+    返回:
+    - score: 0-100的匹配分数
+    - analysis: 匹配分析结果
+    """
+    # 职位描述和简历都未变化时直接使用上次的分析结果
+    cache = get_ai_cache()
+    profile_hash = content_hash(user_profile)
+    cache_key = cache.make_key("relevance", job_description, profile_hash, AI_CONFIG["model"], RELEVANCE_PROMPT_VERSION)
+    cached = cache.get(cache_key, profile_hash)
+    if cached is not None:
+        get_llm_metrics().record_cache_hit("relevance")
+        logger.info(f"使用缓存的职位匹配分析，总分: {cached['total_score']}")
+        return cached
+    
+    try:
         # 调用API
-        response = openai.chat.completions.create(
-            model=AI_CONFIG["model"],
-            messages=[
-                {"role": "system", "content": "你是一位专业的职业顾问，负责分析职位与求职者的匹配度。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=AI_CONFIG["temperature"],
-            max_tokens=AI_CONFIG["max_tokens"],
-            response_format={"type": "json_object"}
-        )
-        
-        # 解析结果
-        result = response.choices[0].message.content
+        content = _chat(_relevance_messages(job_description, user_profile), AI_CONFIG["max_tokens"], "relevance")
+        
+        # 解析结果，缺少必要字段时按分析失败处理
+        result = json.loads(content)
+        if not _is_valid_result(result):
+            raise ValueError(f"结果缺少必要字段: {content[:100]}")
         logger.info(f"职位匹配分析完成，总分: {result['total_score']}")
         
+        cache.put(cache_key, profile_hash, result)
+        return result
+    except Exception as e:
+        logger.error(f"AI分析职位匹配度失败: {str(e)}")
+        # 返回默认值，默认值不缓存
+        return dict(DEFAULT_RELEVANCE)
+
+def _is_valid_result(result):
+    """检查一条匹配分析结果是否包含后续流程需要的字段"""
+    return (
+        isinstance(result, dict)
+        and isinstance(result.get("total_score"), (int, float))
+        and "analysis" in result
+        and "recommendation" in result
+    )
+
+def _split_batches(job_descriptions, user_profile):
+    """
+    按批量大小和输入token预算把职位分批
+    
+    参数:
+    - job_descriptions: {职位ID: 职位描述文本}
+    - user_profile: 用户简历和技能信息，每批发送一次
+    
+    返回:
+    - batches: 职位ID列表的列表
+    """
+    # 提示词中评分标准和输出格式约占400个token
+    budget = AI_CONFIG["batch_input_tokens"] - count_tokens(profile_prompt_text(user_profile)) - 400
+    batches, batch, used = [], [], 0
+    for job_id, description in job_descriptions.items():
+        tokens = count_tokens(job_prompt_text(description))
+        if batch and (len(batch) >= AI_CONFIG["batch_size"] or used + tokens > budget):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(job_id)
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _score_batch(job_descriptions, user_profile):
+    """
+    一次请求分析多个职位的匹配度
+    
+    参数:
+    - job_descriptions: {职位ID: 职位描述文本}
+    - user_profile: 用户简历和技能信息
+    
+    返回:
+    - results: {职位ID: 分析结果}，只包含成功解析的职位
+    """
+    try:
+        # 每个职位的输出长度与单独分析时相同
+        content = _chat(_batch_messages(job_descriptions, user_profile),
+                        AI_CONFIG["max_tokens"] * len(job_descriptions), "relevance_batch", len(job_descriptions))
+        return _parse_batch(content, job_descriptions)
+    except Exception as e:
+        logger.error(f"AI批量分析职位匹配度失败: {str(e)}")
+        return {}
+
+def _on_rate_limited(entry, error, attempt):
+    """
+    记录一次限流并暂停所有调用
+    
+    参数:
+    - entry: 被限流的请求的预约记录
+    - error: openai.RateLimitError
+    - attempt: 本次是第几次尝试（从0开始）
+    """
+    retry_after = None
+    try:
+        retry_after = float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    delay = _token_limiter.rate_limited(entry, retry_after)
+    if attempt < AI_CONFIG["max_retries"]:
+        logger.warning(f"AI接口触发限流，暂停 {delay:.1f} 秒后第 {attempt + 1}/{AI_CONFIG['max_retries']} 次重试")
+
+def _chat(messages, max_tokens, kind, jobs=1, json_output=True):
+    """
+    同步调用模型，与异步调用共用每分钟token数限速，触发限流时退避重试
+    
+    参数:
+    - messages: 对话消息列表
+    - max_tokens: 最大输出token数
+    - kind: 调用类型，用于调用统计
+    - jobs: 本次调用分析的职位数，用于调用统计
+    - json_output: 是否要求返回JSON
+    
+    返回:
+    - content: 模型返回的文本
+    """
+    estimate = sum(count_tokens(message["content"]) for message in messages) + max_tokens
+    options = {"response_format": {"type": "json_object"}} if json_output else {}
+    for attempt in range(AI_CONFIG["max_retries"] + 1):
+        entry = _token_limiter.reserve(estimate)
+        try:
+            with get_llm_metrics().track(kind, AI_CONFIG["model"], jobs=jobs) as call:
+                response = openai.chat.completions.create(
+                    model=AI_CONFIG["model"],
+                    messages=messages,
+                    temperature=AI_CONFIG["temperature"],
+                    max_tokens=max_tokens,
+                    **options
+                )
+                call["usage"] = getattr(response, "usage", None)
+        except openai.RateLimitError as e:
+            _on_rate_limited(entry, e, attempt)
+            continue
+        
+        usage = getattr(response, "usage", None)
+        _token_limiter.record(entry, usage.total_tokens if usage else estimate)
+        return response.choices[0].message.content
+    raise RuntimeError(f"AI接口连续 {AI_CONFIG['max_retries'] + 1} 次触发限流")
+
+async def _achat(client, semaphore, messages, max_tokens, kind, jobs=1):
+    """
+    异步调用模型，受并发数和每分钟token数限制，触发限流时退避重试
+    
+    参数:
+    - client: AsyncOpenAI 客户端
+    - semaphore: 并发数信号量
+    - messages: 对话消息列表
+    - max_tokens: 最大输出token数
+    - kind: 调用类型，用于调用统计
+    - jobs: 本次调用分析的职位数，用于调用统计
+    
+    返回:
+    - content: 模型返回的文本
+    """
+    estimate = sum(count_tokens(message["content"]) for message in messages) + max_tokens
+    for attempt in range(AI_CONFIG["max_retries"] + 1):
+        async with semaphore:
+            entry = await _token_limiter.acquire(estimate)
+            try:
+                with get_llm_metrics().track(kind, AI_CONFIG["model"], jobs=jobs) as call:
+                    response = await client.chat.completions.create(
+                        model=AI_CONFIG["model"],
+                        messages=messages,
+                        temperature=AI_CONFIG["temperature"],
+                        max_tokens=max_tokens,
+                        response_format={"type": "json_object"}
+                    )
+                    call["usage"] = getattr(response, "usage", None)
+            except openai.RateLimitError as e:
+                _on_rate_limited(entry, e, attempt)
+                continue
+        
+        usage = getattr(response, "usage", None)
+        _token_limiter.record(entry, usage.total_tokens if usage else estimate)
+        return response.choices[0].message.content
+    raise RuntimeError(f"AI接口连续 {AI_CONFIG['max_retries'] + 1} 次触发限流")
+
+async def _aanalyze_job_relevance(client, semaphore, job_description, user_profile, cache_key, profile_hash):
+    """异步分析单个职位的匹配度，失败时返回默认结果"""
+    try:
+        content = await _achat(client, semaphore, _relevance_messages(job_description, user_profile),
+                               AI_CONFIG["max_tokens"], "relevance")
+        result = json.loads(content)
+        if not _is_valid_result(result):
+            raise ValueError(f"结果缺少必要字段: {content[:100]}")
+        get_ai_cache().put(cache_key, profile_hash, result)
         return result
     except Exception as e:
         logger.error(f"AI分析职位匹配度失败: {str(e)}")
-        # 返回默认值
-        return {
-            "total_score": 50,
-            "skill_score": 50,
-            "experience_score": 50,
-            "education_score": 50,
-            "industry_score": 50,
-            "analysis": "AI分析失败，无法提供详细匹配信息。",
-            "recommendation": False
-        }
+        return dict(DEFAULT_RELEVANCE)
+
+async def _ascore_batch(client, semaphore, job_descriptions, user_profile):
+    """异步批量分析，只返回成功解析的职位"""
+    try:
+        content = await _achat(client, semaphore, _batch_messages(job_descriptions, user_profile),
+                               AI_CONFIG["max_tokens"] * len(job_descriptions), "relevance_batch", len(job_descriptions))
+        return _parse_batch(content, job_descriptions)
+    except Exception as e:
+        logger.error(f"AI批量分析职位匹配度失败: {str(e)}")
+        return {}
+
+async def _aanalyze_jobs(batches, pending, user_profile, profile_hash):
+    """
+    并发分析所有批次，批量结果中缺失的职位再并发单独分析
+    
+    参数:
+    - batches: 职位ID列表的列表
+    - pending: {职位ID: (职位描述, 缓存键)}
+    - user_profile: 用户简历和技能信息
+    - profile_hash: 简历哈希
+    
+    返回:
+    - results: {职位ID: 分析结果}
+    """
+    client = openai.AsyncOpenAI(api_key=AI_CONFIG["openai_api_key"], base_url=AI_CONFIG["base_url"])
+    semaphore = asyncio.Semaphore(AI_CONFIG["concurrency"])
+    cache = get_ai_cache()
+    
+    batch_jobs = [batch for batch in batches if len(batch) > 1]
+    batch_results = await asyncio.gather(*(
+        _ascore_batch(client, semaphore, {job_id: pending[job_id][0] for job_id in batch}, user_profile)
+        for batch in batch_jobs
+    ))
+    
+    results = {}
+    for batch_result in batch_results:
+        for job_id, result in batch_result.items():
+            cache.put(pending[job_id][1], profile_hash, result)
+            results[job_id] = result
+    
+    # 单个职位的批次和批量结果中缺失或无法解析的职位单独分析
+    singles = [job_id for batch in batches for job_id in batch if job_id not in results]
+    for job_id in singles:
+        if any(job_id in batch for batch in batch_jobs):
+            logger.warning(f"职位 {job_id} 的批量分析结果无法解析，改为单独分析")
+    single_results = await asyncio.gather(*(
+        _aanalyze_job_relevance(client, semaphore, pending[job_id][0], user_profile, pending[job_id][1], profile_hash)
+        for job_id in singles
+    ))
+    results.update(zip(singles, single_results))
+    
+    await client.close()
+    return results
+
+def _match_near_duplicates(pending, profile_hash):
+    """
+    按职位描述向量查找近似重复的职位
+    
+    参数:
+    - pending: {职位ID: (职位描述, 缓存键)}，未命中缓存的职位
+    - profile_hash: 简历哈希
+    
+    返回:
+    - reused: {职位ID: 分析结果}，与之前分析过的职位近似重复，直接复用其结果
+    - twins: {职位ID: 本批中近似重复的另一个职位ID}，只分析后者
+    """
+    index = get_embedding_index()
+    if index is None or not pending:
+        return {}, {}
+    
+    job_ids = list(pending)
+    keys, vectors = index.embed([pending[job_id][0] for job_id in job_ids])
+    index.save()
+    if vectors is None:
+        return {}, {}
+    
+    cache = get_ai_cache()
+    threshold = EMBEDDING_CONFIG["duplicate_similarity"]
+    reused, twins, representatives = {}, {}, []
+    for job_id, key, vector in zip(job_ids, keys, vectors):
+        # 之前分析过的近似职位（描述略有改动后重新发布等）
+        for neighbor, _ in index.search(vector, k=5, min_similarity=threshold, exclude={key}):
+            neighbor_key = cache.make_key_for_hash("relevance", neighbor, profile_hash, AI_CONFIG["model"], RELEVANCE_PROMPT_VERSION)
+            cached = cache.get(neighbor_key, profile_hash, count=False)
+            if cached is not None:
+                reused[job_id] = cached
+                break
+        if job_id in reused:
+            continue
+        
+        # 本批中的近似职位只分析第一个
+        for representative, representative_vector in representatives:
+            if float(representative_vector @ vector) >= threshold:
+                twins[job_id] = representative
+                break
+        else:
+            representatives.append((job_id, vector))
+    
+    if reused or twins:
+        logger.info(f"近似重复的职位: {len(reused)} 个复用之前的匹配分析，{len(twins)} 个与本批其他职位共用分析")
+    return reused, twins
+
+def analyze_jobs_relevance(job_descriptions, user_profile):
+    """
+    批量分析多个职位与用户背景的匹配度，每批只发送一次简历；
+    并发数大于1时各批次通过异步接口并发请求
+    
+    参数:
+    - job_descriptions: {职位ID: 职位描述文本}
+    - user_profile: 用户简历和技能信息
+    
+    返回:
+    - results: {职位ID: 分析结果}，按输入顺序排列，结果格式与 analyze_job_relevance 相同
+    """
+    cache = get_ai_cache()
+    profile_hash = content_hash(user_profile)
+    results = {}
+    pending = {}
+    for job_id, description in job_descriptions.items():
+        cache_key = cache.make_key("relevance", description, profile_hash, AI_CONFIG["model"], RELEVANCE_PROMPT_VERSION)
+        cached = cache.get(cache_key, profile_hash)
+        if cached is not None:
+            results[job_id] = cached
+        else:
+            pending[job_id] = (description, cache_key)
+    if results:
+        get_llm_metrics().record_cache_hit("relevance", len(results))
+        logger.info(f"{len(results)} 个职位使用缓存的匹配分析")
+    
+    # 启用职位描述向量时，近似重复的职位不再单独分析
+    reused, twins = _match_near_duplicates(pending, profile_hash)
+    for job_id, result in reused.items():
+        cache.put(pending[job_id][1], profile_hash, result)
+    results.update(reused)
+    if reused or twins:
+        get_llm_metrics().record_cache_hit("relevance", len(reused) + len(twins))
+    
+    descriptions = {job_id: description for job_id, (description, _) in pending.items()
+                    if job_id not in reused and job_id not in twins}
+    batches = _split_batches(descriptions, user_profile)
+    if AI_CONFIG["concurrency"] > 1 and len(batches) > 1:
+        results.update(asyncio.run(_aanalyze_jobs(batches, pending, user_profile, profile_hash)))
+    else:
+        for batch in batches:
+            if len(batch) == 1:
+                results[batch[0]] = analyze_job_relevance(descriptions[batch[0]], user_profile)
+                continue
+            
+            batch_results = _score_batch({job_id: descriptions[job_id] for job_id in batch}, user_profile)
+            for job_id in batch:
+                result = batch_results.get(job_id)
+                if result is None:
+                    # 批量结果中缺失或无法解析的职位单独分析
+                    logger.warning(f"职位 {job_id} 的批量分析结果无法解析，改为单独分析")
+                    results[job_id] = analyze_job_relevance(descriptions[job_id], user_profile)
+                else:
+                    cache.put(pending[job_id][1], profile_hash, result)
+                    results[job_id] = result
+    
+    for job_id, representative in twins.items():
+        result = results[representative]
+        if result != DEFAULT_RELEVANCE:
+            cache.put(pending[job_id][1], profile_hash, result)
+        results[job_id] = dict(result)
+    
+    # 按输入顺序返回
+    return {job_id: results[job_id] for job_id in job_descriptions}
+
+def _greeting_cache_key(job_info, profile_hash):
+    """
+    打招呼语的缓存键，同一公司的同类职位（职位名称归并后相同）共用一个键
+    
+    参数:
+    - job_info: 职位信息字典
+    - profile_hash: 简历哈希
+    
+    返回:
+    - key: 缓存键，缺少职位名称或公司名称时返回None
+    """
+    cluster = title_cluster(job_text(job_info, "title"))
+    company = job_text(job_info, "company", folded=True)
+    if not cluster or not company:
+        return None
+    return get_greeting_cache().make_key(
+        "greeting", f"{cluster}|{company}", profile_hash, AI_CONFIG["model"], GREETING_PROMPT_VERSION
+    )
+
+def _to_greeting_template(message, job_info):
+    """把打招呼语中的职位名称和公司名称替换为占位符"""
+    title = job_text(job_info, "title")
+    company = job_text(job_info, "company")
+    # 先替换较长的名称，避免公司名称出现在职位名称中时被拆开
+    for name, slot in sorted(((title, TITLE_SLOT), (company, COMPANY_SLOT)), key=lambda item: -len(item[0])):
+        if name:
+            message = message.replace(name, slot)
+    return message
+
+def _fill_greeting_template(template, job_info):
+    """在打招呼语模板中填入当前职位的名称"""
+    return (template
+            .replace(TITLE_SLOT, job_text(job_info, "title") or "职位")
+            .replace(COMPANY_SLOT, job_text(job_info, "company") or "贵公司"))
 
 def generate_greeting_message(job_info, user_profile):
     """
-    生成个性化的打招呼语
+    生成个性化的打招呼语，同一公司的同类职位复用已生成的打招呼语
     
     参数:
     - job_info: 职位信息字典，包含职位名称、公司名称、职位描述等
@@ -91,18 +564,28 @@ def generate_greeting_message(job_info, user_profile):
     返回:
     - message: 生成的打招呼语
     """
+    cache = get_greeting_cache()
+    profile_hash = content_hash(user_profile)
+    cache_key = _greeting_cache_key(job_info, profile_hash)
+    if cache_key is not None:
+        cached = cache.get(cache_key, profile_hash)
+        if cached is not None:
+            get_llm_metrics().record_cache_hit("greeting")
+            logger.info(f"使用缓存的打招呼语，命中率 {cache.hit_rate():.0%}")
+            return _fill_greeting_template(cached["template"], job_info)
+    
     try:
         # 构建提示词
         prompt = f"""
         你是一位专业的求职顾问，请根据以下职位信息和求职者背景，生成一段简短有力的打招呼语。
         
         ## 职位信息
-        - 职位名称: {job_info.get('title', '未知职位')}
-        - 公司名称: {job_info.get('company', '未知公司')}
-        - 职位描述: {job_info.get('description', '无职位描述')}
+        - 职位名称: {job_text(job_info, 'title') or '未知职位'}
+        - 公司名称: {job_text(job_info, 'company') or '未知公司'}
+        - 职位描述: {job_prompt_text(job_text(job_info, 'description')) or '无职位描述'}
         
         ## 求职者背景
-        {user_profile}
+        {profile_prompt_text(user_profile)}
         
         ## 要求
         1. 简短有力，150字以内
@@ -117,27 +600,66 @@ def generate_greeting_message(job_info, user_profile):
         """
         
         # 调用API
-        response = openai.chat.completions.create(
-            model=AI_CONFIG["model"],
-            messages=[
-                {"role": "system", "content": "你是一位专业的求职顾问，负责生成个性化的求职打招呼语。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=AI_CONFIG["temperature"],
-            max_tokens=AI_CONFIG["max_tokens"]
-        )
+        content = _chat([
+            {"role": "system", "content": "你是一位专业的求职顾问，负责生成个性化的求职打招呼语。"},
+            {"role": "user", "content": compact_prompt(prompt)}
+        ], AI_CONFIG["max_tokens"], "greeting", json_output=False)
         
         # 获取结果
-        message = response.choices[0].message.content.strip()
+        message = content.strip()
         logger.info("生成打招呼语成功")
         
+        # 默认模板不缓存
+        if cache_key is not None and message:
+            cache.put(cache_key, profile_hash, {"template": _to_greeting_template(message, job_info)})
         return message
     except Exception as e:
         logger.error(f"AI生成打招呼语失败: {str(e)}")
         # 返回默认模板
         return f"""您好，我对贵公司的{job_info.get('title', '职位')}很感兴趣。我有相关领域的工作经验和技能，希望能有机会进一步沟通。"""
 
-def filter_jobs_by_ai(jobs, user_profile, threshold=70):
+def prerank_jobs(jobs, user_profile):
+    """
+    按职位描述与简历的相似度预排序，只保留相似度不低于下限且排在前 top_k 的职位；
+    启用职位描述向量时使用向量相似度，否则或向量计算失败时使用TF-IDF相似度。
+    流水线的评分阶段一次传入一个评分窗口的职位，top_k 在整个窗口内生效
+    
+    参数:
+    - jobs: 职位列表
+    - user_profile: 用户简历和技能信息
+    
+    返回:
+    - shortlisted: 保留的职位列表；未保留的职位直接写入0分的匹配结果
+    """
+    selection = None
+    index = get_embedding_index()
+    if index is not None:
+        selection = index.select([job_text(job, "description") for job in jobs], user_profile,
+                                 min_similarity=EMBEDDING_CONFIG["min_similarity"],
+                                 top_k=PRERANK_CONFIG["top_k"])
+        index.save()
+    if selection is None:
+        # 直接使用规范化时已计算的折叠文本
+        ranker = get_ranker()
+        selection = ranker.select([job_text(job, "description", folded=True) for job in jobs], user_profile,
+                                  min_similarity=PRERANK_CONFIG["min_similarity"], folded=True,
+                                  top_k=PRERANK_CONFIG["top_k"])
+        ranker.save()
+    keep, scores = selection
+    
+    kept = set(keep)
+    for index, job in enumerate(jobs):
+        job["prerank_score"] = round(float(scores[index]), 4)
+        if index not in kept:
+            job["match_score"] = 0
+            job["match_analysis"] = f"职位描述与简历的文本相似度为 {scores[index]:.2f}，未进行AI分析。"
+            job["recommendation"] = False
+    
+    if len(keep) < len(jobs):
+        logger.info(f"本地预排序保留 {len(keep)}/{len(jobs)} 个职位进行AI分析")
+    return [jobs[index] for index in sorted(keep)]
+
+def filter_jobs_by_ai(jobs, user_profile, threshold=70, on_shortlist=None):
     """
     使用AI过滤职位列表，返回匹配度高的职位
     
@@ -145,20 +667,42 @@ def filter_jobs_by_ai(jobs, user_profile, threshold=70):
     - jobs: 职位列表
     - user_profile: 用户简历和技能信息
     - threshold: 匹配度阈值，低于此分数的职位将被过滤
+    - on_shortlist: 预排序后、AI分析前调用，参数为待分析的职位列表，可用于提前开始后续工作
     
     返回:
-    - filtered_jobs: 过滤后的职位列表，每个职位添加匹配度分数
+    - filtered_jobs: 过滤后的职位列表，每个职位添加匹配度分数；AI分析失败的职位
+      match_failed 为True
     """
     filtered_jobs = []
     
-    for job in jobs:
-        # 分析职位匹配度
-        analysis_result = analyze_job_relevance(job["description"], user_profile)
+    # 与简历几乎无关的职位不发送给模型
+    if PRERANK_CONFIG["enabled"] and jobs:
+        jobs = prerank_jobs(jobs, user_profile)
+    
+    if on_shortlist is not None and jobs:
+        on_shortlist(jobs)
+    
+    # 以职位ID为键批量分析匹配度，缺少ID或ID重复时使用序号
+    keyed_jobs = {}
+    for index, job in enumerate(jobs):
+        job_id = str(job.get("id") or job.get("jobId") or index)
+        if job_id in keyed_jobs:
+            job_id = f"{job_id}-{index}"
+        keyed_jobs[job_id] = job
+    analysis_results = analyze_jobs_relevance(
+        {job_id: job_text(job, "description") for job_id, job in keyed_jobs.items()},
+        user_profile,
+    )
+    
+    for job_id, job in keyed_jobs.items():
+        analysis_result = analysis_results[job_id]
         
         # 添加匹配信息到职位
         job["match_score"] = analysis_result["total_score"]
         job["match_analysis"] = analysis_result["analysis"]
         job["recommendation"] = analysis_result["recommendation"]
+        # 分析失败时使用默认结果，分数不代表真实匹配度，调用方可据此下次重试
+        job["match_failed"] = analysis_result == DEFAULT_RELEVANCE
         
         # 根据阈值过滤
         if analysis_result["total_score"] >= threshold:
@@ -0,0 +1,174 @@
+"""
+跨平台投递优先队列
+
+各平台在收集模式下只把通过全部过滤的职位连同匹配度放入同一个队列，不立即投递。
+所有平台搜索完成后按匹配度从高到低统一投递，同时遵守各平台的投递上限和本轮的全局上限，
+有限的投递名额优先留给本轮找到的最好的职位。
+
+各平台的匹配度含义不同（Boss直聘为AI评分，其他平台为与求职意向的TF-IDF相似度），
+投递前先把每个平台的分数换算为平台内的百分位（0-100），再跨平台比较。
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+import itertools
+
+from llm_metrics import platform_scope
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+class ApplyQueue:
+    """
+    投递优先队列
+
+    Args:
+        global_limit: 本轮所有平台合计的投递上限，None或不大于0表示不限
+        default_score: 没有匹配度的职位使用的分数
+    """
+
+    def __init__(self, global_limit=None, default_score=60):
+        self.global_limit = global_limit if global_limit and global_limit > 0 else None
+        self.default_score = default_score
+        self._heap = []
+        self._counter = itertools.count()
+        self._platforms = {}
+        self._lock = threading.Lock()
+
+    def register(self, platform, apply_func, limit, on_done=None, on_skip=None):
+        """
+        注册平台
+
+        Args:
+            platform: 平台名称
+            apply_func: 投递函数，接收职位，返回是否投递成功
+            limit: 该平台的投递上限
+            on_done: 队列投递完成后的回调，用于平台收尾（如清空检查点）
+            on_skip: 职位因达到上限未投递时的回调，参数为职位，用于标记下次运行重试
+        """
+        with self._lock:
+            self._platforms[platform] = {
+                "apply": apply_func,
+                "limit": limit,
+                "on_done": on_done,
+                "on_skip": on_skip,
+                "queued": 0,
+                "applied": 0,
+                "failed": 0,
+                "skipped": 0,
+            }
+        logger.info(f"投递队列注册平台 {platform}，投递上限 {limit}")
+
+    def push(self, platform, job, score=None):
+        """
+        放入一个待投递职位
+
+        Args:
+            platform: 平台名称，需先注册
+            job: 职位信息
+            score: 匹配度，默认使用 job["match_score"]
+        """
+        if score is None:
+            score = job.get("match_score")
+        if score is None:
+            score = self.default_score
+
+        with self._lock:
+            # 最小堆存负分数，同分时先到先投
+            heapq.heappush(self._heap, (-float(score), next(self._counter), platform, job))
+            self._platforms[platform]["queued"] += 1
+
+    def __len__(self):
+        return len(self._heap)
+
+    def top(self, k):
+        """
+        预览匹配度最高的k个职位，不考虑上限，不出队
+
+        Args:
+            k: 数量
+
+        Returns:
+            list: [(平台内百分位, 平台, 职位)]
+        """
+        with self._lock:
+            return [(-score, platform, job) for score, _, platform, job, _ in heapq.nsmallest(k, self._normalized())]
+
+    def _normalized(self):
+        """
+        把各平台的分数换算为平台内百分位，调用方需持有锁
+
+        平台内分数不高于某职位的职位占比即为该职位的百分位，每个平台最好的职位都是100，
+        同一平台内的先后顺序不变。
+
+        Returns:
+            list: 以 (-百分位, 序号, 平台, 职位, 原始分数) 为元素的最小堆
+        """
+        scores = {}
+        for score, _, platform, _ in self._heap:
+            scores.setdefault(platform, []).append(-score)
+        for values in scores.values():
+            values.sort()
+
+        heap = []
+        for score, order, platform, job in self._heap:
+            values = scores[platform]
+            percentile = 100.0 * bisect.bisect_right(values, -score) / len(values)
+            heap.append((-percentile, order, platform, job, -score))
+        heapq.heapify(heap)
+        return heap
+
+    def drain(self):
+        """
+        按匹配度从高到低投递队列中的职位
+
+        投递失败的职位不占用名额；平台达到上限后跳过该平台剩余职位；达到全局上限后停止。
+        跳过的职位交给平台的 on_skip 回调。
+
+        Returns:
+            dict: {平台: {"queued", "applied", "failed", "skipped"}}
+        """
+        total_applied = 0
+        with self._lock:
+            heap, self._heap = self._normalized(), []
+        logger.info(f"开始按匹配度投递，队列中共 {len(heap)} 个职位，全局上限 {self.global_limit or '不限'}")
+
+        while heap:
+            score, _, platform, job, raw_score = heapq.heappop(heap)
+            stats = self._platforms[platform]
+
+            if (self.global_limit is not None and total_applied >= self.global_limit) or stats["applied"] >= stats["limit"]:
+                stats["skipped"] += 1
+                if stats["on_skip"]:
+                    stats["on_skip"](job)
+                continue
+
+            try:
+                with platform_scope(platform):
+                    success = stats["apply"](job)
+            except Exception as e:
+                logger.error(f"{platform} 投递职位出错: {e}")
+                success = False
+
+            if success:
+                stats["applied"] += 1
+                total_applied += 1
+                logger.info(f"按匹配度投递 [{platform}] {job.get('title')} - 分数 {raw_score}（平台内百分位 {-score:.0f}）")
+            else:
+                stats["failed"] += 1
+
+        for platform, stats in self._platforms.items():
+            if stats["on_done"]:
+                try:
+                    stats["on_done"]()
+                except Exception as e:
+                    logger.error(f"{platform} 投递收尾出错: {e}")
+
+        result = {
+            platform: {key: stats[key] for key in ("queued", "applied", "failed", "skipped")}
+            for platform, stats in self._platforms.items()
+        }
+        logger.info(f"按匹配度投递完成，共投递 {total_applied} 个职位: {result}")
+        return result
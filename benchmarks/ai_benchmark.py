@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI评分阶段基准测试
+
+在进程内启动 benchmarks/mock_openai_server.py 的模拟接口，用一组固定的虚构职位
+调用 filter_jobs_by_ai，比较不同批量大小和并发数下的耗时、请求数和token用量。
+不需要API密钥和网络，相同参数下请求内容和分数每次一致。
+
+--pipeline 时职位经过 pipeline.run_pipeline，阶段结构与 platforms/boss.py 相同：
+详情阶段按 --arrival 的间隔逐个放出职位（模拟限速的详情请求），评分阶段一次取出
+--window 个职位调用 filter_jobs_by_ai，用于比较评分窗口对整条流水线耗时的影响。
+
+用法（在项目根目录执行）:
+    python -m benchmarks.ai_benchmark                              # 默认对比逐个、批量和并发
+    python -m benchmarks.ai_benchmark --batch-size 1 5 --concurrency 1 4
+    python -m benchmarks.ai_benchmark --latency lognormal:0.8,0.4 --rate-limit-ratio 0.1
+    python -m benchmarks.ai_benchmark --cache                      # 每组运行两次，第二次命中缓存
+    python -m benchmarks.ai_benchmark --pipeline --window 5 20     # 流水线中评分窗口的影响
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import itertools
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 保证直接以脚本方式运行时也能导入项目模块
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+
+PROFILE = "五年Python后端开发经验，熟悉Django、Flask、MySQL、Redis和消息队列，做过分布式任务调度系统，本科计算机专业。"
+
+_SKILLS = ["Python", "Java", "Go", "Django", "Flask", "Spring", "MySQL", "Redis", "Kafka", "Kubernetes",
+           "React", "数据分析", "机器学习", "分布式系统", "微服务", "高并发"]
+_TITLES = ["后端开发工程师", "Python开发工程师", "Java开发工程师", "数据工程师", "全栈工程师", "算法工程师"]
+
+def make_jobs(count, seed=0):
+    """
+    生成固定的虚构职位
+
+    Args:
+        count: 职位数
+        seed: 随机数种子
+
+    Returns:
+        list: 职位列表
+    """
+    rng = random.Random(seed)
+    jobs = []
+    for index in range(count):
+        skills = "、".join(rng.sample(_SKILLS, 4))
+        years = rng.randint(1, 8)
+        jobs.append({
+            "id": f"bench-{index}",
+            "title": rng.choice(_TITLES),
+            "company": f"示例科技{index % 7}",
+            "description": (f"岗位职责：负责公司核心业务系统的设计与开发，参与技术方案评审。"
+                            f"任职要求：{years}年以上相关经验，熟悉{skills}，本科及以上学历，良好的沟通能力。"),
+        })
+    return jobs
+
+def run_case(jobs, batch_size, concurrency, server, score=None):
+    """
+    用指定的批量大小和并发数评分一遍
+
+    Args:
+        score: 评分函数，接收职位列表，返回通过的职位；默认直接调用 filter_jobs_by_ai
+
+    Returns:
+        dict: 耗时、请求数和token用量
+    """
+    import ai_module
+    from llm_metrics import get_llm_metrics
+    from rate_limiter import TokenRateLimiter
+
+    ai_module.AI_CONFIG["batch_size"] = batch_size
+    ai_module.AI_CONFIG["concurrency"] = concurrency
+    # 每组使用新的token限速器，前一组用掉的每分钟额度不影响本组耗时
+    ai_module._token_limiter = TokenRateLimiter(ai_module.AI_CONFIG["tokens_per_minute"],
+                                                ai_module.AI_CONFIG["requests_per_minute"])
+    metrics = get_llm_metrics()
+    metrics.reset()
+    requests_before = server.stats["requests"] if server else 0
+    limited_before = server.stats["rate_limited"] if server else 0
+
+    start = time.perf_counter()
+    if score is None:
+        passed = ai_module.filter_jobs_by_ai([dict(job) for job in jobs], PROFILE)
+    else:
+        passed = score([dict(job) for job in jobs])
+    elapsed = time.perf_counter() - start
+
+    total = {}
+    for kinds in metrics.summary().values():
+        for key, value in kinds["total"].items():
+            total[key] = total.get(key, 0) + value
+    return {
+        "elapsed": elapsed,
+        "passed": len(passed),
+        "calls": total.get("calls", 0),
+        "cache_hits": total.get("cache_hits", 0),
+        "tokens": total.get("prompt_tokens", 0) + total.get("completion_tokens", 0),
+        "requests": (server.stats["requests"] - requests_before) if server else None,
+        "rate_limited": (server.stats["rate_limited"] - limited_before) if server else None,
+    }
+
+def pipeline_scorer(window, arrival):
+    """
+    生成让职位经过与Boss直聘相同结构流水线的评分函数，评分阶段一次取出 window 个职位
+
+    Args:
+        window: 评分窗口，即评分阶段一次取出的职位数
+        arrival: 详情阶段放出每个职位的间隔（秒）
+
+    Returns:
+        function: 接收职位列表，返回通过评分的职位列表
+    """
+    import ai_module
+    from pipeline import run_pipeline
+
+    def detail(job):
+        # 详情请求经过网站限速器，职位按固定间隔逐个到达评分阶段
+        time.sleep(arrival)
+        return [job]
+
+    def score(jobs):
+        passed = []
+        run_pipeline(
+            iter([jobs[index:index + 10] for index in range(0, len(jobs), 10)]),
+            [("初筛", lambda page: page), ("详情", detail), ("评分", lambda batch: ai_module.filter_jobs_by_ai(batch, PROFILE), window)],
+            passed.append,
+            buffer_size=max(20, window),
+            batch_wait=2,
+            name="基准流水线",
+        )
+        return passed
+
+    return score
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="AI评分阶段基准测试")
+    parser.add_argument("--jobs", type=int, default=40, help="职位数")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 5], help="批量大小，可指定多个")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="并发数，可指定多个")
+    parser.add_argument("--latency", default="uniform:0.2,0.4", help="模拟接口的响应时间分布")
+    parser.add_argument("--per-job-latency", type=float, default=0.05, help="批量请求中每多一个职位增加的耗时（秒）")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="模拟接口随机返回429的比例")
+    parser.add_argument("--rpm", type=int, default=0, help="模拟接口的每分钟请求上限")
+    parser.add_argument("--cache", action="store_true", help="启用AI结果缓存，每组运行两次")
+    parser.add_argument("--prerank", action="store_true", help="启用本地TF-IDF预排序")
+    parser.add_argument("--base-url", help="使用已启动的接口，不在进程内启动模拟接口")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--pipeline", action="store_true", help="让职位经过与Boss直聘相同结构的流水线")
+    parser.add_argument("--window", type=int, nargs="+", default=[5, 20], help="流水线评分阶段一次取出的职位数，可指定多个")
+    parser.add_argument("--arrival", type=float, default=0.1, help="流水线中详情阶段放出每个职位的间隔（秒）")
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server = MockOpenAIServer(port=0, latency=args.latency, per_job_latency=args.per_job_latency,
+                                  rate_limit_ratio=args.rate_limit_ratio, requests_per_minute=args.rpm,
+                                  retry_after=0.5, seed=args.seed).start()
+        base_url = server.base_url
+
+    # 导入 ai_module 之前修改配置，模块级客户端使用模拟接口地址
+    from config import AI_CONFIG, PRERANK_CONFIG
+    AI_CONFIG["base_url"] = base_url
+    AI_CONFIG["openai_api_key"] = AI_CONFIG["openai_api_key"] or "mock"
+    PRERANK_CONFIG["enabled"] = args.prerank
+
+    import ai_cache
+    import ai_module  # noqa: F401
+
+    jobs = make_jobs(args.jobs, args.seed)
+    print(f"接口: {base_url}，职位数: {len(jobs)}")
+    windows = args.window if args.pipeline else [None]
+    if args.pipeline:
+        print(f"流水线模式，详情阶段每 {args.arrival} 秒放出一个职位")
+    print(f"{'批量':>4}{'并发':>6}{'窗口':>6}{'轮次':>6}{'耗时(秒)':>10}{'调用':>6}{'命中':>6}{'token':>9}{'429':>6}{'通过':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for batch_size, concurrency, window in itertools.product(args.batch_size, args.concurrency, windows):
+            # 每组使用独立的缓存，互不影响
+            ai_cache._cache = ai_cache.AICache(path=os.path.join(tmp_dir, f"cache-{batch_size}-{concurrency}-{window}.json"),
+                                               enabled=args.cache)
+            score = pipeline_scorer(window, args.arrival) if window else None
+            for round_index in range(2 if args.cache else 1):
+                result = run_case(jobs, batch_size, concurrency, server, score)
+                print(f"{batch_size:>4}{concurrency:>6}{window or '-':>6}{round_index + 1:>6}{result['elapsed']:>10.2f}"
+                      f"{result['calls']:>6}{result['cache_hits']:>6}{result['tokens']:>9}"
+                      f"{result['rate_limited'] if result['rate_limited'] is not None else '-':>6}{result['passed']:>6}")
+
+    if server is not None:
+        print(f"\n模拟接口最大并发请求数: {server.stats['max_concurrency']}")
+        server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地模拟的 OpenAI 兼容接口
+
+实现 ai_module 使用的 chat/completions 接口，不需要API密钥和网络：
+- 匹配分析（单个和批量）返回确定的JSON分数，分数只由职位描述决定，多次运行结果一致
+- 打招呼语返回固定格式的文本
+- 响应时间按配置的分布随机，批量请求每多一个职位额外增加固定耗时
+- 可按比例随机返回429，也可按每分钟请求数真实限流，响应带 retry-after
+
+把环境变量 OPENAI_BASE_URL 设为 http://127.0.0.1:<端口>/v1 后，ai_module 的请求都会发到这里。
+
+用法（在项目根目录执行）:
+    python -m benchmarks.mock_openai_server --port 8765 --latency lognormal:0.8,0.4
+    python -m benchmarks.mock_openai_server --rate-limit-ratio 0.1 --rpm 60
+"""
+
+import re
+import sys
+import json
+import time
+import math
+import random
+import hashlib
+import argparse
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 批量提示词中的职位段落：“### 职位 <编号>”到下一个职位或评分标准之前
+_BATCH_JOB_PATTERN = re.compile(r'### 职位 (\S+)\n(.*?)(?=\n\s*### 职位 |\n\s*## 评分标准)', re.S)
+_SINGLE_JOB_PATTERN = re.compile(r'## 职位描述\n(.*?)\n\s*## 求职者背景', re.S)
+_TITLE_PATTERN = re.compile(r'职位名称: (.*)')
+_COMPANY_PATTERN = re.compile(r'公司名称: (.*)')
+
+def parse_latency(spec):
+    """
+    解析响应时间分布
+
+    Args:
+        spec: "fixed:秒"、"uniform:最小,最大"、"normal:均值,标准差" 或 "lognormal:中位数,sigma"
+
+    Returns:
+        function: 接收 random.Random、返回秒数的函数
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"未知的响应时间分布: {spec}")
+
+def score_for(description):
+    """
+    由职位描述确定的匹配分析结果
+
+    Args:
+        description: 职位描述文本
+
+    Returns:
+        dict: 与 ai_module 要求格式一致的分析结果
+    """
+    digest = hashlib.sha256(description.strip().encode("utf-8")).digest()
+    scores = [40 + value % 56 for value in digest[:5]]
+    return {
+        "total_score": scores[0],
+        "skill_score": scores[1],
+        "experience_score": scores[2],
+        "education_score": scores[3],
+        "industry_score": scores[4],
+        "analysis": f"模拟分析结果，总分 {scores[0]}。",
+        "recommendation": scores[0] >= 70,
+    }
+
+def _count_tokens(text):
+    """与 ai_module 的估算方式一致，按字符数计"""
+    return len(text)
+
+class MockOpenAIServer:
+    """
+    模拟接口服务
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0表示随机端口
+        latency: 响应时间分布，见 parse_latency
+        per_job_latency: 批量请求中每个职位额外增加的耗时（秒）
+        rate_limit_ratio: 随机返回429的比例（0-1）
+        requests_per_minute: 每分钟请求上限，超过时返回429，0表示不限
+        retry_after: 429响应中建议的等待秒数
+        seed: 随机数种子，相同种子下响应时间和429的序列相同
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, latency="fixed:0", per_job_latency=0.0,
+                 rate_limit_ratio=0.0, requests_per_minute=0, retry_after=1.0, seed=0):
+        self.latency = parse_latency(latency)
+        self.per_job_latency = per_job_latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self._active = 0
+        self.stats = {"requests": 0, "rate_limited": 0, "jobs": 0, "max_concurrency": 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """供 OPENAI_BASE_URL 使用的地址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _admit(self):
+        """决定本次请求是否限流，返回是否放行和本次请求的响应时间"""
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            limited = self._rng.random() < self.rate_limit_ratio
+            if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+                limited = True
+            if limited:
+                self.stats["rate_limited"] += 1
+                return False, 0.0
+            self._window.append(now)
+            return True, self.latency(self._rng)
+
+    def _handle(self, handler):
+        """处理一次请求"""
+        if not handler.path.rstrip("/").endswith("/chat/completions"):
+            self._send(handler, 404, {"error": {"message": f"未实现的接口: {handler.path}", "type": "invalid_request_error"}})
+            return
+
+        try:
+            length = int(handler.headers.get("Content-Length", 0))
+            request = json.loads(handler.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(handler, 400, {"error": {"message": "请求不是有效的JSON", "type": "invalid_request_error"}})
+            return
+
+        admitted, delay = self._admit()
+        if not admitted:
+            self._send(handler, 429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded",
+                                                 "code": "rate_limit_exceeded"}},
+                       headers={"retry-after": str(self.retry_after)})
+            return
+
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        content, jobs = self._complete(prompt, request.get("response_format"))
+
+        with self._lock:
+            self._active += 1
+            self.stats["jobs"] += jobs
+            self.stats["max_concurrency"] = max(self.stats["max_concurrency"], self._active)
+        try:
+            time.sleep(delay + self.per_job_latency * max(jobs - 1, 0))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+        prompt_tokens = _count_tokens(prompt)
+        completion_tokens = _count_tokens(content)
+        self._send(handler, 200, {
+            "id": f"chatcmpl-mock-{hashlib.md5(prompt.encode('utf-8')).hexdigest()[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _complete(self, prompt, response_format):
+        """按提示词类型生成回复，返回 (回复内容, 职位数)"""
+        if not response_format:
+            title = _TITLE_PATTERN.search(prompt)
+            company = _COMPANY_PATTERN.search(prompt)
+            title = title.group(1).strip() if title else "该职位"
+            company = company.group(1).strip() if company else "贵公司"
+            return f"您好，我对{company}的{title}很感兴趣，我的经历与职位要求比较匹配，希望能进一步沟通。", 1
+
+        batch = _BATCH_JOB_PATTERN.findall(prompt)
+        if batch:
+            results = [{"job_id": job_id, **score_for(description)} for job_id, description in batch]
+            return json.dumps({"results": results}, ensure_ascii=False), len(batch)
+
+        single = _SINGLE_JOB_PATTERN.search(prompt)
+        return json.dumps(score_for(single.group(1) if single else prompt), ensure_ascii=False), 1
+
+    @staticmethod
+    def _send(handler, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="本地模拟的 OpenAI 兼容接口")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--latency", default="fixed:0",
+                        help="响应时间分布: fixed:秒、uniform:最小,最大、normal:均值,标准差、lognormal:中位数,sigma")
+    parser.add_argument("--per-job-latency", type=float, default=0.0, help="批量请求中每多一个职位增加的耗时（秒）")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="随机返回429的比例（0-1）")
+    parser.add_argument("--rpm", type=int, default=0, help="每分钟请求上限，超过时返回429，0表示不限")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429响应中建议的等待秒数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.per_job_latency,
+                              args.rate_limit_ratio, args.rpm, args.retry_after, args.seed)
+    print(f"模拟接口已启动: OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"请求统计: {server.stats}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+解析器基准测试
+
+使用 benchmarks/fixtures 下各平台脱敏后的搜索页和详情页，测量 search_jobs /
+get_job_detail 所用解析函数的吞吐量（页/秒）、内存分配和峰值内存，
+并与已提交的基线 benchmarks/baseline.json 对比，发现解析性能回退。
+
+用法（在项目根目录执行）:
+    python -m benchmarks.parser_benchmark                 # 运行并与基线对比
+    python -m benchmarks.parser_benchmark --update        # 运行并更新基线
+    python -m benchmarks.parser_benchmark -t zhaopin.qiancheng
+    python -m benchmarks.parser_benchmark --workers 4     # 额外测量进程池解析详情页的吞吐量
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import importlib
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# 保证直接以脚本方式运行时也能导入项目模块
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+# 基准目标: (名称, 模块, 解析函数, 固定页面, 额外参数)
+TARGETS = [
+    ("platforms.boss/search", "platforms.boss", "parse_search_page", "platforms_boss/search.html", ()),
+    ("platforms.boss/detail", "platforms.boss", "parse_job_detail", "platforms_boss/detail.html", ("a00b7c9e0f1d2000",)),
+    ("zhaopin.boss/search", "zhaopin.boss_scraper", "parse_search_page", "zhaopin_boss/search.json", ()),
+    ("zhaopin.boss/detail", "zhaopin.boss_scraper", "parse_job_detail", "zhaopin_boss/detail.html", ("z00e8d7c6b5a4000",)),
+    ("zhaopin.zhilian/search", "zhaopin.zhilian_scraper", "parse_search_page", "zhaopin_zhilian/search.json", ()),
+    ("zhaopin.zhilian/detail", "zhaopin.zhilian_scraper", "parse_job_detail", "zhaopin_zhilian/detail.html", ("CC120000000J00000",)),
+    ("zhaopin.qiancheng/search", "zhaopin.qiancheng_scraper", "parse_search_page", "zhaopin_qiancheng/search.html", ()),
+    ("zhaopin.qiancheng/search_dom", "zhaopin.qiancheng_scraper", "parse_search_dom", "zhaopin_qiancheng/search_dom.html", ()),
+    ("zhaopin.qiancheng/detail", "zhaopin.qiancheng_scraper", "parse_job_detail", "zhaopin_qiancheng/detail.html", ("150000000",)),
+    ("zhaopin.lagou/search", "zhaopin.lagou_scraper", "parse_search_page", "zhaopin_lagou/search.json", ()),
+    ("zhaopin.lagou/detail", "zhaopin.lagou_scraper", "parse_job_detail", "zhaopin_lagou/detail.html", ("8000000",)),
+]
+
+def load_fixture(relative_path):
+    """读取固定页面内容"""
+    with open(os.path.join(FIXTURE_DIR, relative_path), "r", encoding="utf-8") as f:
+        return f.read()
+
+def load_parser(module_name, func_name):
+    """导入解析函数，缺少依赖时返回None"""
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        print(f"跳过 {module_name}: 缺少依赖 ({e})")
+        return None
+    return getattr(module, func_name)
+
+def measure(parser, text, args, min_time=1.0, min_iterations=20):
+    """
+    测量单个解析函数
+
+    Args:
+        parser: 解析函数
+        text: 页面内容
+        args: 解析函数的额外参数
+        min_time: 最短计时时长（秒）
+        min_iterations: 最少迭代次数
+
+    Returns:
+        dict: 测量结果
+    """
+    # 预热
+    for _ in range(3):
+        result = parser(text, *args)
+
+    # 吞吐量
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while iterations < min_iterations or elapsed < min_time:
+        parser(text, *args)
+        iterations += 1
+        elapsed = time.perf_counter() - start
+
+    # 内存：峰值为解析过程中的瞬时占用，保留部分为解析结果本身
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = parser(text, *args)
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    alloc_blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+
+    if isinstance(result, list):
+        items = len(result)
+    else:
+        items = 1 if result else 0
+
+    return {
+        "pages_per_sec": round(iterations / elapsed, 2),
+        "ms_per_page": round(elapsed / iterations * 1000, 3),
+        "alloc_blocks": alloc_blocks,
+        "peak_kib": round(peak / 1024, 1),
+        "page_kib": round(len(text.encode("utf-8")) / 1024, 1),
+        "items": items,
+    }
+
+def measure_pool(extractor, text, args, workers, batch=64):
+    """
+    测量进程池批量解析详情页的吞吐量
+
+    Args:
+        extractor: 模块级字段提取函数
+        text: 页面内容
+        args: 提取函数的额外参数
+        workers: 进程数
+        batch: 每批页面数
+
+    Returns:
+        float: 页/秒
+    """
+    from parse_pool import parse_pages
+
+    content = text.encode("utf-8")
+    contents = [content] * batch
+    # 预热进程池
+    parse_pages(extractor, contents[:workers], workers=workers, args=args)
+
+    start = time.perf_counter()
+    parse_pages(extractor, contents, workers=workers, args=args)
+    elapsed = time.perf_counter() - start
+    return round(batch / elapsed, 2)
+
+def load_baseline():
+    """加载基线数据"""
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(results):
+    """保存基线数据"""
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+    print(f"基线已更新: {BASELINE_PATH}")
+
+def compare(results, baseline, tolerance):
+    """
+    与基线对比
+
+    Args:
+        results: 本次测量结果
+        baseline: 基线测量结果
+        tolerance: 允许的相对退化比例
+
+    Returns:
+        list: 回退说明列表
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["items"] != base["items"]:
+            regressions.append(f"{name}: 解析条目数 {base['items']} -> {current['items']}")
+        if current["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: 吞吐量 {base['pages_per_sec']} -> {current['pages_per_sec']} 页/秒")
+        if current["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            regressions.append(f"{name}: 峰值内存 {base['peak_kib']} -> {current['peak_kib']} KiB")
+    return regressions
+
+def print_table(results, baseline):
+    """打印测量结果"""
+    header = f"{'目标':<28}{'页/秒':>10}{'基线':>10}{'变化':>9}{'毫秒/页':>10}{'分配块':>9}{'峰值KiB':>10}{'条目':>6}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("pages_per_sec")
+        change = f"{(r['pages_per_sec'] / base - 1) * 100:+.0f}%" if base else "-"
+        print(f"{name:<28}{r['pages_per_sec']:>10}{base if base else '-':>10}{change:>9}"
+              f"{r['ms_per_page']:>10}{r['alloc_blocks']:>9}{r['peak_kib']:>10}{r['items']:>6}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="解析器基准测试")
+    parser.add_argument("--target", "-t", action="append", help="只运行名称以此开头的目标，可重复指定")
+    parser.add_argument("--update", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许的相对退化比例，默认0.3")
+    parser.add_argument("--min-time", type=float, default=1.0, help="每个目标的最短计时时长（秒）")
+    parser.add_argument("--workers", type=int, default=0, help="额外测量指定进程数下详情页的进程池解析吞吐量")
+    args = parser.parse_args()
+
+    results = {}
+    for name, module_name, func_name, fixture, extra_args in TARGETS:
+        if args.target and not any(name.startswith(t) for t in args.target):
+            continue
+        parse_func = load_parser(module_name, func_name)
+        if parse_func is None:
+            continue
+        results[name] = measure(parse_func, load_fixture(fixture), extra_args, min_time=args.min_time)
+
+    baseline = load_baseline().get("results", {})
+    print_table(results, baseline)
+
+    if args.workers:
+        print(f"\n进程池解析（{args.workers} 个进程）:")
+        for name, module_name, func_name, fixture, extra_args in TARGETS:
+            if name not in results or func_name != "parse_job_detail":
+                continue
+            extractor = load_parser(module_name, "extract_detail_fields")
+            pool_rate = measure_pool(extractor, load_fixture(fixture), (), args.workers)
+            print(f"  {name:<28}{pool_rate:>10} 页/秒（单线程 {results[name]['pages_per_sec']}）")
+
+    if args.update:
+        baseline.update(results)
+        save_baseline(baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\n发现解析性能回退:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("\n未发现解析性能回退")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
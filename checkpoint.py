@@ -0,0 +1,216 @@
+"""
+运行检查点
+
+把每个职位在求职流程中的状态持久化到检查点文件：
+
+    discovered → detailed → filtered → scored → applied
+                    （任一阶段被淘汰）→ rejected
+
+运行中途退出（Cookie过期、网络中断、Ctrl+C）后，下次运行先恢复检查点中未完成的职位，
+从各自最后完成的阶段继续，不再重复获取详情和调用AI。运行正常结束后清空检查点。
+
+检查点文件是只追加的JSON Lines日志，每次状态变化追加一行，同一职位以最后一行为准；
+加载时压缩为每个职位一行。每次记录的写入量与职位数无关，不再每次重写整个文件。
+规范化文本等可以重新计算的字段不写入检查点。
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 职位状态，按流程顺序排列
+DISCOVERED = "discovered"
+DETAILED = "detailed"
+FILTERED = "filtered"
+SCORED = "scored"
+APPLIED = "applied"
+REJECTED = "rejected"
+
+STATES = (DISCOVERED, DETAILED, FILTERED, SCORED, APPLIED)
+
+# 终止状态，不再继续处理
+FINAL_STATES = (APPLIED, REJECTED)
+
+# 检查点文件目录，每个平台一个文件
+CHECKPOINT_DIR = os.path.join("data", "checkpoints")
+
+# 可以由其他字段重新计算、不写入检查点的字段
+DERIVED_FIELDS = ("normalized", "folded")
+
+class RunCheckpoint:
+    """
+    单个平台的运行检查点
+
+    Args:
+        platform: 平台名称
+        id_field: 职位ID字段名
+        path: 检查点文件路径，默认 data/checkpoints/<平台>.jsonl
+        max_age_hours: 检查点有效期（小时），过期的检查点不再恢复
+        enabled: 为False时不记录也不恢复
+    """
+
+    def __init__(self, platform, id_field="id", path=None, max_age_hours=24, enabled=True):
+        self.platform = platform
+        self.id_field = id_field
+        self.path = path or os.path.join(CHECKPOINT_DIR, f"{platform}.jsonl")
+        self.max_age = timedelta(hours=max_age_hours)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._file = None
+        # {职位ID: 检查点记录}，记录中的职位信息保存为JSON文本，恢复时再解析
+        self._jobs = self._load() if enabled else {}
+        if self._jobs:
+            self._compact()
+
+    def _load(self):
+        """加载检查点，同一职位以最后一条记录为准；过期或损坏时丢弃"""
+        if not os.path.exists(self.path):
+            return {}
+        jobs = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        # 中途退出时最后一行可能不完整
+                        continue
+                    item["job"] = json.dumps(item["job"], ensure_ascii=False)
+                    jobs[item.pop("id")] = item
+        except Exception as e:
+            logger.error(f"加载检查点失败: {e}")
+            return {}
+        if not jobs:
+            return {}
+
+        updated_at = max(item["updated_at"] for item in jobs.values())
+        if datetime.now() - datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S") > self.max_age:
+            logger.info(f"{self.platform} 检查点已过期（{updated_at}），不再恢复")
+            return {}
+        unfinished = sum(1 for item in jobs.values() if item["state"] not in FINAL_STATES)
+        logger.info(f"{self.platform} 发现上次未完成的运行，{unfinished} 个职位待恢复")
+        return jobs
+
+    @staticmethod
+    def _line(job_id, item):
+        """把一条检查点记录序列化为一行，职位信息已是JSON文本，直接拼接"""
+        meta = json.dumps({"id": job_id, **{key: value for key, value in item.items() if key != "job"}}, ensure_ascii=False)
+        return f'{meta[:-1]}, "job": {item["job"]}}}\n'
+
+    def _compact(self):
+        """把检查点文件重写为每个职位一行，调用方需持有锁或处于初始化阶段"""
+        try:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(self._line(job_id, item) for job_id, item in self._jobs.items())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"压缩检查点失败: {e}")
+
+    def _append(self, lines):
+        """追加记录并刷新到磁盘，调用方需持有锁"""
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.writelines(lines)
+            self._file.flush()
+        except Exception as e:
+            logger.error(f"保存检查点失败: {e}")
+
+    def _job_id(self, job):
+        return str(job.get(self.id_field))
+
+    def state(self, job):
+        """
+        获取职位当前状态
+
+        Args:
+            job: 职位信息
+
+        Returns:
+            str: 职位状态，未记录时返回None
+        """
+        item = self._jobs.get(self._job_id(job))
+        return item["state"] if item else None
+
+    def record(self, jobs, state, reason=None):
+        """
+        记录一个或一批职位完成了某个阶段
+
+        Args:
+            jobs: 职位信息或职位列表
+            state: 新状态
+            reason: 淘汰原因，仅用于 REJECTED
+        """
+        if not self.enabled:
+            return
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+        if not jobs:
+            return
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            lines = []
+            for job in jobs:
+                # 立即序列化，职位在后续阶段被其他线程修改时不影响检查点
+                job_id = self._job_id(job)
+                item = {
+                    "state": state,
+                    "job": json.dumps({key: value for key, value in job.items() if key not in DERIVED_FIELDS},
+                                      ensure_ascii=False, default=str),
+                    "updated_at": now,
+                }
+                if reason:
+                    item["reason"] = reason
+                self._jobs[job_id] = item
+                lines.append(self._line(job_id, item))
+            self._append(lines)
+
+    def resumable(self):
+        """
+        获取可以恢复的职位
+
+        Returns:
+            list: 未完成的职位信息副本，按记录顺序排列，不含规范化文本等派生字段
+        """
+        with self._lock:
+            return [json.loads(item["job"]) for item in self._jobs.values() if item["state"] not in FINAL_STATES]
+
+    def known(self, job):
+        """职位是否已在检查点中，用于跳过搜索结果中的重复职位"""
+        return self._job_id(job) in self._jobs
+
+    def summary(self):
+        """
+        统计各状态的职位数量
+
+        Returns:
+            dict: {状态: 数量}
+        """
+        counts = {}
+        with self._lock:
+            for item in self._jobs.values():
+                counts[item["state"]] = counts.get(item["state"], 0) + 1
+        return counts
+
+    def clear(self):
+        """运行正常结束后清空检查点"""
+        with self._lock:
+            self._jobs = {}
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                try:
+                    os.remove(self.path)
+                except OSError as e:
+                    logger.error(f"删除检查点失败: {e}")
@@ -68,6 +68,11 @@ PLATFORMS = {
         "user_id": os.getenv("BOSS_USER_ID", ""),
         "resume_path": "resumes/resume_boss.jpg",  # 图片简历路径
         "daily_limit": 100,  # 每日投递上限
+        "max_pages": 3,  # 每个求职意向和城市组合最多翻页数
+        "search_workers": 3,  # 同时搜索的求职意向和城市组合数
+        "request_interval": (2, 5),  # 相邻请求的随机间隔（秒），并发搜索时也保持不变
+        "incremental_crawl": True,  # 跳过上次运行已见过的职位
+        "resume_checkpoint": True,  # 中途退出后下次运行从检查点继续
     },
     "zhilian": {
         "enabled": True,
@@ -119,9 +124,72 @@ FILTER_CONFIG = {
 # AI配置
 AI_CONFIG = {
     "openai_api_key": os.getenv("OPENAI_API_KEY", ""),
+    "base_url": os.getenv("OPENAI_BASE_URL") or None,  # OpenAI兼容接口地址，默认使用官方接口；本地基准测试见 benchmarks/mock_openai_server.py
     "model": "gpt-4",  # 可选: "gpt-3.5-turbo"
     "temperature": 0.7,
-    "max_tokens": 500,
+    "max_tokens": 500,  # 单个职位分析结果的最大输出token数
+    "job_tokens": 600,  # 提示词中每个职位描述（只保留职责和要求段落）的最大token数
+    "profile_tokens": 1200,  # 提示词中简历的最大token数
+    "batch_size": 5,  # 每次请求最多分析的职位数，1表示逐个分析
+    "batch_input_tokens": 6000,  # 每次批量请求的输入token预算，职位描述较长时自动减少每批职位数
+    "concurrency": int(os.getenv("AI_CONCURRENCY", "4")),  # 同时进行的AI请求数，1表示逐个请求
+    "score_window": int(os.getenv("AI_SCORE_WINDOW", "20")),  # 流水线评分阶段一次取出的职位数，约为 batch_size × concurrency，按批拆分后并发评分
+    "tokens_per_minute": int(os.getenv("AI_TOKENS_PER_MINUTE", "40000")),  # 每分钟token上限，0表示不限
+    "requests_per_minute": int(os.getenv("AI_REQUESTS_PER_MINUTE", "60")),  # 每分钟请求上限，0表示不限
+    "max_retries": 5,  # 触发限流（429）后的最大重试次数
+}
+
+# 模型价格（美元 / 1000 token，输入和输出），用于估算AI调用费用，未列出的模型按0统计
+AI_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "text-embedding-3-small": (0.00002, 0),
+    "text-embedding-3-large": (0.00013, 0),
+}
+
+# AI评分前的本地TF-IDF预排序配置，与简历文本相似度过低的职位不再调用AI
+PRERANK_CONFIG = {
+    "enabled": True,
+    "min_similarity": 0.05,  # 相似度下限（0-1）
+    "top_k": 12,  # 每个评分窗口（AI_CONFIG["score_window"] 个职位）最多交给AI的职位数，0表示不限
+}
+
+# 职位描述向量配置，启用后按向量相似度预排序（替代TF-IDF），并让近似重复的职位复用已有的AI分析结果
+EMBEDDING_CONFIG = {
+    "enabled": os.getenv("EMBEDDINGS", "false").lower() == "true",
+    "provider": os.getenv("EMBEDDING_PROVIDER", "openai"),  # openai、local（需安装 sentence-transformers）或 hash（特征哈希，无需模型）
+    "model": os.getenv("EMBEDDING_MODEL", ""),  # 留空使用各方式的默认模型
+    "min_similarity": 0.2,  # 预排序的相似度下限（0-1）
+    "duplicate_similarity": 0.97,  # 相似度达到此值视为近似重复的职位
+    "max_entries": 20000,  # 最多保存的职位向量数
+    "ivf_min_size": 4096,  # 向量数达到此值后使用IVF近似搜索，0表示始终暴力搜索
+    "nprobe": 8,  # IVF搜索的聚类数
+}
+
+# AI分析结果缓存配置，职位描述和简历都未变化时直接使用上次的分析结果
+AI_CACHE_CONFIG = {
+    "enabled": os.getenv("AI_CACHE", "true").lower() == "true",
+    "ttl_hours": 24 * 7,  # 缓存有效期
+    "max_entries": 5000,  # 最多缓存的职位数，超过时淘汰最久未使用的
+}
+
+# 打招呼语缓存配置，同一公司的同类职位复用已生成的打招呼语
+GREETING_CACHE_CONFIG = {
+    "enabled": os.getenv("GREETING_CACHE", "true").lower() == "true",
+    "ttl_hours": 24 * 30,  # 缓存有效期
+    "max_entries": 2000,  # 最多缓存的打招呼语数，超过时淘汰最久未使用的
+}
+
+# 打招呼语预生成配置，在搜索和评分的同时提前生成，投递时不再等待模型
+GREETING_PREFETCH_CONFIG = {
+    "enabled": True,
+    "workers": 2,  # 后台生成线程数
+    "min_prerank_score": 0.15,  # 预排序相似度达到此值的职位在AI评分的同时投机生成
+    "max_pending": 10,  # 投机生成的最大在途数量
+    "ttl_minutes": 30,  # 生成结果的有效期
 }
 
 # 企业微信通知配置
@@ -140,6 +208,58 @@ SCHEDULE_CONFIG = {
     "interval_minutes": 30,  # 投递间隔时间（分钟）
 }
 
+# 多平台并发运行配置
+CONCURRENCY_CONFIG = {
+    "enabled": os.getenv("CONCURRENT_PLATFORMS", "false").lower() == "true",
+    "mode": os.getenv("CONCURRENT_MODE", "thread"),  # thread 或 process
+}
+
+# 跨平台投递队列配置
+APPLY_QUEUE_CONFIG = {
+    # 各平台只收集职位，全部搜索完成后按匹配度从高到低统一投递
+    "enabled": os.getenv("PRIORITY_APPLY", "false").lower() == "true",
+    # 每轮所有平台合计的投递上限，0表示只受各平台上限限制
+    "global_limit": int(os.getenv("APPLY_GLOBAL_LIMIT", "0")),
+    # 没有AI匹配度的职位使用的分数，低于AI匹配阈值，排在AI评分通过的职位之后
+    "default_score": 60,
+}
+
+# 每日请求预算配置，按平台和请求类别分配，0表示不限
+# Boss直聘默认的搜索组合为3个求职意向×4个城市，每个最多3页，首次运行36次搜索、约1000个职位详情；
+# 定时任务每30分钟运行一次（每天约18次），之后的运行因增量抓取通常每个组合只翻1页（12次搜索）
+REQUEST_BUDGET_CONFIG = {
+    "enabled": os.getenv("REQUEST_BUDGET", "true").lower() == "true",
+    "daily": {
+        "boss": {"search": 240, "detail": 1500, "apply": 100},
+        "zhilian": {"search": 30, "detail": 200, "apply": 50},
+        "qiancheng": {"search": 30, "detail": 200, "apply": 50},
+        "lagou": {"search": 30, "detail": 200, "apply": 50},
+    },
+}
+
+# 跨平台重复职位检测配置
+DEDUP_CONFIG = {
+    "enabled": True,
+    # 职位描述SimHash判定为重复的最大海明距离
+    "max_distance": 3,
+    # 索引中职位的保留天数
+    "retention_days": 30,
+}
+
+# 页面解析配置
+PARSE_CONFIG = {
+    # 详情页解析进程数，0表示在当前线程解析，-1表示使用全部CPU核心
+    "workers": int(os.getenv("PARSE_WORKERS", "0")),
+}
+
+# 流水线配置
+PIPELINE_CONFIG = {
+    # 相邻阶段之间队列的容量，同时也是在途职位数量的上限，不应小于 AI_CONFIG["score_window"]
+    "buffer_size": int(os.getenv("PIPELINE_BUFFER", "20")),
+    # 批量阶段（AI批量评分）收到第一个职位后最多等待多少秒凑满一批
+    "batch_wait": int(os.getenv("PIPELINE_BATCH_WAIT", "10")),
+}
+
 # 代理配置
 PROXY_CONFIG = {
     "enabled": os.getenv("USE_PROXY", "false").lower() == "true",
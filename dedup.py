@@ -0,0 +1,336 @@
+"""
+跨平台重复职位检测
+
+同一家公司常把同一个职位同时发布在Boss直聘、智联招聘、前程无忧和拉勾网上。
+此模块为每个职位计算两种签名：
+- 列表签名：规范化后的公司名（去掉地区前缀和行业后缀）+ 去掉括号备注的职位名 + 城市，
+  薪资区间有交集时才算重复，只用搜索结果即可判断
+- 描述签名：职位描述字符3-gram的64位SimHash，获取详情后判断近似重复
+
+SimHash按16位分成4段建立LSH索引，海明距离不超过3的签名至少有一段完全相同，
+只需比较同段的候选。索引保存在 data/dedup_index.json 中，跨运行、跨平台共享。
+
+只有已投递的职位才登记到索引中，被淘汰或留在投递队列中未投递的职位不会挡住
+其他平台的同一职位。检查时只与其他平台登记的职位比较，同一平台上其他城市、其他团队的
+同名职位不受影响。重复职位在获取详情前（列表签名）或AI评分前（描述签名）被剔除。
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from config import DEDUP_CONFIG
+from utils import file_lock
+from text_normalizer import fold_text
+from city_codes import CITY_CODES
+from job_requirements import parse_salary
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = os.path.join("data", "dedup_index.json")
+
+SIMHASH_BITS = 64
+BAND_BITS = 16
+BANDS = SIMHASH_BITS // BAND_BITS
+SHINGLE_SIZE = 3
+
+# 公司名中不影响判断的后缀和修饰
+_COMPANY_NOISE = re.compile(r'(有限责任公司|股份有限公司|有限公司|集团|股份|公司|\(.*?\)|（.*?）|[\s·.,，、-])')
+# 公司名开头的地区，如 "北京字节跳动科技有限公司" 中的 "北京"
+_REGIONS = sorted({city for codes in CITY_CODES.values() for city in codes} | {
+    "中国", "河北", "山西", "辽宁", "吉林", "黑龙江", "江苏", "浙江", "安徽", "福建", "江西", "山东", "河南",
+    "湖北", "湖南", "广东", "海南", "四川", "贵州", "云南", "陕西", "甘肃", "青海", "台湾", "内蒙古",
+    "广西", "西藏", "宁夏", "新疆", "香港", "澳门",
+}, key=len, reverse=True)
+_COMPANY_REGION = re.compile(r'^(' + "|".join(map(re.escape, _REGIONS)) + r')(省|市)?')
+# 公司名结尾的行业词，如 "科技"、"信息技术"
+_COMPANY_INDUSTRY = re.compile(r'(网络科技|信息科技|信息技术|网络技术|电子商务|计算机|科技|技术|软件|网络|信息|数据|智能|互联网|文化|传媒)+$')
+# 职位名中的括号备注，如 "（急招）"、"【双休】"
+_TITLE_NOISE = re.compile(r'(\(.*?\)|（.*?）|【.*?】|\[.*?\]|[\s·/|-])')
+# 城市名中的区县和后缀，如 "上海-浦东新区"、"北京市"
+_CITY_NOISE = re.compile(r'[-·\s/].*$|市$')
+
+def company_key(company):
+    """规范化公司名，去掉地区前缀、行业后缀和公司类型"""
+    key = _COMPANY_NOISE.sub("", fold_text(company))
+    stripped = _COMPANY_INDUSTRY.sub("", _COMPANY_REGION.sub("", key))
+    # 公司名只由地区和行业词组成时保留原样，避免不同公司被归并为同一个键
+    return stripped if len(stripped) >= 2 else key
+
+def title_key(title):
+    """规范化职位名"""
+    return _TITLE_NOISE.sub("", fold_text(title))
+
+def city_key(city):
+    """规范化城市名，只保留城市，去掉区县"""
+    return _CITY_NOISE.sub("", fold_text(city))
+
+def salary_range(salary):
+    """
+    把薪资文本解析为月薪区间
+
+    Args:
+        salary: 薪资文本
+
+    Returns:
+        list: [月薪下限K, 月薪上限K]，"以上" 的上限为None；无法解析时返回None
+    """
+    low, high, _ = parse_salary(salary)
+    if low != low or high != high:
+        return None
+    return [low, None if high == float("inf") else high]
+
+def _salary_overlaps(a, b):
+    """两个月薪区间是否有交集，任一方未知时视为有交集，上限为None时不限"""
+    if not a or not b:
+        return True
+    a_high = float("inf") if a[1] is None else a[1]
+    b_high = float("inf") if b[1] is None else b[1]
+    return a[0] <= b_high and b[0] <= a_high
+
+def simhash(text):
+    """
+    计算文本的SimHash
+
+    Args:
+        text: 已规范化的文本
+
+    Returns:
+        int: 64位签名，文本为空时返回None
+    """
+    text = re.sub(r'\s+', '', text or "")
+    if not text:
+        return None
+
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a, b):
+    """两个签名之间的海明距离"""
+    return bin(a ^ b).count("1")
+
+def _bands(fingerprint):
+    """把签名切分为LSH分段"""
+    mask = (1 << BAND_BITS) - 1
+    return [(index, fingerprint >> (index * BAND_BITS) & mask) for index in range(BANDS)]
+
+class DedupIndex:
+    """
+    重复职位索引
+
+    Args:
+        path: 索引文件路径
+        max_distance: 描述签名判定为重复的最大海明距离，不超过3时LSH可保证不漏检
+        retention_days: 索引条目保留天数
+    """
+
+    def __init__(self, path=INDEX_PATH, max_distance=3, retention_days=30):
+        self.path = path
+        self.max_distance = max_distance
+        self.retention = timedelta(days=retention_days)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._listing = {}
+        self._bands = {}
+        self._dirty = False
+        self.stats = {"listing_duplicates": 0, "description_duplicates": 0}
+        for entry in self._load():
+            self._add(entry)
+
+    def _load(self):
+        """加载索引文件，丢弃过期条目"""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        except Exception as e:
+            logger.error(f"加载重复职位索引失败: {e}")
+            return []
+
+        cutoff = self._cutoff()
+        return [entry for entry in entries if entry.get("seen_at", "") >= cutoff]
+
+    def _cutoff(self):
+        """保留期限的起点，早于此时间登记的条目视为过期"""
+        return (datetime.now() - self.retention).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _prune(self):
+        """剔除内存中的过期条目并重建签名索引，调用方需持有锁"""
+        cutoff = self._cutoff()
+        entries = [entry for entry in self._entries.values() if entry.get("seen_at", "") >= cutoff]
+        if len(entries) == len(self._entries):
+            return
+        logger.info(f"重复职位索引剔除过期条目 {len(self._entries) - len(entries)} 个")
+        self._entries, self._listing, self._bands = {}, {}, {}
+        for entry in entries:
+            self._add(entry)
+        self._dirty = True
+
+    def _add(self, entry):
+        """把条目加入内存索引，调用方需持有锁或处于初始化阶段"""
+        uid = f"{entry['platform']}:{entry['job_id']}"
+        previous = self._entries.get(uid)
+        if previous and previous.get("simhash") and not entry.get("simhash"):
+            entry["simhash"] = previous["simhash"]
+        self._entries[uid] = entry
+        uids = self._listing.setdefault(entry["key"], [])
+        if uid not in uids:
+            uids.append(uid)
+        if entry.get("simhash"):
+            fingerprint = int(entry["simhash"], 16)
+            for band in _bands(fingerprint):
+                uids = self._bands.setdefault(band, [])
+                if uid not in uids:
+                    uids.append(uid)
+
+    def _describe(self, uid):
+        entry = self._entries[uid]
+        return f"{entry['platform']} {entry.get('title', '')} ({entry['job_id']})"
+
+    def check_listing(self, platform, job_id, company, title, city=None, salary=None):
+        """
+        按公司名、职位名、城市和薪资判断是否与其他平台已登记的职位重复
+
+        Args:
+            platform: 平台名称
+            job_id: 职位ID
+            company: 公司名
+            title: 职位名
+            city: 工作城市
+            salary: 薪资文本
+
+        Returns:
+            str: 重复时返回已登记职位的说明，否则返回None
+        """
+        company, title_text = company_key(company), title_key(title)
+        if not company or not title_text:
+            return None
+
+        key = f"{company}|{title_text}|{city_key(city)}"
+        salary = salary_range(salary)
+        with self._lock:
+            for uid in self._listing.get(key, ()):
+                entry = self._entries[uid]
+                if entry["platform"] != platform and _salary_overlaps(entry.get("salary"), salary):
+                    self.stats["listing_duplicates"] += 1
+                    return self._describe(uid)
+        return None
+
+    def check_description(self, platform, job_id, company, description):
+        """
+        按职位描述的SimHash判断是否与其他平台已登记的职位近似重复
+
+        Args:
+            platform: 平台名称
+            job_id: 职位ID
+            company: 公司名
+            description: 规范化后的职位描述
+
+        Returns:
+            str: 重复时返回已登记职位的说明，否则返回None
+        """
+        fingerprint = simhash(description)
+        company = company_key(company)
+        if fingerprint is None or not company:
+            return None
+
+        with self._lock:
+            candidates = set()
+            for band in _bands(fingerprint):
+                candidates.update(self._bands.get(band, ()))
+            for candidate in candidates:
+                entry = self._entries[candidate]
+                if entry["platform"] == platform or entry["company"] != company:
+                    continue
+                if hamming_distance(int(entry["simhash"], 16), fingerprint) <= self.max_distance:
+                    self.stats["description_duplicates"] += 1
+                    return self._describe(candidate)
+        return None
+
+    def register(self, platform, job_id, company, title, city=None, salary=None, description=None):
+        """
+        登记通过所有过滤的职位，其他平台的同一职位之后会被判为重复
+
+        Args:
+            platform: 平台名称
+            job_id: 职位ID
+            company: 公司名
+            title: 职位名
+            city: 工作城市
+            salary: 薪资文本
+            description: 规范化后的职位描述，没有获取详情时为空
+        """
+        company_text, title_text = company_key(company), title_key(title)
+        if not company_text or not title_text:
+            return
+
+        fingerprint = simhash(description)
+        with self._lock:
+            self._add({
+                "platform": platform,
+                "job_id": str(job_id),
+                "key": f"{company_text}|{title_text}|{city_key(city)}",
+                "company": company_text,
+                "title": title,
+                "salary": salary_range(salary),
+                "simhash": f"{fingerprint:016x}" if fingerprint is not None else None,
+                "seen_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            self._dirty = True
+
+    def save(self):
+        """保存索引，先剔除过期条目，再在文件锁内合并其他进程写入的条目"""
+        with self._lock:
+            # 长时间运行（定时任务）时索引不会重新加载，过期条目在保存时剔除
+            self._prune()
+            if not self._dirty:
+                return
+            try:
+                with file_lock(os.path.basename(self.path)):
+                    for entry in self._load():
+                        uid = f"{entry['platform']}:{entry['job_id']}"
+                        if uid not in self._entries:
+                            self._add(entry)
+
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump({"entries": list(self._entries.values())}, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.path)
+                self._dirty = False
+                logger.info(f"重复职位索引已保存，共 {len(self._entries)} 个职位，"
+                            f"本次剔除列表重复 {self.stats['listing_duplicates']} 个、描述重复 {self.stats['description_duplicates']} 个")
+            except Exception as e:
+                logger.error(f"保存重复职位索引失败: {e}")
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_dedup_index():
+    """获取进程内共享的重复职位索引，各平台并发运行时使用同一个索引"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DedupIndex(
+                max_distance=DEDUP_CONFIG["max_distance"],
+                retention_days=DEDUP_CONFIG["retention_days"],
+            )
+        return _index
@@ -0,0 +1,406 @@
+"""
+职位描述向量索引
+
+每段职位描述只计算一次向量，按描述哈希保存在 data/embeddings.npy（float16矩阵）和
+data/embeddings.json（描述哈希到行号的映射及模型信息）中，跨运行、跨简历复用。
+用于：
+- 按与简历的余弦相似度预排序职位，替代TF-IDF
+- 查找与新职位近似重复的已有职位，复用其AI分析结果
+
+向量计算方式可替换：OpenAI 向量接口、本地 sentence-transformers 模型（可选依赖），
+或不依赖任何模型的特征哈希。索引较小时暴力搜索，超过 ivf_min_size 后建立IVF倒排索引，
+只搜索最近的 nprobe 个聚类。
+"""
+
+import os
+import json
+import math
+import zlib
+import logging
+import threading
+
+import numpy as np
+import openai
+
+from config import EMBEDDING_CONFIG
+from ai_cache import content_hash
+from tfidf_ranker import tokenize
+from llm_metrics import get_llm_metrics
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+VECTORS_PATH = os.path.join("data", "embeddings.npy")
+IDS_PATH = os.path.join("data", "embeddings.json")
+
+class OpenAIEmbedder:
+    """
+    OpenAI 向量接口
+
+    Args:
+        model: 向量模型名称
+        batch_size: 每次请求的文本数
+    """
+
+    def __init__(self, model="text-embedding-3-small", batch_size=64):
+        self.model = model
+        self.batch_size = batch_size
+
+    def embed(self, texts):
+        """
+        计算文本向量
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            numpy.ndarray: 每行一个向量
+        """
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            with get_llm_metrics().track("embedding", self.model, jobs=len(batch)) as call:
+                response = openai.embeddings.create(model=self.model, input=batch)
+                call["usage"] = getattr(response, "usage", None)
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return np.asarray(vectors, dtype=np.float32)
+
+class LocalEmbedder:
+    """
+    本地 sentence-transformers 模型，需要安装 sentence-transformers
+
+    Args:
+        model: 模型名称或路径
+    """
+
+    def __init__(self, model="BAAI/bge-small-zh-v1.5"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = model
+        self._model = SentenceTransformer(model)
+
+    def embed(self, texts):
+        """计算文本向量"""
+        return np.asarray(self._model.encode(texts, batch_size=32), dtype=np.float32)
+
+class HashingEmbedder:
+    """
+    特征哈希向量，中文两字词和英文单词哈希到固定维度，不需要模型和网络
+
+    Args:
+        model: 维度，如 "512"
+    """
+
+    def __init__(self, model="512"):
+        self.model = str(model)
+        self.dim = int(model)
+
+    def embed(self, texts):
+        """计算文本向量"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = zlib.crc32(token.encode("utf-8"))
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        # 与TF-IDF相同，词频取对数平滑
+        return np.sign(vectors) * np.log1p(np.abs(vectors))
+
+# 可选的向量计算方式
+EMBEDDERS = {
+    "openai": OpenAIEmbedder,
+    "local": LocalEmbedder,
+    "hash": HashingEmbedder,
+}
+
+def _normalize(vectors):
+    """按行归一化，零向量保持为零"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+class EmbeddingIndex:
+    """
+    按描述哈希去重的向量索引
+
+    Args:
+        embedder: 向量计算对象，需提供 embed(texts) 方法和 model 属性
+        provider: 向量计算方式名称，与模型名称一起记录在索引中，变化后重新计算
+        vectors_path: 向量矩阵文件路径
+        ids_path: 哈希映射文件路径
+        max_entries: 最多保留的向量数，超过时淘汰最早加入的
+        ivf_min_size: 向量数达到此值后使用IVF搜索，0表示始终暴力搜索
+        nprobe: IVF搜索的聚类数
+    """
+
+    def __init__(self, embedder, provider, vectors_path=VECTORS_PATH, ids_path=IDS_PATH,
+                 max_entries=20000, ivf_min_size=4096, nprobe=8):
+        self.embedder = embedder
+        self.signature = f"{provider}:{embedder.model}"
+        self.vectors_path = vectors_path
+        self.ids_path = ids_path
+        self.max_entries = max_entries
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._ids = []
+        self._rows = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float16)
+        self._dirty = False
+        self._ivf = None
+        self._profile = (None, None)
+        self._load()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _load(self):
+        """加载已保存的向量，模型不同时丢弃"""
+        if not (os.path.exists(self.vectors_path) and os.path.exists(self.ids_path)):
+            return
+        try:
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("signature") != self.signature:
+                logger.info(f"向量模型已从 {meta.get('signature')} 变为 {self.signature}，重新计算职位向量")
+                return
+            vectors = np.load(self.vectors_path)
+            if len(vectors) != len(meta["ids"]):
+                raise ValueError("向量数与映射不一致")
+            self._vectors = vectors.astype(np.float16, copy=False)
+            self._ids = list(meta["ids"])
+            self._rows = {key: row for row, key in enumerate(self._ids)}
+            logger.info(f"加载职位向量 {len(self._ids)} 条")
+        except Exception as e:
+            logger.error(f"加载职位向量失败: {e}")
+
+    def save(self):
+        """保存向量矩阵和映射，没有新向量时不写文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                directory = os.path.dirname(self.vectors_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_vectors = f"{self.vectors_path}.{os.getpid()}.tmp"
+                with open(tmp_vectors, "wb") as f:
+                    np.save(f, self._vectors)
+                tmp_ids = f"{self.ids_path}.{os.getpid()}.tmp"
+                with open(tmp_ids, "w", encoding="utf-8") as f:
+                    json.dump({"signature": self.signature, "ids": self._ids}, f)
+                os.replace(tmp_vectors, self.vectors_path)
+                os.replace(tmp_ids, self.ids_path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"保存职位向量失败: {e}")
+
+    def _add(self, keys, vectors):
+        """加入新向量，超过上限时淘汰最早的，调用方需持有锁"""
+        # 其他线程可能已经加入了同一描述
+        fresh = [index for index, key in enumerate(keys) if key not in self._rows]
+        if not fresh:
+            return
+        keys = [keys[index] for index in fresh]
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32)[fresh]).astype(np.float16)
+        if not len(self._ids):
+            self._vectors = vectors
+        else:
+            self._vectors = np.vstack([self._vectors, vectors])
+        self._ids.extend(keys)
+
+        overflow = len(self._ids) - self.max_entries
+        if overflow > 0:
+            self._vectors = self._vectors[overflow:]
+            self._ids = self._ids[overflow:]
+            # 行号整体前移，IVF索引失效
+            self._ivf = None
+        self._rows = {key: row for row, key in enumerate(self._ids)}
+        self._dirty = True
+
+        # 向量数增长一半后重建IVF索引
+        if self._ivf is not None and len(self._ids) > self._ivf["size"] * 1.5:
+            self._ivf = None
+
+    def embed(self, texts):
+        """
+        获取文本向量，已计算过的描述直接复用
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            tuple: (描述哈希列表, 归一化后的float32矩阵)；计算失败时矩阵为None
+        """
+        keys = [content_hash(text) for text in texts]
+        with self._lock:
+            # 已有的向量先取出，之后加入新向量时可能被淘汰
+            found = {}
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key in self._rows:
+                    found[key] = self._vectors[self._rows[key]]
+                elif key not in missing:
+                    missing[key] = text
+
+        vectors = None
+        if missing:
+            try:
+                vectors = self.embedder.embed(list(missing.values()))
+            except Exception as e:
+                logger.error(f"计算职位向量失败: {e}")
+                return keys, None
+            logger.info(f"计算职位向量 {len(missing)} 条，复用 {len(set(keys)) - len(missing)} 条")
+
+        if vectors is not None:
+            # 与保存的向量精度一致
+            vectors = _normalize(np.asarray(vectors, dtype=np.float32)).astype(np.float16)
+            found.update(zip(missing, vectors))
+            with self._lock:
+                self._add(list(missing), vectors)
+        if not keys:
+            return keys, self._vectors[:0].astype(np.float32)
+        return keys, np.stack([found[key] for key in keys]).astype(np.float32)
+
+    def _profile_vector(self, profile_text):
+        """简历向量，简历不变时复用"""
+        if self._profile[0] != profile_text:
+            vector = _normalize(np.asarray(self.embedder.embed([profile_text]), dtype=np.float32))[0]
+            self._profile = (profile_text, vector)
+        return self._profile[1]
+
+    def similarities(self, texts, profile_text):
+        """
+        计算各文本与简历的余弦相似度
+
+        Args:
+            texts: 职位描述列表
+            profile_text: 简历文本
+
+        Returns:
+            numpy.ndarray: 与 texts 等长的相似度；计算失败时为None
+        """
+        _, vectors = self.embed(texts)
+        if vectors is None:
+            return None
+        try:
+            return vectors @ self._profile_vector(profile_text)
+        except Exception as e:
+            logger.error(f"计算简历向量失败: {e}")
+            return None
+
+    def select(self, texts, profile_text, min_similarity=0.0, top_k=0):
+        """
+        选出值得交给AI评分的文本，接口与 TfidfRanker.select 相同
+
+        Args:
+            texts: 职位描述列表
+            profile_text: 简历文本
+            min_similarity: 相似度下限
+            top_k: 最多保留的数量，0表示不限
+
+        Returns:
+            tuple: (保留的下标列表（按相似度从高到低）, 全部相似度)；计算失败时返回None
+        """
+        scores = self.similarities(texts, profile_text)
+        if scores is None:
+            return None
+        order = np.argsort(-scores, kind="stable")
+        keep = [int(index) for index in order if scores[index] >= min_similarity]
+        if top_k > 0:
+            keep = keep[:top_k]
+        return keep, scores
+
+    def _build_ivf(self):
+        """用k-means把向量分为约 sqrt(N) 个聚类，调用方需持有锁"""
+        vectors = self._vectors.astype(np.float32)
+        nlist = max(1, int(math.sqrt(len(vectors))))
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(10):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        lists = [np.flatnonzero(assignment == cluster) for cluster in range(nlist)]
+        self._ivf = {"size": len(vectors), "centroids": centroids, "lists": lists}
+        logger.info(f"建立职位向量IVF索引，{len(vectors)} 条，{nlist} 个聚类")
+
+    def search(self, vector, k=10, min_similarity=None, exclude=None):
+        """
+        查找与向量最相似的已有职位描述
+
+        Args:
+            vector: 归一化后的查询向量
+            k: 返回的数量
+            min_similarity: 相似度下限
+            top_k: 最多保留的数量，0表示不限
+            exclude: 不返回的描述哈希集合，如查询向量自身
+
+        Returns:
+            list: [(描述哈希, 相似度)]，按相似度从高到低
+        """
+        with self._lock:
+            if not len(self._ids):
+                return []
+            if self.ivf_min_size and len(self._ids) >= self.ivf_min_size:
+                if self._ivf is None:
+                    self._build_ivf()
+                probes = np.argsort(-(self._ivf["centroids"] @ vector))[:self.nprobe]
+                # IVF建立后加入的向量不在任何聚类中，一并暴力搜索
+                candidates = np.concatenate(
+                    [self._ivf["lists"][cluster] for cluster in probes]
+                    + [np.arange(self._ivf["size"], len(self._ids))]
+                ).astype(np.int64)
+                candidates = candidates[candidates < len(self._ids)]
+            else:
+                candidates = np.arange(len(self._ids))
+            scores = self._vectors[candidates].astype(np.float32) @ vector
+            ids = [self._ids[row] for row in candidates]
+
+        results = []
+        for index in np.argsort(-scores, kind="stable"):
+            if min_similarity is not None and scores[index] < min_similarity:
+                break
+            if exclude and ids[index] in exclude:
+                continue
+            results.append((ids[index], float(scores[index])))
+            if len(results) >= k:
+                break
+        return results
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_embedding_index():
+    """
+    获取进程内共享的向量索引
+
+    Returns:
+        EmbeddingIndex: 向量索引，未启用或向量计算方式无法加载时返回None
+    """
+    global _index
+    if not EMBEDDING_CONFIG["enabled"]:
+        return None
+    with _index_lock:
+        if _index is None:
+            provider = EMBEDDING_CONFIG["provider"]
+            try:
+                # 未指定模型时使用各方式的默认模型
+                model = EMBEDDING_CONFIG["model"]
+                embedder = EMBEDDERS[provider](model) if model else EMBEDDERS[provider]()
+            except Exception as e:
+                logger.error(f"加载向量计算方式 {provider} 失败，改用TF-IDF: {e}")
+                EMBEDDING_CONFIG["enabled"] = False
+                return None
+            _index = EmbeddingIndex(
+                embedder,
+                provider,
+                max_entries=EMBEDDING_CONFIG["max_entries"],
+                ivf_min_size=EMBEDDING_CONFIG["ivf_min_size"],
+                nprobe=EMBEDDING_CONFIG["nprobe"],
+            )
+        return _index
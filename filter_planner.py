@@ -0,0 +1,175 @@
+"""
+职位过滤规划
+
+每条过滤规则声明它读取的职位字段，规划器据此把规则归入三类：
+- listing: 只用搜索结果中已有的字段，不需要额外请求
+- detail: 需要职位详情页的字段，每个职位要多一次带延迟的请求
+- ai: 需要AI评分结果，每个职位要多一次模型调用
+
+同一批职位先整体跑完所有 listing 规则，只对剩下的职位获取详情，再依次执行
+detail 和 ai 规则；没有配置任何 detail/ai 规则时完全不获取详情。每条规则
+淘汰的职位数即为它节省的详情请求（或AI调用）数，运行结束后汇总输出。
+"""
+
+import logging
+import threading
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 规则类别，按执行顺序排列
+LISTING = "listing"
+DETAIL = "detail"
+AI = "ai"
+STAGES = (LISTING, DETAIL, AI)
+
+STAGE_NAMES = {
+    LISTING: "列表",
+    DETAIL: "详情",
+    AI: "AI",
+}
+
+# AI评分写入职位的字段
+AI_FIELDS = ("match_score", "match_analysis", "recommendation")
+
+class FilterRule:
+    """
+    过滤规则
+
+    Args:
+        name: 规则名称，用于日志和统计
+        fields: 规则读取的职位字段
+        check: 检查函数，接收一个职位，返回淘汰原因，通过时返回None；
+            batch 为True时接收职位列表，返回与之等长的淘汰原因列表
+        batch: 是否整批检查
+    """
+
+    def __init__(self, name, fields, check, batch=False):
+        self.name = name
+        self.fields = tuple(fields)
+        self.check = check
+        self.batch = batch
+
+    def __repr__(self):
+        return f"FilterRule({self.name!r}, fields={self.fields})"
+
+class FilterPlan:
+    """
+    按数据来源排序执行过滤规则的规划器
+
+    Args:
+        rules: 过滤规则列表，同一类别内保持给定顺序，应把最便宜、淘汰最多的规则放在前面
+        detail_fields: 只能从职位详情页获得的字段
+        name: 平台名称，用于日志
+    """
+
+    def __init__(self, rules, detail_fields, name=""):
+        self.name = name
+        self.detail_fields = set(detail_fields)
+        self.rules = {stage: [] for stage in STAGES}
+        for rule in rules:
+            self.rules[self.classify(rule)].append(rule)
+
+        self._lock = threading.Lock()
+        self.stats = {
+            rule.name: {"stage": stage, "checked": 0, "rejected": 0}
+            for stage in STAGES for rule in self.rules[stage]
+        }
+
+        logger.info(f"{name}过滤规划: " + "；".join(
+            f"{STAGE_NAMES[stage]} [{', '.join(rule.name for rule in self.rules[stage]) or '无'}]"
+            for stage in STAGES
+        ))
+
+    def classify(self, rule):
+        """
+        判断规则所属类别
+
+        Args:
+            rule: 过滤规则
+
+        Returns:
+            str: LISTING / DETAIL / AI
+        """
+        fields = set(rule.fields)
+        if fields & set(AI_FIELDS):
+            return AI
+        if fields & self.detail_fields:
+            return DETAIL
+        return LISTING
+
+    @property
+    def needs_detail(self):
+        """是否需要获取职位详情，AI评分依赖职位描述，也需要详情"""
+        return bool(self.rules[DETAIL] or self.rules[AI])
+
+    def apply(self, stage, jobs):
+        """
+        对一批职位执行某一类别的全部规则
+
+        Args:
+            stage: 规则类别
+            jobs: 职位列表
+
+        Returns:
+            list: 通过所有规则的职位
+        """
+        survivors = list(jobs)
+        for rule in self.rules[stage]:
+            if not survivors:
+                break
+
+            if rule.batch:
+                reasons = rule.check(survivors)
+            else:
+                reasons = [rule.check(job) for job in survivors]
+
+            passed = []
+            for job, reason in zip(survivors, reasons):
+                if reason:
+                    logger.debug(f"{rule.name}未通过，跳过: {job.get('title')} - {reason}")
+                else:
+                    passed.append(job)
+
+            with self._lock:
+                self.stats[rule.name]["checked"] += len(survivors)
+                self.stats[rule.name]["rejected"] += len(survivors) - len(passed)
+            survivors = passed
+
+        return survivors
+
+    def report(self):
+        """
+        汇总各规则的淘汰数量及节省的请求数
+
+        Returns:
+            dict: {规则名称: {"stage", "checked", "rejected", "saved_detail_requests", "saved_ai_calls"}}
+        """
+        report = {}
+        with self._lock:
+            for name, stats in self.stats.items():
+                stage = stats["stage"]
+                rejected = stats["rejected"]
+                report[name] = dict(
+                    stats,
+                    saved_detail_requests=rejected if stage == LISTING and self.needs_detail else 0,
+                    saved_ai_calls=rejected if stage != AI and self.rules[AI] else 0,
+                )
+        return report
+
+    def log_report(self):
+        """输出各规则节省的请求数"""
+        report = self.report()
+        if not report:
+            return report
+
+        saved_details = sum(item["saved_detail_requests"] for item in report.values())
+        lines = [
+            f"{name}({STAGE_NAMES[item['stage']]}): 检查 {item['checked']}，淘汰 {item['rejected']}，"
+            f"节省详情请求 {item['saved_detail_requests']}，节省AI调用 {item['saved_ai_calls']}"
+            for name, item in report.items()
+        ]
+        if not self.needs_detail:
+            lines.append("未配置需要职位详情的规则，未获取任何职位详情")
+        logger.info(f"{self.name}过滤统计，共节省详情请求 {saved_details} 次:\n  " + "\n  ".join(lines))
+        return report
@@ -0,0 +1,164 @@
+"""
+打招呼语预生成
+
+打招呼语原本在投递时才生成，每次投递都要等一次模型调用。此模块在后台线程中提前生成：
+- 预排序相似度较高的职位在AI评分的同时开始生成（投机生成，评分未通过时作废）
+- 评分通过的职位立即开始生成，与投递间隔和其他职位的评分重叠
+
+投递时取走已生成的结果；仍在生成中的直接等待这次调用，不再另外请求；
+尚未开始或已过期的交还调用方同步生成。
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+class GreetingPrefetcher:
+    """
+    后台预生成打招呼语
+
+    Args:
+        generate_func: 生成函数，参数为 (职位信息, 简历文本)，返回打招呼语
+        workers: 后台生成线程数
+        min_prerank_score: 投机生成所需的最低预排序相似度
+        max_pending: 投机生成的最大在途数量，评分通过的职位不受限制
+        ttl_minutes: 生成结果的有效期（分钟）
+        enabled: 为False时不预生成，投递时全部同步生成
+    """
+
+    def __init__(self, generate_func, workers=2, min_prerank_score=0.15, max_pending=10, ttl_minutes=30, enabled=True):
+        self.generate_func = generate_func
+        self.workers = workers
+        self.min_prerank_score = min_prerank_score
+        self.max_pending = max_pending
+        self.ttl = ttl_minutes * 60
+        self.enabled = enabled and workers > 0
+        self._lock = threading.Lock()
+        self._executor = None
+        # {职位ID: (future, 简历文本, 提交时间, 是否投机生成)}
+        self._entries = {}
+        self.stats = {"submitted": 0, "used": 0, "waited": 0, "missed": 0, "wasted": 0}
+
+    @staticmethod
+    def _job_key(job):
+        return str(job.get("id") or job.get("jobId") or "")
+
+    def _submit(self, job, user_profile, speculative):
+        """提交一个生成任务，调用方需持有锁"""
+        key = self._job_key(job)
+        if not key or key in self._entries:
+            return
+        if speculative:
+            pending = sum(1 for entry in self._entries.values() if entry[3] and not entry[0].done())
+            if pending >= self.max_pending:
+                return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="greeting")
+        # 后台线程继承当前上下文（如AI调用统计所属的平台）；传入副本，避免与流水线线程同时修改
+        future = self._executor.submit(contextvars.copy_context().run, self.generate_func, dict(job), user_profile)
+        self._entries[key] = (future, user_profile, time.monotonic(), speculative)
+        self.stats["submitted"] += 1
+
+    def speculate(self, jobs, user_profile):
+        """
+        为预排序相似度较高的职位投机生成打招呼语
+
+        Args:
+            jobs: 已预排序、尚未AI评分的职位列表
+            user_profile: 简历文本
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for job in sorted(jobs, key=lambda job: -job.get("prerank_score", 0)):
+                if job.get("prerank_score", 0) >= self.min_prerank_score:
+                    self._submit(job, user_profile, speculative=True)
+
+    def prefetch(self, jobs, user_profile):
+        """
+        为评分通过、即将投递的职位生成打招呼语
+
+        Args:
+            jobs: 职位列表
+            user_profile: 简历文本
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for job in jobs:
+                self._submit(job, user_profile, speculative=False)
+
+    def discard(self, jobs):
+        """
+        作废不会投递的职位的生成任务，尚未开始的任务直接取消
+
+        Args:
+            jobs: 职位列表
+        """
+        with self._lock:
+            for job in jobs:
+                entry = self._entries.pop(self._job_key(job), None)
+                if entry is not None and not entry[0].cancel():
+                    self.stats["wasted"] += 1
+
+    def take(self, job, user_profile):
+        """
+        取走职位的打招呼语
+
+        Args:
+            job: 职位信息
+            user_profile: 简历文本
+
+        Returns:
+            str: 打招呼语；没有预生成、尚未开始、已过期或生成失败时返回None，由调用方同步生成
+        """
+        with self._lock:
+            entry = self._entries.pop(self._job_key(job), None)
+        if entry is None:
+            self.stats["missed"] += 1
+            return None
+
+        future, profile, submitted_at, _ = entry
+        expired = profile != user_profile or time.monotonic() - submitted_at > self.ttl
+        # 排队中的任务取消后由调用方立即生成，不再等待前面的任务
+        if expired or future.cancel():
+            self.stats["missed"] += 1
+            return None
+
+        if not future.done():
+            self.stats["waited"] += 1
+        try:
+            message = future.result()
+        except Exception as e:
+            logger.error(f"预生成打招呼语失败: {e}")
+            self.stats["missed"] += 1
+            return None
+        self.stats["used"] += 1
+        return message
+
+    def log_stats(self, name):
+        """
+        输出预生成的使用情况，没有投递时不输出
+
+        Args:
+            name: 平台名称，用于日志
+        """
+        used, missed = self.stats["used"], self.stats["missed"]
+        if used + missed:
+            logger.info(f"{name}打招呼语预生成 {self.stats['submitted']} 条，投递时直接使用 {used} 条"
+                        f"（其中等待生成完成 {self.stats['waited']} 条），同步生成 {missed} 条，作废 {self.stats['wasted']} 条")
+
+    def shutdown(self):
+        """取消尚未开始的任务并清空结果"""
+        with self._lock:
+            for future, *_ in self._entries.values():
+                future.cancel()
+            self._entries.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,243 @@
+"""
+职位薪资、经验、学历解析
+
+把搜索结果中的薪资（如 "15-25K·13薪"、"1-1.5万/月"）、工作经验和学历文本解析为
+数值区间和等级，并按页批量与 USER_PREFERENCES 中的 salary_range / experience /
+education 做向量化比较。明显不符合偏好的职位在获取详情和调用AI之前就被过滤。
+"""
+
+import re
+import logging
+import numpy as np
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 学历等级，数值越大要求越高；0 表示不限
+EDUCATION_LEVELS = {
+    "不限": 0,
+    "初中": 1,
+    "高中": 2,
+    "中专": 2,
+    "中技": 2,
+    "大专": 3,
+    "专科": 3,
+    "本科": 4,
+    "硕士": 5,
+    "研究生": 5,
+    "MBA": 5,
+    "博士": 6,
+}
+
+# 按月折算的系数
+MONTHLY_FACTORS = {
+    "year": 1 / 12,
+    "month": 1,
+    "day": 21.75,
+    "hour": 21.75 * 8,
+}
+
+# 数值单位折算为K（千元）
+UNIT_FACTORS = {
+    "k": 1,
+    "千": 1,
+    "w": 10,
+    "万": 10,
+    "元": 0.001,
+    "": None,
+}
+
+_SALARY_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(k|千|w|万|元)?', re.IGNORECASE)
+_SALARY_MONTHS_PATTERN = re.compile(r'(\d+)\s*薪')
+_EXPERIENCE_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+
+def _salary_period(text):
+    """判断薪资的计薪周期"""
+    if "年" in text:
+        return "year"
+    if "天" in text or "日" in text:
+        return "day"
+    if "时" in text:
+        return "hour"
+    return "month"
+
+def parse_salary(text):
+    """
+    解析薪资文本
+
+    Args:
+        text: 薪资文本，如 "15-25K·13薪"、"1-1.5万/月"、"15-25万/年"、"150元/天"、"10k以上"
+
+    Returns:
+        tuple: (月薪下限K, 月薪上限K, 年薪月数)，无法解析的部分为 nan；
+            "以上" 的上限为 inf，"以下" 的下限为0
+    """
+    if not text:
+        return (np.nan, np.nan, np.nan)
+
+    text = str(text).strip()
+    months_match = _SALARY_MONTHS_PATTERN.search(text)
+    months = float(months_match.group(1)) if months_match else np.nan
+    # 去掉 "·13薪" 部分，避免被当作薪资数值
+    if months_match:
+        text = text[:months_match.start()]
+
+    numbers = _SALARY_NUMBER_PATTERN.findall(text)
+    if not numbers:
+        return (np.nan, np.nan, months)
+
+    # 只有最后一个数值带单位时（如 "15-25K"），单位适用于整个区间
+    default_unit = next((unit for _, unit in reversed(numbers) if unit), "")
+    factor_period = MONTHLY_FACTORS[_salary_period(text)]
+
+    values = []
+    for number, unit in numbers[:2]:
+        unit = (unit or default_unit).lower()
+        unit_factor = UNIT_FACTORS.get(unit)
+        if unit_factor is None:
+            # 没有单位时按常见写法推断：大于1000视为元，否则视为K
+            unit_factor = 0.001 if float(number) >= 1000 else 1
+        values.append(float(number) * unit_factor * factor_period)
+
+    low = round(values[0], 2)
+    high = round(values[1], 2) if len(values) > 1 else low
+    # 只有一个数值时，"以上"/"以下" 表示单侧开放的区间
+    if len(values) == 1:
+        if "以上" in text:
+            high = np.inf
+        elif "以下" in text or "以内" in text:
+            low = 0.0
+    return (low, high, months)
+
+def parse_experience(text):
+    """
+    解析工作经验要求
+
+    Args:
+        text: 经验文本，如 "1-3年"、"3-5年经验"、"10年以上"、"1年以内"、"在校/应届"
+
+    Returns:
+        tuple: (最少年限, 最多年限)，不限或无法解析时为 nan
+    """
+    if not text:
+        return (np.nan, np.nan)
+
+    text = str(text)
+    if "不限" in text or "无需" in text:
+        return (np.nan, np.nan)
+    if "应届" in text or "在校" in text:
+        return (0.0, 0.0)
+
+    numbers = [float(n) for n in _EXPERIENCE_NUMBER_PATTERN.findall(text)]
+    if not numbers:
+        return (np.nan, np.nan)
+    if "以上" in text:
+        return (numbers[0], np.inf)
+    if "以内" in text or "以下" in text:
+        return (0.0, numbers[0])
+    if len(numbers) >= 2:
+        return (numbers[0], numbers[1])
+    return (numbers[0], numbers[0])
+
+def parse_education(text):
+    """
+    解析学历要求
+
+    Args:
+        text: 学历文本，如 "本科"、"本科及以上"、"学历不限"
+
+    Returns:
+        float: 学历等级，见 EDUCATION_LEVELS；无法解析时为 nan
+    """
+    if not text:
+        return np.nan
+
+    text = str(text)
+    if "不限" in text:
+        return 0.0
+    levels = [level for name, level in EDUCATION_LEVELS.items() if name in text]
+    return float(min(levels)) if levels else np.nan
+
+def parse_job_requirements(job):
+    """
+    解析职位的薪资、经验、学历要求，结果保存在 job["requirements"] 中
+
+    Args:
+        job: 职位信息
+
+    Returns:
+        tuple: (月薪下限, 月薪上限, 经验下限, 经验上限, 学历等级)
+    """
+    salary_min, salary_max, months = parse_salary(job.get("salary") or job.get("salaryDesc"))
+    experience_min, experience_max = parse_experience(job.get("experience"))
+    education = parse_education(job.get("education"))
+
+    values = (salary_min, salary_max, experience_min, experience_max, education)
+    job["requirements"] = {
+        "salary_min": _to_json(salary_min),
+        "salary_max": _to_json(salary_max),
+        "salary_months": _to_json(months),
+        "experience_min": _to_json(experience_min),
+        "experience_max": _to_json(experience_max),
+        "education_level": _to_json(education),
+    }
+    return values
+
+def _to_json(value):
+    """把 nan/inf 转成可JSON序列化的值"""
+    if value is None or np.isnan(value):
+        return None
+    if np.isinf(value):
+        return None
+    return value
+
+def evaluate_jobs(jobs, preferences):
+    """
+    批量评估一页职位是否符合求职偏好
+
+    三个条件均只在职位数据明确超出范围时拒绝，字段缺失或无法解析的职位视为符合。
+
+    Args:
+        jobs: 职位列表
+        preferences: 求职偏好，使用 salary_range / experience / education
+
+    Returns:
+        tuple: (布尔数组，True表示符合偏好; 每个职位的拒绝原因列表，符合时为None)
+    """
+    if not jobs:
+        return np.zeros(0, dtype=bool), []
+
+    table = np.array([parse_job_requirements(job) for job in jobs], dtype=np.float64)
+    salary_min, salary_max, experience_min, experience_max, education = table.T
+
+    salary_range = preferences.get("salary_range") or {}
+    experience = preferences.get("experience") or {}
+    education_prefs = preferences.get("education") or []
+
+    pref_salary_min = salary_range.get("min", -np.inf)
+    pref_salary_max = salary_range.get("max", np.inf)
+    pref_experience_min = experience.get("min", -np.inf)
+    pref_experience_max = experience.get("max", np.inf)
+    pref_levels = [parse_education(name) for name in education_prefs]
+    pref_levels = [level for level in pref_levels if not np.isnan(level)]
+    pref_education = max(pref_levels) if pref_levels else np.inf
+
+    # 与 nan 比较结果为 False，缺失字段自然视为符合
+    salary_out = (salary_max < pref_salary_min) | (salary_min > pref_salary_max)
+    experience_out = (experience_min > pref_experience_max) | (experience_max < pref_experience_min)
+    education_out = education > pref_education
+
+    rejected = salary_out | experience_out | education_out
+
+    reasons = [None] * len(jobs)
+    for index in np.flatnonzero(rejected):
+        parts = []
+        if salary_out[index]:
+            parts.append(f"薪资 {jobs[index].get('salary', '')}")
+        if experience_out[index]:
+            parts.append(f"经验 {jobs[index].get('experience', '')}")
+        if education_out[index]:
+            parts.append(f"学历 {jobs[index].get('education', '')}")
+        reasons[index] = "，".join(parts)
+
+    return ~rejected, reasons
@@ -12,10 +12,14 @@ import os
 import json
 import logging
 import argparse
+import functools
 import time
 import schedule
 from datetime import datetime
 
+from platform_runner import run_platforms, summarize_results, RUN_MODES
+from apply_queue import ApplyQueue
+
 # 导入各平台爬虫
 try:
     from zhaopin.boss_scraper import BossZhipin
@@ -82,13 +86,17 @@ def create_directories():
             os.makedirs(dir_name)
             logger.info(f"创建目录: {dir_name}")
 
-def run_boss():
-    """运行Boss直聘爬虫"""
+def run_boss(apply_queue=None):
+    """运行Boss直聘爬虫
+    
+    Args:
+        apply_queue: 跨平台投递优先队列，提供时只收集职位
+    """
     if BossZhipin:
         logger.info("开始运行Boss直聘爬虫")
         try:
             boss = BossZhipin()
-            result = boss.run()
+            result = boss.run(apply_queue=apply_queue)
             logger.info(f"Boss直聘爬虫运行{'成功' if result else '失败'}")
             return result
         except Exception as e:
@@ -98,13 +106,17 @@ def run_boss():
         logger.warning("Boss直聘爬虫模块未找到，跳过")
         return False
 
-def run_zhilian():
-    """运行智联招聘爬虫"""
+def run_zhilian(apply_queue=None):
+    """运行智联招聘爬虫
+    
+    Args:
+        apply_queue: 跨平台投递优先队列，提供时只收集职位
+    """
     if ZhilianZhaopin:
         logger.info("开始运行智联招聘爬虫")
         try:
             zhilian = ZhilianZhaopin()
-            result = zhilian.run()
+            result = zhilian.run(apply_queue=apply_queue)
             logger.info(f"智联招聘爬虫运行{'成功' if result else '失败'}")
             return result
         except Exception as e:
@@ -114,13 +126,17 @@ def run_zhilian():
         logger.warning("智联招聘爬虫模块未找到，跳过")
         return False
 
-def run_qiancheng():
-    """运行前程无忧爬虫"""
+def run_qiancheng(apply_queue=None):
+    """运行前程无忧爬虫
+    
+    Args:
+        apply_queue: 跨平台投递优先队列，提供时只收集职位
+    """
     if QianChengWuYou:
         logger.info("开始运行前程无忧爬虫")
         try:
             qiancheng = QianChengWuYou()
-            result = qiancheng.run()
+            result = qiancheng.run(apply_queue=apply_queue)
             logger.info(f"前程无忧爬虫运行{'成功' if result else '失败'}")
             return result
         except Exception as e:
@@ -130,13 +146,17 @@ def run_qiancheng():
         logger.warning("前程无忧爬虫模块未找到，跳过")
         return False
 
-def run_lagou():
-    """运行拉勾网爬虫"""
+def run_lagou(apply_queue=None):
+    """运行拉勾网爬虫
+    
+    Args:
+        apply_queue: 跨平台投递优先队列，提供时只收集职位
+    """
     if LagouWang:
         logger.info("开始运行拉勾网爬虫")
         try:
             lagou = LagouWang()
-            result = lagou.run()
+            result = lagou.run(apply_queue=apply_queue)
             logger.info(f"拉勾网爬虫运行{'成功' if result else '失败'}")
             return result
         except Exception as e:
@@ -146,20 +166,51 @@ def run_lagou():
         logger.warning("拉勾网爬虫模块未找到，跳过")
         return False
 
-def run_all_platforms():
-    """运行所有平台爬虫"""
-    logger.info("开始运行所有平台爬虫")
+# 平台名称与运行函数
+PLATFORM_RUNNERS = {
+    "boss": run_boss,
+    "zhilian": run_zhilian,
+    "qiancheng": run_qiancheng,
+    "lagou": run_lagou,
+}
+
+PLATFORM_NAMES = {
+    "boss": "Boss直聘",
+    "zhilian": "智联招聘",
+    "qiancheng": "前程无忧",
+    "lagou": "拉勾网",
+}
+
+def run_all_platforms(concurrent=False, mode="thread", prioritize=False, global_limit=0):
+    """运行所有平台爬虫
+    
+    Args:
+        concurrent: 是否并发运行各平台，每个平台在独立的线程或进程中运行
+        mode: 并发模式，thread 或 process
+        prioritize: 是否先收集所有平台的职位，再按匹配度从高到低统一投递
+        global_limit: 按匹配度投递时本轮合计的投递上限，0表示不限
+    """
+    logger.info(f"开始运行所有平台爬虫{'（并发模式: ' + mode + '）' if concurrent else ''}")
+    
+    runners = PLATFORM_RUNNERS
+    apply_queue = None
+    if prioritize:
+        if concurrent and mode == "process":
+            logger.warning("按匹配度统一投递需要各平台在同一进程中运行，改用 thread 模式")
+            mode = "thread"
+        apply_queue = ApplyQueue(global_limit)
+        runners = {name: functools.partial(func, apply_queue=apply_queue) for name, func in PLATFORM_RUNNERS.items()}
     
-    results = {
-        "boss": run_boss(),
-        "zhilian": run_zhilian(),
-        "qiancheng": run_qiancheng(),
-        "lagou": run_lagou()
-    }
+    start_time = time.time()
+    details = run_platforms(runners, concurrent=concurrent, mode=mode)
+    apply_results = apply_queue.drain() if apply_queue is not None else None
+    elapsed = time.time() - start_time
+    results = {name: detail["success"] for name, detail in details.items()}
     
     # 统计成功数量
     success_count = sum(1 for result in results.values() if result)
-    logger.info(f"所有平台爬虫运行完成，成功 {success_count} 个，失败 {4 - success_count} 个")
+    logger.info(f"所有平台爬虫运行完成，成功 {success_count} 个，失败 {len(results) - success_count} 个")
+    logger.info("运行总结:\n" + summarize_results(details, elapsed, PLATFORM_NAMES))
     
     # 保存运行结果
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -168,7 +219,11 @@ def run_all_platforms():
         with open(result_file, "w", encoding="utf-8") as f:
             json.dump({
                 "timestamp": timestamp,
-                "results": results
+                "concurrent": concurrent,
+                "elapsed_seconds": round(elapsed, 1),
+                "results": results,
+                "details": details,
+                "apply_queue": apply_results
             }, f, ensure_ascii=False)
         logger.info(f"运行结果已保存到: {result_file}")
     except Exception as e:
@@ -176,16 +231,21 @@ def run_all_platforms():
     
     return success_count > 0
 
-def schedule_jobs(run_time="10:00"):
+def schedule_jobs(run_time="10:00", concurrent=False, mode="thread", prioritize=False, global_limit=0):
     """设置定时任务
     
     Args:
         run_time: 运行时间，格式为"HH:MM"
+        concurrent: 是否并发运行各平台
+        mode: 并发模式，thread 或 process
+        prioritize: 是否按匹配度跨平台统一投递
+        global_limit: 按匹配度投递时每轮合计的投递上限
     """
     logger.info(f"设置定时任务，每天 {run_time} 运行")
     
     # 设置定时任务
-    schedule.every().day.at(run_time).do(run_all_platforms)
+    schedule.every().day.at(run_time).do(run_all_platforms, concurrent=concurrent, mode=mode,
+                                         prioritize=prioritize, global_limit=global_limit)
     
     logger.info("定时任务已设置，按 Ctrl+C 退出程序")
     
@@ -208,6 +268,10 @@ def main():
                         default="all", help="指定要运行的平台，默认为全部")
     parser.add_argument("--schedule", "-s", action="store_true", help="设置定时任务")
     parser.add_argument("--time", "-t", default="10:00", help="定时任务运行时间，格式为HH:MM，默认为10:00")
+    parser.add_argument("--concurrent", "-c", action="store_true", help="运行全部平台时并发运行，每个平台在独立的线程或进程中运行")
+    parser.add_argument("--mode", "-m", choices=RUN_MODES, default="thread", help="并发模式，默认为thread")
+    parser.add_argument("--priority", action="store_true", help="运行全部平台时先收集职位，再按匹配度从高到低统一投递")
+    parser.add_argument("--global-limit", type=int, default=0, help="按匹配度投递时每轮合计的投递上限，默认不限")
     
     args = parser.parse_args()
     
@@ -217,7 +281,8 @@ def main():
     
     # 根据参数运行相应的平台
     if args.schedule:
-        schedule_jobs(args.time)
+        schedule_jobs(args.time, concurrent=args.concurrent, mode=args.mode,
+                      prioritize=args.priority, global_limit=args.global_limit)
     else:
         if args.platform == "boss":
             run_boss()
@@ -228,7 +293,8 @@ def main():
         elif args.platform == "lagou":
             run_lagou()
         else:  # all
-            run_all_platforms()
+            run_all_platforms(concurrent=args.concurrent, mode=args.mode,
+                              prioritize=args.priority, global_limit=args.global_limit)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+模型调用统计
+
+记录每次模型调用的类型、模型、耗时、输入输出token数（取自响应的 usage）和
+估算费用，以及缓存命中次数，按平台汇总到本次运行的总结中，并追加保存到
+data/llm_metrics.json，作为优化AI阶段时的基线。
+
+调用所属的平台由 platform_scope 设置，在运行平台的线程中生效；流水线各阶段的
+线程继承创建时的上下文。
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import AI_PRICING
+from utils import file_lock, load_data, save_data
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+METRICS_FILE = "llm_metrics.json"
+
+# 最多保留的运行记录数
+MAX_RUNS = 200
+
+# 不属于任何平台的调用（如单独调用AI模块）
+UNKNOWN_PLATFORM = "other"
+
+_current_platform = contextvars.ContextVar("llm_platform", default=UNKNOWN_PLATFORM)
+
+@contextmanager
+def platform_scope(platform):
+    """
+    在代码块内把模型调用计入指定平台
+
+    Args:
+        platform: 平台名称
+    """
+    token = _current_platform.set(platform)
+    try:
+        yield
+    finally:
+        _current_platform.reset(token)
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """
+    估算一次调用的费用
+
+    Args:
+        model: 模型名称
+        prompt_tokens: 输入token数
+        completion_tokens: 输出token数
+
+    Returns:
+        float: 费用（美元），未配置价格的模型返回0
+    """
+    prices = AI_PRICING.get(model)
+    if prices is None:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1000
+
+def _empty_totals():
+    return {
+        "calls": 0,
+        "errors": 0,
+        "cache_hits": 0,
+        "jobs": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_seconds": 0.0,
+        "cost": 0.0,
+    }
+
+class LLMMetrics:
+    """
+    进程内的模型调用统计，线程安全
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._unpriced = set()
+        self.reset()
+
+    def reset(self):
+        """开始新一轮运行时清空统计"""
+        with self._lock:
+            self.started_at = datetime.now()
+            self._totals = {}
+
+    def _bucket(self, kind):
+        """当前平台、调用类型的统计项，调用方需持有锁"""
+        platform = self._totals.setdefault(_current_platform.get(), {})
+        return platform.setdefault(kind, _empty_totals())
+
+    def record_call(self, kind, model, latency, usage=None, jobs=1, error=False):
+        """
+        记录一次模型调用
+
+        Args:
+            kind: 调用类型，如 "relevance"、"greeting"
+            model: 模型名称
+            latency: 耗时（秒）
+            usage: 响应中的 usage，失败或接口未返回时为None
+            jobs: 本次调用处理的职位数
+            error: 调用是否失败
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+
+        with self._lock:
+            bucket = self._bucket(kind)
+            bucket["calls"] += 1
+            bucket["errors"] += int(error)
+            bucket["jobs"] += 0 if error else jobs
+            bucket["prompt_tokens"] += prompt_tokens
+            bucket["completion_tokens"] += completion_tokens
+            bucket["latency_seconds"] += latency
+            bucket["cost"] += cost
+            if model not in AI_PRICING and model not in self._unpriced:
+                self._unpriced.add(model)
+                logger.warning(f"未配置模型 {model} 的价格，费用按0统计")
+
+        logger.debug(f"模型调用 {kind}: {model}，耗时 {latency:.2f} 秒，"
+                     f"token {prompt_tokens}+{completion_tokens}，费用 ${cost:.4f}")
+
+    def record_cache_hit(self, kind, jobs=1):
+        """
+        记录命中缓存、未调用模型的职位
+
+        Args:
+            kind: 调用类型
+            jobs: 命中的职位数
+        """
+        with self._lock:
+            self._bucket(kind)["cache_hits"] += jobs
+
+    @contextmanager
+    def track(self, kind, model, jobs=1):
+        """
+        统计代码块内的一次模型调用，把响应的 usage 写入产出的字典
+
+        Args:
+            kind: 调用类型
+            model: 模型名称
+            jobs: 本次调用处理的职位数
+
+        Yields:
+            dict: 调用方在收到响应后设置 call["usage"]
+        """
+        call = {"usage": None}
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            self.record_call(kind, model, time.perf_counter() - start, call["usage"], jobs, error=True)
+            raise
+        self.record_call(kind, model, time.perf_counter() - start, call["usage"], jobs)
+
+    def summary(self):
+        """
+        按平台汇总的统计
+
+        Returns:
+            dict: {平台: {调用类型: 统计项}}，每个平台另有 "total" 项
+        """
+        with self._lock:
+            result = {}
+            for platform, kinds in self._totals.items():
+                total = _empty_totals()
+                for totals in kinds.values():
+                    for key, value in totals.items():
+                        total[key] += value
+                result[platform] = {**{kind: dict(totals) for kind, totals in kinds.items()}, "total": total}
+            return result
+
+    def format_summary(self, names=None, platform=None):
+        """
+        生成统计总结
+
+        Args:
+            names: {平台: 显示名称}
+            platform: 只输出指定平台，默认输出全部平台
+
+        Returns:
+            str: 总结文本，没有模型调用时返回空字符串
+        """
+        names = names or {}
+        lines = []
+        for name, kinds in self.summary().items():
+            if platform is not None and name != platform:
+                continue
+            total = kinds["total"]
+            if not total["calls"] and not total["cache_hits"]:
+                continue
+            # 每个职位的费用按参与匹配分析的职位数（含命中缓存的）平摊全部费用，包括打招呼语
+            scored = sum(totals["jobs"] + totals["cache_hits"]
+                         for kind, totals in kinds.items() if kind.startswith("relevance"))
+            per_job = total["cost"] / scored if scored else 0.0
+            lines.append(
+                f"{names.get(name, '其他' if name == UNKNOWN_PLATFORM else name)} AI调用: {total['calls']} 次（失败 {total['errors']}），"
+                f"缓存命中 {total['cache_hits']}，耗时 {total['latency_seconds']:.1f} 秒，"
+                f"token {total['prompt_tokens']}+{total['completion_tokens']}，"
+                f"费用约 ${total['cost']:.4f}（每个职位 ${per_job:.4f}）"
+            )
+        return "\n".join(lines)
+
+    def save(self):
+        """把本轮运行的统计追加保存到 data/llm_metrics.json"""
+        summary = self.summary()
+        if not summary:
+            return
+        try:
+            with file_lock(METRICS_FILE):
+                runs = load_data(METRICS_FILE, [])
+                runs.append({
+                    "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "platforms": summary,
+                })
+                save_data(runs[-MAX_RUNS:], METRICS_FILE)
+        except Exception as e:
+            logger.error(f"保存AI调用统计失败: {e}")
+
+_metrics = LLMMetrics()
+
+def get_llm_metrics():
+    """获取进程内共享的模型调用统计"""
+    return _metrics
@@ -6,14 +6,18 @@ import sys
 import time
 import logging
 import argparse
+import functools
 import schedule
 from datetime import datetime, timedelta
 
-from config import PLATFORMS, SCHEDULE_CONFIG
+from config import PLATFORMS, SCHEDULE_CONFIG, CONCURRENCY_CONFIG, APPLY_QUEUE_CONFIG
 from utils import ensure_dir, send_wechat_notification, is_time_between, random_delay
 from platforms.boss import BossZhipin
 from platforms.other_platforms import ZhilianZhaopin, QianChengWuYou, LagouWang
 from cookie_extractor import CookieExtractor
+from platform_runner import run_platforms, summarize_results, RUN_MODES
+from apply_queue import ApplyQueue
+from llm_metrics import get_llm_metrics, platform_scope
 
 # 设置日志
 def setup_logging():
@@ -56,9 +60,41 @@ def create_directories():
             except Exception as e:
                 logger.error(f"创建示例文件失败: {target}, 错误: {str(e)}")
 
+# 平台类及显示名称
+PLATFORM_CLASSES = {
+    "boss": (BossZhipin, "Boss直聘"),
+    "zhilian": (ZhilianZhaopin, "智联招聘"),
+    "qiancheng": (QianChengWuYou, "前程无忧"),
+    "lagou": (LagouWang, "拉勾网"),
+}
+
+# 运行单个平台
+def run_platform(name, apply_queue=None):
+    """运行指定平台的求职流程，模块级函数，可在子进程中运行；提供 apply_queue 时只收集职位"""
+    platform_class, display_name = PLATFORM_CLASSES[name]
+    try:
+        # 本平台的AI调用计入本平台的统计
+        with platform_scope(name):
+            return platform_class().run(apply_queue=apply_queue)
+    except Exception as e:
+        logger.error(f"运行{display_name}出错: {str(e)}")
+        return False
+    finally:
+        # 进程模式下各平台的统计只在子进程中，在这里输出
+        llm_summary = get_llm_metrics().format_summary({name: display_name}, platform=name)
+        if llm_summary:
+            logger.info(llm_summary)
+
 # 单次运行所有平台
-def run_all_platforms():
-    """运行所有启用的平台进行求职"""
+def run_all_platforms(concurrent=None, mode=None, prioritize=None):
+    """
+    运行所有启用的平台进行求职
+    
+    参数:
+    - concurrent: 是否并发运行各平台，默认使用 CONCURRENCY_CONFIG
+    - mode: 并发模式，thread 或 process，默认使用 CONCURRENCY_CONFIG
+    - prioritize: 是否先收集所有平台的职位再按匹配度统一投递，默认使用 APPLY_QUEUE_CONFIG
+    """
     logger.info("开始运行所有平台")
     
     # 检查当前时间是否在允许的时间范围内
@@ -69,57 +105,67 @@ def run_all_platforms():
         logger.info(f"当前时间不在允许的时间范围内 ({SCHEDULE_CONFIG.get('start_time', '不限')} - {SCHEDULE_CONFIG.get('end_time', '不限')})")
         return
     
-    success_count = 0
-    platforms_count = 0
-    
-    # Boss直聘
-    if PLATFORMS["boss"]["enabled"]:
-        platforms_count += 1
-        try:
-            boss = BossZhipin()
-            if boss.run():
-                success_count += 1
-        except Exception as e:
-            logger.error(f"运行Boss直聘出错: {str(e)}")
-    
-    # 智联招聘
-    if PLATFORMS["zhilian"]["enabled"]:
-        platforms_count += 1
-        try:
-            zhilian = ZhilianZhaopin()
-            if zhilian.run():
-                success_count += 1
-        except Exception as e:
-            logger.error(f"运行智联招聘出错: {str(e)}")
-    
-    # 前程无忧
-    if PLATFORMS["qiancheng"]["enabled"]:
-        platforms_count += 1
-        try:
-            qiancheng = QianChengWuYou()
-            if qiancheng.run():
-                success_count += 1
-        except Exception as e:
-            logger.error(f"运行前程无忧出错: {str(e)}")
-    
-    # 拉勾网
-    if PLATFORMS["lagou"]["enabled"]:
-        platforms_count += 1
-        try:
-            lagou = LagouWang()
-            if lagou.run():
-                success_count += 1
-        except Exception as e:
-            logger.error(f"运行拉勾网出错: {str(e)}")
+    if concurrent is None:
+        concurrent = CONCURRENCY_CONFIG["enabled"]
+    if mode is None:
+        mode = CONCURRENCY_CONFIG["mode"]
+    if prioritize is None:
+        prioritize = APPLY_QUEUE_CONFIG["enabled"]
+    
+    apply_queue = None
+    if prioritize:
+        if concurrent and mode == "process":
+            logger.warning("按匹配度统一投递需要各平台在同一进程中运行，改用 thread 模式")
+            mode = "thread"
+        apply_queue = ApplyQueue(APPLY_QUEUE_CONFIG["global_limit"], APPLY_QUEUE_CONFIG["default_score"])
+    
+    # 每个平台独立运行，一个平台出错不影响其他平台
+    get_llm_metrics().reset()
+    tasks = {
+        name: functools.partial(run_platform, name, apply_queue=apply_queue)
+        for name in PLATFORM_CLASSES
+        if PLATFORMS[name]["enabled"]
+    }
+    start_time = time.time()
+    results = run_platforms(tasks, concurrent=concurrent, mode=mode)
+    
+    # 所有平台收集完成后按匹配度统一投递
+    apply_results = apply_queue.drain() if apply_queue is not None else {}
+    elapsed = time.time() - start_time
+    
+    success_count = sum(1 for result in results.values() if result["success"])
+    platforms_count = len(results)
+    names = {name: display_name for name, (_, display_name) in PLATFORM_CLASSES.items()}
     
     # 发送运行总结
-    summary = f"本次运行总结:\n启用平台数: {platforms_count}\n成功运行: {success_count}\n时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    lines = [
+        "本次运行总结:",
+        f"启用平台数: {platforms_count}",
+        f"成功运行: {success_count}",
+        f"运行方式: {'并发（' + mode + '）' if concurrent else '顺序'}",
+        summarize_results(results, elapsed, names),
+    ]
+    for name, item in apply_results.items():
+        lines.append(f"{names.get(name, name)}: 入队 {item['queued']}，按匹配度投递 {item['applied']}")
+    llm_summary = get_llm_metrics().format_summary(names)
+    if llm_summary:
+        lines.append(llm_summary)
+    get_llm_metrics().save()
+    lines.append(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    summary = "\n".join(lines)
     logger.info(summary.replace("\n", " | "))
     send_wechat_notification("智能求职助手运行总结", summary)
 
 # 定时任务
-def schedule_jobs():
-    """设置定时任务"""
+def schedule_jobs(concurrent=None, mode=None, prioritize=None):
+    """
+    设置定时任务
+    
+    参数:
+    - concurrent: 是否并发运行各平台
+    - mode: 并发模式
+    - prioritize: 是否按匹配度跨平台统一投递
+    """
     if not SCHEDULE_CONFIG["enabled"]:
         logger.info("定时任务已禁用")
         return
@@ -128,10 +174,10 @@ def schedule_jobs():
     interval_minutes = SCHEDULE_CONFIG["interval_minutes"]
     
     logger.info(f"设置定时任务，间隔时间: {interval_minutes}分钟")
-    schedule.every(interval_minutes).minutes.do(run_all_platforms)
+    schedule.every(interval_minutes).minutes.do(run_all_platforms, concurrent=concurrent, mode=mode, prioritize=prioritize)
     
     # 立即运行一次
-    run_all_platforms()
+    run_all_platforms(concurrent=concurrent, mode=mode, prioritize=prioritize)
     
     # 持续运行定时任务
     while True:
@@ -198,6 +244,9 @@ def main():
     parser.add_argument("--run-once", action="store_true", help="立即运行一次")
     parser.add_argument("--cookie", action="store_true", help="提取Cookie")
     parser.add_argument("--cookie-headless", action="store_true", help="无头模式提取Cookie（不显示浏览器）")
+    parser.add_argument("--concurrent", action="store_true", default=None, help="并发运行各平台（默认使用配置 CONCURRENT_PLATFORMS）")
+    parser.add_argument("--concurrent-mode", choices=RUN_MODES, default=None, help="并发模式（默认使用配置 CONCURRENT_MODE）")
+    parser.add_argument("--priority", action="store_true", default=None, help="先收集所有平台的职位，再按匹配度统一投递（默认使用配置 PRIORITY_APPLY）")
     args = parser.parse_args()
     
     # 创建必要的目录
@@ -216,9 +265,9 @@ def main():
     
     try:
         if args.schedule:
-            schedule_jobs()
+            schedule_jobs(concurrent=args.concurrent, mode=args.concurrent_mode, prioritize=args.priority)
         elif args.run_once:
-            run_all_platforms()
+            run_all_platforms(concurrent=args.concurrent, mode=args.concurrent_mode, prioritize=args.priority)
         else:
             parser.print_help()
     except KeyboardInterrupt:
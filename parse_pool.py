@@ -0,0 +1,147 @@
+"""
+HTML解析进程池
+
+BeautifulSoup解析受GIL限制，并发抓取时详情页解析只能占满一个CPU核心。
+此模块把原始页面字节发送到常驻的ProcessPoolExecutor中，由子进程运行各平台的
+字段提取函数，只把紧凑的字段元组传回主进程。
+
+进程池在首次使用时创建并一直保留，定时任务多次运行时复用已预热的子进程。
+"""
+
+import os
+import atexit
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _init_worker():
+    """子进程初始化，提前导入解析库，避免首个任务承担导入开销"""
+    import bs4  # noqa: F401
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        pass
+
+def _run_extractor(extractor, content, encoding, args):
+    """在子进程中解码页面并运行字段提取函数"""
+    if isinstance(content, bytes):
+        text = content.decode(encoding or "utf-8", errors="replace")
+    else:
+        text = content
+    return extractor(text, *args)
+
+def resolve_workers(workers):
+    """
+    解析进程数配置
+
+    Args:
+        workers: 配置的进程数，0表示不使用进程池，-1表示使用全部CPU核心
+
+    Returns:
+        int: 实际使用的进程数
+    """
+    try:
+        workers = int(workers or 0)
+    except (TypeError, ValueError):
+        return 0
+    if workers < 0:
+        return os.cpu_count() or 1
+    return workers
+
+def get_parse_pool(workers):
+    """
+    获取共享的解析进程池
+
+    Args:
+        workers: 进程数
+
+    Returns:
+        ProcessPoolExecutor: 进程池，进程数不大于0时返回None
+    """
+    global _pool, _pool_workers
+
+    workers = resolve_workers(workers)
+    if workers <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            logger.info(f"解析进程数变更 {_pool_workers} -> {workers}，重建进程池")
+            _pool.shutdown(wait=True)
+            _pool = None
+
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            _pool_workers = workers
+            # 预热子进程
+            for future in [_pool.submit(os.getpid) for _ in range(workers)]:
+                future.result()
+            logger.info(f"解析进程池已启动，进程数: {workers}")
+
+        return _pool
+
+def shutdown_parse_pool():
+    """关闭共享的解析进程池"""
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+            _pool_workers = 0
+            logger.info("解析进程池已关闭")
+
+atexit.register(shutdown_parse_pool)
+
+def parse_page(extractor, content, encoding=None, workers=0, args=()):
+    """
+    解析单个页面
+
+    Args:
+        extractor: 模块级字段提取函数，接收页面文本和额外参数
+        content: 原始页面字节
+        encoding: 页面编码
+        workers: 进程数，为0时在当前线程直接解析
+        args: 传给提取函数的额外参数
+
+    Returns:
+        提取函数的返回值
+    """
+    pool = get_parse_pool(workers)
+    if pool is None:
+        return _run_extractor(extractor, content, encoding, args)
+
+    try:
+        return pool.submit(_run_extractor, extractor, content, encoding, args).result()
+    except Exception as e:
+        # 子进程异常退出等情况下退回本地解析
+        logger.warning(f"进程池解析失败，改为本地解析: {e}")
+        return _run_extractor(extractor, content, encoding, args)
+
+def parse_pages(extractor, contents, encoding=None, workers=0, args=()):
+    """
+    批量解析页面，结果顺序与输入一致
+
+    Args:
+        extractor: 模块级字段提取函数
+        contents: 原始页面字节列表
+        encoding: 页面编码
+        workers: 进程数，为0时在当前线程依次解析
+        args: 传给提取函数的额外参数
+
+    Returns:
+        list: 提取结果列表
+    """
+    pool = get_parse_pool(workers)
+    if pool is None:
+        return [_run_extractor(extractor, content, encoding, args) for content in contents]
+
+    futures = [pool.submit(_run_extractor, extractor, content, encoding, args) for content in contents]
+    return [future.result() for future in futures]
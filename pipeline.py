@@ -0,0 +1,160 @@
+"""
+流式阶段流水线
+
+把 搜索 → 初筛 → 详情 → 评分 → 投递 各阶段用有界队列连接起来，每个阶段在独立线程中运行，
+投递在调用线程中执行。某个职位通过所有阶段后即可投递，不必等到所有页面都搜索完毕；
+有界队列同时限制了在途职位数量，峰值内存不再随搜索结果总数增长。
+批量阶段（如AI批量评分）一次处理多个输入，最多等待 batch_wait 秒凑满一批。
+"""
+
+import time
+import queue
+import logging
+import threading
+import contextvars
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 流结束标记
+_END = object()
+
+# 队列等待的轮询间隔（秒），用于及时响应停止信号
+_POLL_INTERVAL = 0.5
+
+def run_pipeline(source, stages, sink, buffer_size=20, name="流水线", batch_wait=10):
+    """
+    运行流水线
+
+    Args:
+        source: 可迭代对象（通常是生成器），产出第一个阶段的输入
+        stages: [(阶段名, 处理函数)] 列表，处理函数接收一个输入，返回0个或多个输出的可迭代对象；
+            批量阶段写作 (阶段名, 处理函数, 批量大小)，处理函数接收输入列表
+        sink: 最终处理函数，在调用线程中依次接收最后一个阶段的输出，返回False时停止整个流水线
+        buffer_size: 每个阶段之间队列的容量
+        name: 流水线名称，用于日志
+        batch_wait: 批量阶段收到第一个输入后最多等待多少秒凑满一批
+
+    Returns:
+        dict: 运行统计，包含各阶段输入输出数量、最终处理数量和首个结果到达耗时
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=buffer_size) for _ in range(len(stages) + 1)]
+    stats = {
+        "source": 0,
+        "stages": {stage[0]: {"in": 0, "out": 0} for stage in stages},
+        "sink": 0,
+        "first_output_seconds": None,
+        "elapsed_seconds": None,
+        "stopped_early": False,
+    }
+
+    def put(q, item):
+        """放入队列，停止时放弃"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        """从队列取出，停止且队列为空时返回结束标记"""
+        while True:
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if stop.is_set():
+                    return _END
+
+    def get_batch(q, size):
+        """取出一批输入，凑满一批、等待超时或上游结束时返回；返回的布尔值表示上游是否已结束"""
+        item = get(q)
+        if item is _END:
+            return [], True
+        
+        items = [item]
+        deadline = time.time() + batch_wait
+        while len(items) < size and not stop.is_set():
+            try:
+                item = q.get(timeout=max(0, min(_POLL_INTERVAL, deadline - time.time())))
+            except queue.Empty:
+                if time.time() >= deadline:
+                    break
+                continue
+            if item is _END:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def run_source():
+        try:
+            for item in source:
+                stats["source"] += 1
+                if not put(queues[0], item):
+                    break
+        except Exception as e:
+            logger.error(f"{name}数据源出错: {e}")
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+            put(queues[0], _END)
+
+    def run_stage(index, stage_name, func, batch_size=None):
+        in_queue, out_queue = queues[index], queues[index + 1]
+        stage_stats = stats["stages"][stage_name]
+        ended = False
+        while not ended and not stop.is_set():
+            if batch_size:
+                item, ended = get_batch(in_queue, batch_size)
+                if not item:
+                    break
+                stage_stats["in"] += len(item)
+            else:
+                item = get(in_queue)
+                if item is _END:
+                    break
+                stage_stats["in"] += 1
+            try:
+                outputs = func(item) or []
+            except Exception as e:
+                logger.error(f"{name}{stage_name}阶段处理失败: {e}")
+                continue
+            for output in outputs:
+                stage_stats["out"] += 1
+                if not put(out_queue, output):
+                    break
+        put(out_queue, _END)
+
+    # 各阶段线程继承调用线程的上下文（如AI调用统计所属的平台）
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(run_source,),
+                                name=f"{name}-source", daemon=True)]
+    for index, stage in enumerate(stages):
+        threads.append(threading.Thread(target=contextvars.copy_context().run, args=(run_stage, index, *stage),
+                                        name=f"{name}-{stage[0]}", daemon=True))
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = get(queues[-1])
+            if item is _END:
+                break
+            stats["sink"] += 1
+            if stats["first_output_seconds"] is None:
+                stats["first_output_seconds"] = round(time.time() - start, 1)
+                logger.info(f"{name}首个结果到达，耗时 {stats['first_output_seconds']} 秒")
+            if sink(item) is False:
+                stats["stopped_early"] = True
+                break
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        stats["elapsed_seconds"] = round(time.time() - start, 1)
+
+    logger.info(f"{name}运行完成: {stats}")
+    return stats
@@ -0,0 +1,101 @@
+"""
+多平台运行器
+
+各平台的求职流程耗时主要花在请求间的随机延迟上，相互之间没有依赖。
+并发模式下每个平台在独立的线程或进程中运行，一个平台出错不影响其他平台，
+整轮运行耗时约等于最慢平台的耗时，而不是所有平台耗时之和。
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 支持的并发模式
+RUN_MODES = ("thread", "process")
+
+def _run_task(name, func):
+    """运行单个平台，捕获所有异常，返回运行结果"""
+    start = time.time()
+    try:
+        success = bool(func())
+        error = None
+    except Exception as e:
+        logger.error(f"{name} 运行出错: {e}")
+        success = False
+        error = str(e)
+    return {
+        "success": success,
+        "error": error,
+        "elapsed_seconds": round(time.time() - start, 1),
+    }
+
+def run_platforms(tasks, concurrent=False, mode="thread", max_workers=None):
+    """
+    运行多个平台
+
+    Args:
+        tasks: {平台名: 运行函数}，运行函数无参数并返回是否成功；进程模式下必须是模块级函数
+        concurrent: 是否并发运行，False时按顺序依次运行
+        mode: 并发模式，thread 或 process
+        max_workers: 最大并发数，默认每个平台一个
+
+    Returns:
+        dict: {平台名: {"success": 是否成功, "error": 错误信息, "elapsed_seconds": 耗时}}，顺序与 tasks 一致
+    """
+    if not tasks:
+        return {}
+
+    if not concurrent:
+        return {name: _run_task(name, func) for name, func in tasks.items()}
+
+    if mode not in RUN_MODES:
+        logger.warning(f"未知的并发模式 {mode}，改用 thread")
+        mode = "thread"
+
+    executor_class = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    results = {}
+    logger.info(f"并发运行 {len(tasks)} 个平台，模式: {mode}")
+
+    with executor_class(max_workers=max_workers or len(tasks)) as executor:
+        futures = {executor.submit(_run_task, name, func): name for name, func in tasks.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                # 子进程崩溃或运行函数无法序列化等情况
+                logger.error(f"{name} 运行失败: {e}")
+                results[name] = {"success": False, "error": str(e), "elapsed_seconds": None}
+            logger.info(f"{name} 运行{'成功' if results[name]['success'] else '失败'}，"
+                        f"耗时 {results[name]['elapsed_seconds']} 秒")
+
+    return {name: results[name] for name in tasks}
+
+def summarize_results(results, elapsed_seconds, names=None):
+    """
+    生成多平台运行总结
+
+    Args:
+        results: run_platforms 的返回值
+        elapsed_seconds: 整轮运行的实际耗时
+        names: {平台名: 显示名称}
+
+    Returns:
+        str: 总结文本
+    """
+    names = names or {}
+    success_count = sum(1 for result in results.values() if result["success"])
+    serial_seconds = sum(result["elapsed_seconds"] or 0 for result in results.values())
+
+    lines = [f"成功 {success_count} 个，失败 {len(results) - success_count} 个"]
+    for name, result in results.items():
+        status = "成功" if result["success"] else "失败"
+        line = f"{names.get(name, name)}: {status}，耗时 {result['elapsed_seconds']} 秒"
+        if result["error"]:
+            line += f"，错误: {result['error']}"
+        lines.append(line)
+    lines.append(f"总耗时 {round(elapsed_seconds, 1)} 秒（各平台耗时之和 {round(serial_seconds, 1)} 秒）")
+    return "\n".join(lines)
@@ -1,5 +1,6 @@
 import os
 import json
+import math
 import time
 import logging
 import base64
@@ -16,18 +17,199 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from playwright.sync_api import sync_playwright
 
-from config import PLATFORMS, USER_PREFERENCES, FILTER_CONFIG
+from config import PLATFORMS, USER_PREFERENCES, FILTER_CONFIG, PARSE_CONFIG, PIPELINE_CONFIG, DEDUP_CONFIG, AI_CONFIG, GREETING_PREFETCH_CONFIG
 from utils import (
     make_request, random_delay, update_blacklist,
     record_job_application, is_job_applied, send_wechat_notification,
     load_data, save_data, ensure_dir
 )
-from ai_module import analyze_job_relevance, generate_greeting_message
+from ai_module import analyze_job_relevance, generate_greeting_message, filter_jobs_by_ai
 from city_codes import get_city_code, BOSS_CITY_CODES
+from parse_pool import parse_page
+from text_normalizer import normalize_job, normalize_text, job_text, KeywordMatcher
+from job_requirements import evaluate_jobs
+from pipeline import run_pipeline
+from filter_planner import FilterPlan, FilterRule, LISTING, DETAIL, AI
+from watermark import CrawlWatermark
+from checkpoint import RunCheckpoint, DISCOVERED, DETAILED, FILTERED, SCORED, APPLIED, REJECTED
+from dedup import get_dedup_index
+from request_budget import RequestBudget, SEARCH_REQUEST, DETAIL_REQUEST, APPLY_REQUEST
+from rate_limiter import get_rate_limiter
+from search_grid import build_queries, iter_grid
+from ai_cache import get_ai_cache, get_greeting_cache, content_hash
+from greeting_prefetch import GreetingPrefetcher
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.zhipin.com"
+
+# 格式化后的简历文本，按简历内容哈希缓存，定时任务多次运行时不再重复拼接
+_profile_texts = {}
+
+# 每页职位数，用于按请求预算估算翻页深度
+PAGE_SIZE = 30
+
+# 城市代码到城市名称
+_BOSS_CITY_NAMES = {code: name for name, code in BOSS_CITY_CODES.items()}
+
+
+def parse_search_page(html, base_url=BASE_URL):
+    """
+    解析职位搜索结果页
+    
+    参数:
+    - html: 搜索结果页HTML
+    - base_url: 职位链接的站点前缀
+    
+    返回:
+    - jobs: 职位列表，页面中没有职位列表时返回None
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    job_list_div = soup.find('div', class_='job-list')
+    
+    if not job_list_div:
+        return None
+    
+    job_items = job_list_div.find_all('li')
+    jobs = []
+    
+    for item in job_items:
+        try:
+            # 提取职位ID
+            job_card = item.find('div', class_='job-card-body')
+            if not job_card:
+                continue
+            
+            job_url = job_card.find('a')['href']
+            job_id = job_url.split('/')[-1].split('.')[0]
+            
+            # 提取职位标题
+            title_div = job_card.find('div', class_='job-title')
+            title = title_div.text.strip() if title_div else "未知职位"
+            
+            # 提取公司名称
+            company_div = item.find('div', class_='company-name')
+            company = company_div.a.text.strip() if company_div and company_div.a else "未知公司"
+            
+            # 提取薪资
+            salary_div = item.find('div', class_='salary')
+            salary = salary_div.text.strip() if salary_div else "薪资面议"
+            
+            # 提取经验和学历要求
+            tag_div = item.find('div', class_='tag-list')
+            tags = [span.text.strip() for span in tag_div.find_all('span')] if tag_div else []
+            experience = tags[0] if len(tags) > 0 else ""
+            education = tags[1] if len(tags) > 1 else ""
+            
+            # 提取HR信息
+            hr_div = item.find('div', class_='info-public')
+            hr_name = ""
+            hr_title = ""
+            hr_active = ""
+            
+            if hr_div:
+                hr_name_span = hr_div.find('span', class_='name')
+                hr_name = hr_name_span.text.strip() if hr_name_span else ""
+                
+                hr_title_span = hr_div.find('span', class_='title')
+                hr_title = hr_title_span.text.strip() if hr_title_span else ""
+                
+                hr_active_span = hr_div.find('span', class_='active')
+                hr_active = hr_active_span.text.strip() if hr_active_span else ""
+            
+            # 构建职位信息
+            job_info = {
+                "id": job_id,
+                "title": title,
+                "company": company,
+                "salary": salary,
+                "experience": experience,
+                "education": education,
+                "hr_name": hr_name,
+                "hr_title": hr_title,
+                "hr_active": hr_active,
+                "url": f"{base_url}{job_url}",
+                "platform": "boss"
+            }
+            
+            jobs.append(job_info)
+        except Exception as e:
+            logger.error(f"解析职位信息失败: {str(e)}")
+    
+    return jobs
+
+def extract_detail_fields(html):
+    """
+    提取职位详情页字段
+    
+    参数:
+    - html: 职位详情页HTML
+    
+    返回:
+    - fields: (职位描述, 公司规模, 公司行业)，页面中缺少的字段为None
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # 提取职位描述
+    description_div = soup.find('div', class_='job-sec-text')
+    description = description_div.text.strip() if description_div else "无职位描述"
+    
+    # 提取公司信息
+    company_div = soup.find('div', class_='company-info')
+    scale = None
+    industry = None
+    
+    if company_div:
+        # 公司规模
+        scale_div = company_div.find('div', text='规模')
+        if scale_div and scale_div.find_next_sibling('div'):
+            scale = scale_div.find_next_sibling('div').text.strip()
+        
+        # 公司行业
+        industry_div = company_div.find('div', text='行业')
+        if industry_div and industry_div.find_next_sibling('div'):
+            industry = industry_div.find_next_sibling('div').text.strip()
+    
+    return (description, scale, industry)
+
+def build_job_detail(fields, job_id):
+    """
+    由字段元组构建职位详情
+    
+    参数:
+    - fields: extract_detail_fields 返回的字段元组
+    - job_id: 职位ID
+    
+    返回:
+    - job_detail: 职位详情
+    """
+    description, scale, industry = fields
+    company_info = {}
+    if scale is not None:
+        company_info['scale'] = scale
+    if industry is not None:
+        company_info['industry'] = industry
+    
+    return {
+        "id": job_id,
+        "description": description,
+        "company_info": company_info
+    }
+
+def parse_job_detail(html, job_id):
+    """
+    解析职位详情页
+    
+    参数:
+    - html: 职位详情页HTML
+    - job_id: 职位ID
+    
+    返回:
+    - job_detail: 职位详情
+    """
+    return build_job_detail(extract_detail_fields(html), job_id)
+
 class BossZhipin:
     """Boss直聘平台操作类"""
     
@@ -37,7 +219,7 @@ class BossZhipin:
         self.user_id = self.config["user_id"]
         self.resume_path = self.config["resume_path"]
         self.daily_limit = self.config["daily_limit"]
-        self.base_url = "https://www.zhipin.com"
+        self.base_url = BASE_URL
         self.api_url = "https://www.zhipin.com/wapi"
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36",
@@ -45,6 +227,27 @@ class BossZhipin:
             "Referer": "https://www.zhipin.com/",
             "Connection": "keep-alive",
         }
+        self.blacklist_matcher = KeywordMatcher(FILTER_CONFIG["blacklist_keywords"])
+        # 跨平台重复职位索引，各平台共享
+        self.dedup = get_dedup_index()
+        # 每日请求预算，与其他Boss直聘实现共用
+        self.budget = RequestBudget("boss")
+        # 与其他Boss直聘实现共用的请求限速器，搜索、详情、打招呼和投递等所有请求都经过它，并发时请求间隔不变
+        self.rate_limiter = get_rate_limiter(self.base_url, *self.config.get("request_interval", (2, 5)))
+        # 打招呼语在评分期间提前生成，投递时直接取用
+        self.greetings = GreetingPrefetcher(
+            generate_greeting_message,
+            workers=GREETING_PREFETCH_CONFIG["workers"],
+            min_prerank_score=GREETING_PREFETCH_CONFIG["min_prerank_score"],
+            max_pending=GREETING_PREFETCH_CONFIG["max_pending"],
+            ttl_minutes=GREETING_PREFETCH_CONFIG["ttl_minutes"],
+            enabled=GREETING_PREFETCH_CONFIG["enabled"],
+        )
+        self.filter_plan = self.build_filter_plan()
+        # 增量抓取水位线，跳过上次运行已见过的职位
+        self.watermark = CrawlWatermark("boss", enabled=self.config.get("incremental_crawl", True))
+        # 运行检查点，中途退出后下次运行从各职位最后完成的阶段继续
+        self.checkpoint = RunCheckpoint("boss", enabled=self.config.get("resume_checkpoint", True))
         # 确保目录存在
         ensure_dir("data/boss")
         
@@ -52,6 +255,7 @@ class BossZhipin:
         """检查登录状态"""
         try:
             url = f"{self.api_url}/zpgeek/user/recommend.json"
+            self.rate_limiter.wait()
             response = make_request(url, headers=self.headers)
             data = response.json()
             
@@ -75,6 +279,7 @@ class BossZhipin:
             
             # 如果没有缓存，则从API获取
             url = f"{self.api_url}/zpgeek/resume/preview.json"
+            self.rate_limiter.wait()
             response = make_request(url, headers=self.headers)
             data = response.json()
             
@@ -92,45 +297,61 @@ class BossZhipin:
             return {}
     
     def format_user_profile(self, profile):
-        """将用户简历格式化为文本"""
+        """
+        将用户简历格式化为文本，同一份简历只格式化一次
+        
+        参数:
+        - profile: 简历信息
+        
+        返回:
+        - text: 简历文本
+        """
         if not profile:
             return "无法获取求职者简历信息"
         
-        text = "## 求职者简历\n"
+        profile_hash = content_hash(json.dumps(profile, sort_keys=True, ensure_ascii=False))
+        text = _profile_texts.get(profile_hash)
+        if text is not None:
+            return text
         
         # 基本信息
-        text += f"### 基本信息\n"
-        text += f"- 姓名: {profile.get('name', '未知')}\n"
-        text += f"- 年龄: {profile.get('age', '未知')}\n"
-        text += f"- 工作年限: {profile.get('workExpYear', '未知')}\n"
-        text += f"- 学历: {profile.get('education', '未知')}\n"
+        lines = [
+            "## 求职者简历",
+            "### 基本信息",
+            f"- 姓名: {profile.get('name', '未知')}",
+            f"- 年龄: {profile.get('age', '未知')}",
+            f"- 工作年限: {profile.get('workExpYear', '未知')}",
+            f"- 学历: {profile.get('education', '未知')}",
+        ]
         
         # 工作经历
-        if "workExperienceList" in profile and profile["workExperienceList"]:
-            text += f"\n### 工作经历\n"
+        if profile.get("workExperienceList"):
+            lines.append("\n### 工作经历")
             for exp in profile["workExperienceList"]:
-                text += f"- {exp.get('company', '未知公司')} | {exp.get('position', '未知职位')} | {exp.get('startDate', '')} - {exp.get('endDate', '至今')}\n"
-                text += f"  {exp.get('description', '无职责描述')}\n"
+                lines.append(f"- {exp.get('company', '未知公司')} | {exp.get('position', '未知职位')} | {exp.get('startDate', '')} - {exp.get('endDate', '至今')}")
+                lines.append(f"  {exp.get('description', '无职责描述')}")
         
         # 项目经历
-        if "projectExperienceList" in profile and profile["projectExperienceList"]:
-            text += f"\n### 项目经历\n"
+        if profile.get("projectExperienceList"):
+            lines.append("\n### 项目经历")
             for proj in profile["projectExperienceList"]:
-                text += f"- {proj.get('projectName', '未知项目')} | {proj.get('startDate', '')} - {proj.get('endDate', '至今')}\n"
-                text += f"  {proj.get('description', '无项目描述')}\n"
+                lines.append(f"- {proj.get('projectName', '未知项目')} | {proj.get('startDate', '')} - {proj.get('endDate', '至今')}")
+                lines.append(f"  {proj.get('description', '无项目描述')}")
         
         # 教育经历
-        if "educationList" in profile and profile["educationList"]:
-            text += f"\n### 教育经历\n"
+        if profile.get("educationList"):
+            lines.append("\n### 教育经历")
             for edu in profile["educationList"]:
-                text += f"- {edu.get('school', '未知学校')} | {edu.get('major', '未知专业')} | {edu.get('degree', '未知学历')} | {edu.get('startDate', '')} - {edu.get('endDate', '至今')}\n"
+                lines.append(f"- {edu.get('school', '未知学校')} | {edu.get('major', '未知专业')} | {edu.get('degree', '未知学历')} | {edu.get('startDate', '')} - {edu.get('endDate', '至今')}")
         
         # 技能标签
-        if "skillList" in profile and profile["skillList"]:
-            text += f"\n### 技能标签\n"
+        if profile.get("skillList"):
+            lines.append("\n### 技能标签")
             for skill in profile["skillList"]:
-                text += f"- {skill.get('name', '')}: {skill.get('level', '熟练')}\n"
+                lines.append(f"- {skill.get('name', '')}: {skill.get('level', '熟练')}")
         
+        text = "\n".join(lines) + "\n"
+        _profile_texts[profile_hash] = text
         return text
     
     def search_jobs(self, keyword, city="101010100", page=1, experience="", degree="", salary=""):
@@ -148,12 +369,16 @@ class BossZhipin:
         返回:
         - jobs: 职位列表
         """
+        if not self.budget.consume(SEARCH_REQUEST):
+            return []
+        self.rate_limiter.wait()
+        
         try:
             url = f"{self.base_url}/c{city}/"
             params = {
                 "query": keyword,
                 "page": page,
-                "ka": "page-{page}"
+                "ka": f"page-{page}"
             }
             
             if experience:
@@ -168,71 +393,11 @@ class BossZhipin:
             response = make_request(full_url, headers=self.headers)
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'lxml')
-            job_list_div = soup.find('div', class_='job-list')
-            
-            if not job_list_div:
+            jobs = parse_search_page(response.text, self.base_url)
+            if jobs is None:
                 logger.warning("没有找到职位列表")
                 return []
             
-            job_items = job_list_div.find_all('li')
-            jobs = []
-            
-            for item in job_items:
-                try:
-                    # 提取职位ID
-                    job_card = item.find('div', class_='job-card-body')
-                    if not job_card:
-                        continue
-                    
-                    job_url = job_card.find('a')['href']
-                    job_id = job_url.split('/')[-1].split('.')[0]
-                    
-                    # 提取职位标题
-                    title_div = job_card.find('div', class_='job-title')
-                    title = title_div.text.strip() if title_div else "未知职位"
-                    
-                    # 提取公司名称
-                    company_div = item.find('div', class_='company-name')
-                    company = company_div.a.text.strip() if company_div and company_div.a else "未知公司"
-                    
-                    # 提取薪资
-                    salary_div = item.find('div', class_='salary')
-                    salary = salary_div.text.strip() if salary_div else "薪资面议"
-                    
-                    # 提取HR信息
-                    hr_div = item.find('div', class_='info-public')
-                    hr_name = ""
-                    hr_title = ""
-                    hr_active = ""
-                    
-                    if hr_div:
-                        hr_name_span = hr_div.find('span', class_='name')
-                        hr_name = hr_name_span.text.strip() if hr_name_span else ""
-                        
-                        hr_title_span = hr_div.find('span', class_='title')
-                        hr_title = hr_title_span.text.strip() if hr_title_span else ""
-                        
-                        hr_active_span = hr_div.find('span', class_='active')
-                        hr_active = hr_active_span.text.strip() if hr_active_span else ""
-                    
-                    # 构建职位信息
-                    job_info = {
-                        "id": job_id,
-                        "title": title,
-                        "company": company,
-                        "salary": salary,
-                        "hr_name": hr_name,
-                        "hr_title": hr_title,
-                        "hr_active": hr_active,
-                        "url": f"{self.base_url}{job_url}",
-                        "platform": "boss"
-                    }
-                    
-                    jobs.append(job_info)
-                except Exception as e:
-                    logger.error(f"解析职位信息失败: {str(e)}")
-            
             logger.info(f"搜索到 {len(jobs)} 个职位")
             return jobs
         except Exception as e:
@@ -247,46 +412,125 @@ class BossZhipin:
         - job_id: 职位ID
         
         返回:
-        - job_detail: 职位详情
+        - job_detail: 职位详情，请求预算用完时返回None
         """
+        if not self.budget.consume(DETAIL_REQUEST):
+            return None
+        # 与搜索共用请求间隔，详情请求不会连续发出
+        self.rate_limiter.wait()
+        
         try:
             url = f"{self.base_url}/job_detail/{job_id}.html"
             response = make_request(url, headers=self.headers)
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # 提取职位描述
-            description_div = soup.find('div', class_='job-sec-text')
-            description = description_div.text.strip() if description_div else "无职位描述"
-            
-            # 提取公司信息
-            company_div = soup.find('div', class_='company-info')
-            company_info = {}
-            
-            if company_div:
-                # 公司规模
-                scale_div = company_div.find('div', text='规模')
-                if scale_div and scale_div.find_next_sibling('div'):
-                    company_info['scale'] = scale_div.find_next_sibling('div').text.strip()
-                
-                # 公司行业
-                industry_div = company_div.find('div', text='行业')
-                if industry_div and industry_div.find_next_sibling('div'):
-                    company_info['industry'] = industry_div.find_next_sibling('div').text.strip()
-            
-            # 返回职位详情
-            job_detail = {
-                "id": job_id,
-                "description": description,
-                "company_info": company_info
-            }
+            fields = parse_page(extract_detail_fields, response.content, response.encoding, PARSE_CONFIG["workers"])
+            job_detail = build_job_detail(fields, job_id)
             
             return job_detail
         except Exception as e:
             logger.error(f"获取职位详情失败: {str(e)}")
             return {"id": job_id, "description": "获取职位描述失败", "company_info": {}}
     
+    def build_filter_plan(self, user_profile_text=None):
+        """
+        按配置构建过滤规划，未配置的规则不参与过滤
+        
+        参数:
+        - user_profile_text: 用户简历文本，提供时加入AI匹配度规则
+        
+        返回:
+        - plan: 过滤规划
+        """
+        rules = []
+        if FILTER_CONFIG["exclude_applied"]:
+            rules.append(FilterRule("已投递", ("id",),
+                                    lambda job: "已投递" if is_job_applied("boss", job["id"]) else None))
+        
+        # 薪资、经验、学历按批量评估
+        rules.append(FilterRule("求职偏好", ("salary", "experience", "education"),
+                                lambda jobs: evaluate_jobs(jobs, USER_PREFERENCES)[1], batch=True))
+        
+        blacklist_companies = {normalize_text(company) for company in FILTER_CONFIG["blacklist_companies"]}
+        if blacklist_companies:
+            rules.append(FilterRule("黑名单公司", ("company",),
+                                    lambda job: job["company"] if job["normalized"]["company"] in blacklist_companies else None))
+        
+        if FILTER_CONFIG["exclude_headhunter"]:
+            rules.append(FilterRule("猎头", ("hr_title",),
+                                    lambda job: job.get("hr_title") if "猎头" in job.get("hr_title", "") else None))
+        
+        if FILTER_CONFIG["hr_activity_threshold"] > 0:
+            rules.append(FilterRule("HR活跃度", ("hr_active",), self._check_hr_activity))
+        
+        if DEDUP_CONFIG["enabled"]:
+            # 其他平台已登记的同公司、同城市、同名职位，在获取详情前剔除
+            rules.append(FilterRule("跨平台重复", ("title", "company", "city", "salary"),
+                                    lambda job: self.dedup.check_listing("boss", job["id"], job["normalized"]["company"], job["normalized"]["title"], job.get("city"), job.get("salary"))))
+        
+        if self.blacklist_matcher:
+            rules.append(FilterRule("黑名单关键词", ("description",),
+                                    lambda job: self.blacklist_matcher.search(job["folded"]["description"])))
+        
+        if DEDUP_CONFIG["enabled"] and (self.blacklist_matcher or user_profile_text is not None):
+            # 已经需要获取详情时，在AI评分前按描述的SimHash剔除近似重复
+            rules.append(FilterRule("描述重复", ("description",),
+                                    lambda job: self.dedup.check_description("boss", job["id"], job["normalized"]["company"], job["normalized"]["description"])))
+        
+        if user_profile_text is not None:
+            rules.append(FilterRule("AI匹配度", ("match_score",),
+                                    lambda jobs: self._check_ai_match(jobs, user_profile_text), batch=True))
+        
+        return FilterPlan(rules, ("description", "company_info"), name="Boss直聘")
+    
+    def _check_ai_match(self, jobs, user_profile_text):
+        """
+        批量检查AI匹配度
+        
+        参数:
+        - jobs: 职位列表
+        - user_profile_text: 用户简历文本
+        
+        返回:
+        - reasons: 与职位列表等长的淘汰原因列表，通过的职位为None
+        """
+        # 预排序相似度高的职位在AI评分的同时开始生成打招呼语
+        passed_jobs = filter_jobs_by_ai(
+            jobs, user_profile_text, threshold=70,
+            on_shortlist=lambda shortlisted: self.greetings.speculate(shortlisted, user_profile_text),
+        )
+        passed = {id(job) for job in passed_jobs}
+        
+        # 通过的职位在等待投递期间生成打招呼语，未通过的作废
+        self.greetings.prefetch(passed_jobs, user_profile_text)
+        self.greetings.discard([job for job in jobs if id(job) not in passed])
+        return [None if id(job) in passed else f"匹配度 {job.get('match_score')}" for job in jobs]
+    
+    def _check_hr_activity(self, job):
+        """
+        检查HR活跃度
+        
+        参数:
+        - job: 职位信息
+        
+        返回:
+        - reason: 不活跃时返回HR最后活跃时间，否则返回None
+        """
+        active_text = job.get("hr_active")
+        if not active_text:
+            return None
+        
+        if "刚刚" in active_text or "分钟" in active_text:
+            return None  # 活跃度高，保留
+        if "小时" in active_text:
+            hours = int(active_text.split("小时")[0])
+            if hours > FILTER_CONFIG["hr_activity_threshold"]:
+                return active_text
+            return None
+        if "天" in active_text:
+            return active_text
+        return None
+    
     def filter_jobs(self, jobs):
         """
         根据过滤条件筛选职位
@@ -297,66 +541,100 @@ class BossZhipin:
         返回:
         - filtered_jobs: 过滤后的职位列表
         """
-        filtered_jobs = []
-        blacklist_companies = FILTER_CONFIG["blacklist_companies"]
-        exclude_headhunter = FILTER_CONFIG["exclude_headhunter"]
-        hr_activity_threshold = FILTER_CONFIG["hr_activity_threshold"]
+        filtered_jobs = [job for job in self.filter_listing(jobs) if self.filter_detail(job)]
+        self.filter_plan.log_report()
         
+        logger.info(f"过滤后剩余 {len(filtered_jobs)} 个职位")
+        return filtered_jobs
+    
+    def filter_listing(self, jobs):
+        """
+        对一批职位执行只依赖搜索结果字段的规则，不发起请求
+        
+        参数:
+        - jobs: 职位列表
+        
+        返回:
+        - listed_jobs: 通过初筛的职位列表
+        """
+        resumed_jobs, new_jobs = [], []
         for job in jobs:
-            # 检查是否已投递
-            if FILTER_CONFIG["exclude_applied"] and is_job_applied("boss", job["id"]):
-                logger.info(f"过滤已投递职位: {job['title']} - {job['company']}")
-                continue
-            
-            # 检查公司是否在黑名单中
-            if job["company"] in blacklist_companies:
-                logger.info(f"过滤黑名单公司: {job['company']}")
-                continue
-            
-            # 检查是否是猎头
-            if exclude_headhunter and job.get("hr_title", "").find("猎头") >= 0:
-                logger.info(f"过滤猎头职位: {job['title']} - {job['company']}")
-                continue
-            
-            # 检查HR活跃度
-            if hr_activity_threshold > 0 and "hr_active" in job and job["hr_active"]:
-                # 提取HR最后活跃时间
-                active_text = job["hr_active"]
-                if "刚刚" in active_text or "分钟" in active_text:
-                    pass  # 活跃度高，保留
-                elif "小时" in active_text:
-                    hours = int(active_text.split("小时")[0])
-                    if hours > hr_activity_threshold:
-                        logger.info(f"过滤不活跃HR职位: {job['title']} - {job['company']} - {active_text}")
-                        continue
-                elif "天" in active_text:
-                    logger.info(f"过滤不活跃HR职位: {job['title']} - {job['company']} - {active_text}")
-                    continue
-            
-            # 获取职位详情
+            # 规范化职位文本，后续过滤只使用规范化结果；检查点中不保存规范化结果，恢复的职位也需重新计算
+            normalize_job(job)
+            if self.checkpoint.state(job) in (DETAILED, FILTERED, SCORED):
+                # 上次运行中已通过初筛
+                resumed_jobs.append(job)
+            else:
+                new_jobs.append(job)
+        
+        self.checkpoint.record(new_jobs, DISCOVERED)
+        listed_jobs = self.filter_plan.apply(LISTING, new_jobs)
+        listed_ids = {id(job) for job in listed_jobs}
+        rejected_jobs = [job for job in new_jobs if id(job) not in listed_ids]
+        self.checkpoint.record(rejected_jobs, REJECTED, "初筛未通过")
+        self.watermark.commit(rejected_jobs)
+        
+        return resumed_jobs + listed_jobs
+    
+    def filter_detail(self, job):
+        """
+        获取职位详情并执行依赖职位描述的规则，没有此类规则时不获取详情
+        
+        参数:
+        - job: 通过初筛的职位
+        
+        返回:
+        - passed: 是否通过过滤
+        """
+        state = self.checkpoint.state(job)
+        if state in (FILTERED, SCORED):
+            return True
+        
+        if not self.filter_plan.needs_detail:
+            self.checkpoint.record(job, FILTERED)
+            return True
+        
+        # 获取职位详情，上次运行已获取过的直接使用检查点中的详情
+        if state != DETAILED:
             job_detail = self.get_job_detail(job["id"])
+            if job_detail is None:
+                return False
             job["description"] = job_detail["description"]
             job["company_info"] = job_detail["company_info"]
-            
-            # 检查职位描述中是否包含黑名单关键词
-            has_blacklist_keyword = False
-            for keyword in FILTER_CONFIG["blacklist_keywords"]:
-                if keyword in job["description"]:
-                    logger.info(f"过滤黑名单关键词职位: {job['title']} - {job['company']} - 关键词: {keyword}")
-                    has_blacklist_keyword = True
-                    break
-            
-            if has_blacklist_keyword:
-                continue
-            
-            # 通过所有过滤条件，添加到结果列表
-            filtered_jobs.append(job)
-            
-            # 随机延迟，避免请求过快
-            random_delay(2, 5)
+            normalize_job(job, ("description",))
+            self.checkpoint.record(job, DETAILED)
         
-        logger.info(f"过滤后剩余 {len(filtered_jobs)} 个职位")
-        return filtered_jobs
+        passed = bool(self.filter_plan.apply(DETAIL, [job]))
+        self.checkpoint.record(job, FILTERED if passed else REJECTED, None if passed else "详情过滤未通过")
+        if not passed:
+            self.watermark.commit(job)
+        return passed
+    
+    def score_jobs(self, jobs):
+        """
+        批量执行AI匹配度规则，上次运行已评分通过的职位不再重复调用AI
+        
+        参数:
+        - jobs: 通过详情过滤的一批职位
+        
+        返回:
+        - jobs: 通过评分的职位列表
+        """
+        scored_jobs = [job for job in jobs if self.checkpoint.state(job) == SCORED]
+        pending_jobs = [job for job in jobs if self.checkpoint.state(job) != SCORED]
+        
+        passed = self.filter_plan.apply(AI, pending_jobs)
+        passed_ids = {id(job) for job in passed}
+        self.checkpoint.record(passed, SCORED)
+        rejected_jobs = [job for job in pending_jobs if id(job) not in passed_ids and not job.get("match_failed")]
+        self.checkpoint.record(rejected_jobs, REJECTED, "AI匹配度未通过")
+        self.watermark.commit(rejected_jobs)
+        # AI分析失败的职位使用的是默认分数，不记为淘汰，标记为待重试，下次运行重新评分
+        failed_jobs = [job for job in pending_jobs if id(job) not in passed_ids and job.get("match_failed")]
+        if failed_jobs:
+            self.watermark.retry(failed_jobs)
+            logger.warning(f"{len(failed_jobs)} 个职位AI分析失败，下次运行重新评分")
+        return scored_jobs + passed
     
     def send_greeting(self, job_id, message):
         """
@@ -378,6 +656,7 @@ class BossZhipin:
                 "content": message
             }
             
+            self.rate_limiter.wait()
             response = make_request(url, method="POST", headers=self.headers, json_data=data)
             result = response.json()
             
@@ -424,6 +703,7 @@ class BossZhipin:
                 page = context.new_page()
                 
                 # 进入聊天页面
+                self.rate_limiter.wait()
                 page.goto(f"https://www.zhipin.com/web/geek/chat?id={chat_id}")
                 page.wait_for_load_state("networkidle")
                 
@@ -467,6 +747,7 @@ class BossZhipin:
         """
         try:
             url = f"{self.api_url}/zpgeek/chat/list.json"
+            self.rate_limiter.wait()
             response = make_request(url, headers=self.headers)
             result = response.json()
             
@@ -494,9 +775,14 @@ class BossZhipin:
         返回:
         - success: 是否成功
         """
+        if not self.budget.consume(APPLY_REQUEST):
+            return False
+        
         try:
-            # 生成打招呼语
-            greeting_message = generate_greeting_message(job, user_profile_text)
+            # 优先使用预生成的打招呼语，没有时再生成
+            greeting_message = self.greetings.take(job, user_profile_text)
+            if greeting_message is None:
+                greeting_message = generate_greeting_message(job, user_profile_text)
             
             # 发送打招呼语
             if self.send_greeting(job["id"], greeting_message):
@@ -523,8 +809,122 @@ class BossZhipin:
             logger.error(f"投递职位异常: {str(e)}")
             return False
     
-    def run(self):
-        """执行Boss直聘求职流程"""
+    def register_accepted(self, job):
+        """
+        登记已投递的职位，其他平台的同一职位不再处理
+        
+        参数:
+        - job: 职位信息
+        """
+        if DEDUP_CONFIG["enabled"]:
+            self.dedup.register("boss", job["id"], job_text(job, "company"), job_text(job, "title"),
+                                job.get("city"), job.get("salary"), job.get("normalized", {}).get("description"))
+    
+    def find_duplicate(self, job):
+        """
+        查找其他平台已投递的同一职位
+        
+        参数:
+        - job: 职位信息
+        
+        返回:
+        - duplicate: 重复职位的描述，没有重复时返回None
+        """
+        if not DEDUP_CONFIG["enabled"]:
+            return None
+        return self.dedup.check_listing("boss", job["id"], job_text(job, "company"), job_text(job, "title"),
+                                        job.get("city"), job.get("salary"))
+    
+    def search_query_pages(self, query):
+        """
+        按一个求职意向和城市逐页搜索，遇到空页或全部已见过的页面即停止
+        
+        参数:
+        - query: (求职意向, 城市代码, 最大页数)
+        
+        返回:
+        - 生成器，每次产出一页中上次运行之后出现的职位列表
+        """
+        intention, city_code, max_pages = query
+        city_name = _BOSS_CITY_NAMES.get(city_code, "")
+        for page in range(1, max_pages + 1):
+            jobs = self.search_jobs(intention, city=city_code, page=page)
+            if not jobs:
+                logger.info(f"{intention} 在 {city_code} 第 {page} 页没有职位，停止翻页")
+                break
+            
+            # 搜索结果中没有城市字段，使用搜索条件的城市，供跨平台去重使用
+            for job in jobs:
+                job.setdefault("city", city_name)
+            
+            # 只处理上次运行之后出现的职位，整页都已见过时停止翻页
+            jobs = self.watermark.unseen(f"{intention}|{city_code}", jobs)
+            if not jobs:
+                break
+            yield jobs
+    
+    def iter_search_pages(self):
+        """
+        按求职意向和目标城市的组合并发翻页搜索，跨搜索去重
+        
+        返回:
+        - 生成器，每次产出一页中尚未出现过的职位列表
+        """
+        self.searched_count = 0
+        job_ids = set()
+        
+        # 先恢复上次中断的运行中未完成的职位
+        resumed_jobs = self.checkpoint.resumable()
+        if resumed_jobs:
+            logger.info(f"恢复上次未完成的 {len(resumed_jobs)} 个职位")
+            job_ids.update(job["id"] for job in resumed_jobs)
+            yield resumed_jobs
+        
+        # 转换城市名称为城市代码，默认北京
+        city_codes = [get_city_code('boss', city, "101010100") for city in USER_PREFERENCES["target_cities"]]
+        queries = build_queries(USER_PREFERENCES["job_intentions"], city_codes)
+        if not queries:
+            return
+        
+        # 根据今日剩余的搜索和详情预算决定合计翻页数，再平均分给各搜索条件
+        total_pages = self.budget.plan_pages(
+            self.config.get("max_pages", 3) * len(queries),
+            PAGE_SIZE,
+            detail_ratio=1.0 if self.filter_plan.needs_detail else 0,
+        )
+        max_pages = math.ceil(total_pages / len(queries))
+        workers = self.config.get("search_workers", 3)
+        logger.info(f"共 {len(queries)} 个搜索条件，每个最多 {max_pages} 页，同时搜索 {workers} 个")
+        
+        queries = [(intention, city_code, max_pages) for intention, city_code in queries]
+        pages = iter_grid(queries, self.search_query_pages, workers)
+        try:
+            for (intention, city_code, _), jobs in pages:
+                # 去重
+                unique_jobs = []
+                for job in jobs:
+                    if job["id"] not in job_ids and not self.checkpoint.known(job):
+                        job_ids.add(job["id"])
+                        unique_jobs.append(job)
+                
+                self.searched_count += len(unique_jobs)
+                logger.info(f"{intention} 在 {city_code} 搜索到 {len(unique_jobs)} 个新职位，累计 {self.searched_count} 个唯一职位")
+                if unique_jobs:
+                    yield unique_jobs
+        finally:
+            # 流水线停止时立即通知搜索线程停止翻页
+            pages.close()
+    
+    def run(self, apply_queue=None):
+        """
+        执行Boss直聘求职流程
+        
+        参数:
+        - apply_queue: 跨平台投递优先队列，提供时只收集评分通过的职位，由队列统一按匹配度投递
+        
+        返回:
+        - success: 流程是否正常完成
+        """
         logger.info("开始Boss直聘求职流程")
         
         # 检查登录状态
@@ -557,55 +957,107 @@ class BossZhipin:
             send_wechat_notification("投递上限提醒", f"Boss直聘今日已达到投递上限 {self.daily_limit} 个职位")
             return False
         
+        remaining_limit = self.budget.plan_applies(remaining_limit)
+        if remaining_limit <= 0:
+            logger.warning("今日投递预算已用完，退出流程")
+            return False
+        
         logger.info(f"今日还可投递 {remaining_limit} 个职位")
         
-        # 搜索职位
-        all_jobs = []
-        for intention in USER_PREFERENCES["job_intentions"]:
-            for city in USER_PREFERENCES["target_cities"]:
-                # 转换城市名称为城市代码
-                city_code = get_city_code('boss', city, "101010100")  # 默认北京
-                logger.info(f"搜索职位: {intention} 在 {city}(城市代码: {city_code})")
-                
-                jobs = self.search_jobs(intention, city=city_code, page=1)
-                all_jobs.extend(jobs)
-                
-                # 随机延迟
-                random_delay(2, 5)
+        applied_count = 0
         
-        # 去重
-        unique_jobs = []
-        job_ids = set()
-        for job in all_jobs:
-            if job["id"] not in job_ids:
-                job_ids.add(job["id"])
-                unique_jobs.append(job)
+        def apply_and_record(job):
+            """投递职位并记录检查点，投递后随机延迟"""
+            # 按匹配度统一投递时，其他平台的同一职位可能刚在本轮投递过
+            duplicate = self.find_duplicate(job)
+            if duplicate:
+                logger.info(f"跳过其他平台已投递的同一职位: {job.get('title')}（{duplicate}）")
+                self.checkpoint.record(job, REJECTED, f"跨平台重复 {duplicate}")
+                self.watermark.commit(job)
+                return False
+            
+            success = self.apply_job(job, user_profile_text)
+            if success:
+                self.checkpoint.record(job, APPLIED)
+                self.register_accepted(job)
+                self.watermark.commit(job)
+            else:
+                # 投递失败的职位不写入水位线，标记为待重试，下次运行重新投递
+                self.checkpoint.record(job, REJECTED, "投递失败")
+                self.watermark.retry(job)
+            
+            # 随机延迟
+            random_delay(10, 20)
+            return success
         
-        logger.info(f"搜索到 {len(unique_jobs)} 个唯一职位")
+        def apply(job):
+            """投递通过所有阶段的职位，达到今日剩余上限时返回False停止流水线"""
+            nonlocal applied_count
+            if applied_count >= remaining_limit:
+                return False
+            
+            if apply_and_record(job):
+                applied_count += 1
+            if applied_count >= remaining_limit:
+                logger.info(f"已达到今日剩余投递数量 {remaining_limit}，停止投递")
+                return False
+            return True
         
-        # 过滤职位
-        filtered_jobs = self.filter_jobs(unique_jobs)
+        def collect(job):
+            """收集评分通过的职位，交给投递队列按匹配度统一投递"""
+            # 投递后才登记重复职位索引和写入水位线，未投递的职位下次运行仍会处理
+            apply_queue.push("boss", job, job.get("match_score"))
+            return True
         
-        # 使用AI分析职位匹配度
-        from ai_module import filter_jobs_by_ai
-        matched_jobs = filter_jobs_by_ai(filtered_jobs, user_profile_text, threshold=70)
+        def finish():
+            """输出过滤统计，保存水位线（只含已走完流程的职位）、重复职位索引和AI结果缓存并清空检查点"""
+            self.filter_plan.log_report()
+            self.watermark.save()
+            self.dedup.save()
+            self.checkpoint.clear()
+            self.budget.log_summary()
+            get_greeting_cache().log_stats("打招呼语缓存")
+            self.greetings.log_stats("Boss直聘")
+            self.greetings.shutdown()
+            # 缓存写入时只保存在内存中，运行结束时统一写文件
+            get_ai_cache().save()
+            get_greeting_cache().save()
         
-        # 限制投递数量
-        if len(matched_jobs) > remaining_limit:
-            matched_jobs = matched_jobs[:remaining_limit]
+        if apply_queue is not None:
+            apply_queue.register("boss", apply_and_record, remaining_limit, on_done=finish, on_skip=self.watermark.retry)
         
-        # 投递职位
-        success_count = 0
-        for job in matched_jobs:
-            if self.apply_job(job, user_profile_text):
-                success_count += 1
-            
-            # 随机延迟
-            random_delay(10, 20)
+        # 本次运行加入AI匹配度规则
+        self.filter_plan = self.build_filter_plan(user_profile_text)
+        
+        # 搜索、初筛、详情、AI评分和投递以流水线方式同时推进，职位通过评分后立即投递
+        stats = run_pipeline(
+            self.iter_search_pages(),
+            [
+                ("初筛", self.filter_listing),
+                ("详情", lambda job: [job] if self.filter_detail(job) else []),
+                # 一次取出多批职位，各批并发请求，每批只发送一次简历
+                ("评分", self.score_jobs, AI_CONFIG["score_window"]),
+            ],
+            apply if apply_queue is None else collect,
+            buffer_size=PIPELINE_CONFIG["buffer_size"],
+            batch_wait=PIPELINE_CONFIG["batch_wait"],
+            name="Boss直聘",
+        )
+        
+        if apply_queue is not None:
+            # 检查点保留到队列投递完成后再清空
+            logger.info(f"Boss直聘职位收集完成，共 {stats['sink']} 个职位进入投递队列")
+            return True
         
         # 发送总结通知
-        summary = f"搜索到 {len(unique_jobs)} 个职位\n过滤后 {len(filtered_jobs)} 个职位\n匹配到 {len(matched_jobs)} 个职位\n成功投递 {success_count} 个职位"
+        summary = (
+            f"搜索到 {self.searched_count} 个职位\n"
+            f"过滤后 {stats['stages']['详情']['out']} 个职位\n"
+            f"匹配到 {stats['stages']['评分']['out']} 个职位\n"
+            f"成功投递 {applied_count} 个职位"
+        )
         send_wechat_notification("Boss直聘投递总结", summary)
+        finish()
         
         logger.info(f"Boss直聘求职流程完成: {summary}")
-        return True 
\ No newline at end of file
+        return True
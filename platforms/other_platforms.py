@@ -45,8 +45,8 @@ class JobPlatform(ABC):
         pass
     
     @abstractmethod
-    def run(self):
-        """执行求职流程"""
+    def run(self, apply_queue=None):
+        """执行求职流程，提供 apply_queue 时只收集职位，由跨平台投递队列统一投递"""
         pass
 
 
@@ -87,7 +87,7 @@ class ZhilianZhaopin:
         # 实际实现时需要添加具体代码
         return False
     
-    def run(self):
+    def run(self, apply_queue=None):
         logger.info("执行智联招聘求职流程")
         # 实际实现时需要添加具体代码
         return False
@@ -130,7 +130,7 @@ class QianChengWuYou:
         # 实际实现时需要添加具体代码
         return False
     
-    def run(self):
+    def run(self, apply_queue=None):
         logger.info("执行前程无忧求职流程")
         # 实际实现时需要添加具体代码
         return False
@@ -173,7 +173,7 @@ class LagouWang:
         # 实际实现时需要添加具体代码
         return False
     
-    def run(self):
+    def run(self, apply_queue=None):
         logger.info("执行拉勾网求职流程")
         # 实际实现时需要添加具体代码
         return False 
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+提示词精简
+
+职位描述中常有公司介绍、福利待遇、工作地点等与匹配度无关的段落，简历中也有姓名、
+年龄等无需发送给模型的信息。此模块在构建提示词前：
+- 只保留职位描述中的职责和要求段落，没有段落标题时保留全文并去掉无关段落
+- 用 tiktoken 按模型的真实分词计数，超过预算的部分截断
+- 按简历哈希缓存精简后的简历文本，同一份简历只处理一次
+
+tiktoken 未安装或分词表无法加载时按字符数估算token数（中文约每字一个token，偏保守）。
+"""
+
+import re
+import logging
+import threading
+from collections import OrderedDict
+
+from config import AI_CONFIG
+from text_normalizer import normalize_text
+from ai_cache import content_hash
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 职责和要求段落的标题
+_KEEP_HEADINGS = (
+    "岗位职责", "工作职责", "职位职责", "工作内容", "岗位描述", "职位描述", "职责描述", "你将负责",
+    "任职要求", "任职资格", "岗位要求", "职位要求", "技能要求", "能力要求", "我们希望你", "加分项",
+    "responsibilities", "requirements", "qualifications",
+)
+# 与匹配度无关的段落的标题
+_DROP_HEADINGS = (
+    "公司介绍", "公司简介", "关于我们", "团队介绍", "福利待遇", "薪资福利", "薪酬福利", "员工福利", "福利",
+    "我们提供", "工作地点", "工作地址", "上班地点", "工作时间", "上班时间", "面试流程", "联系方式", "benefits",
+)
+
+# 段落标题：前面是行首、标点或编号，后面是冒号，或被【】包围
+_HEADING_PATTERN = re.compile(
+    r'(?:^|(?<=[\s。；;！!】\]]))[【\[]?(' + "|".join(map(re.escape, _KEEP_HEADINGS + _DROP_HEADINGS)) +
+    r')(?:[】\]]\s*[:：]?|\s*[:：])',
+    re.IGNORECASE,
+)
+_KEEP_SET = {heading.casefold() for heading in _KEEP_HEADINGS}
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """加载当前模型的分词表，失败时返回False"""
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                try:
+                    _encoding = tiktoken.encoding_for_model(AI_CONFIG["model"])
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"无法加载 tiktoken 分词表，按字符数估算token数: {e}")
+                _encoding = False
+        return _encoding
+
+def count_tokens(text):
+    """
+    计算文本的token数
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: token数；无法加载分词表时返回字符数
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if not encoding:
+        return len(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text, max_tokens):
+    """
+    把文本截断到token预算以内
+
+    Args:
+        text: 文本
+        max_tokens: token预算，不大于0时不截断
+
+    Returns:
+        str: 截断后的文本，截断时末尾加省略号
+    """
+    if not text or max_tokens <= 0:
+        return text or ""
+    encoding = _get_encoding()
+    if not encoding:
+        return text if len(text) <= max_tokens else text[:max_tokens] + "…"
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    # 截断处可能落在多字节字符中间，解码时丢弃不完整的字节
+    return encoding.decode_bytes(tokens[:max_tokens]).decode("utf-8", errors="ignore") + "…"
+
+def extract_sections(description):
+    """
+    提取职位描述中的职责和要求段落
+
+    Args:
+        description: 职位描述
+
+    Returns:
+        str: 找到职责或要求段落时只返回这些段落；否则返回去掉无关段落后的全文
+    """
+    text = normalize_text(description)
+    matches = list(_HEADING_PATTERN.finditer(text))
+    if not matches:
+        return text
+
+    sections = []
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        sections.append((match.group(1).casefold() in _KEEP_SET, text[match.start():end].strip()))
+
+    kept = [section for keep, section in sections if keep]
+    if kept:
+        return " ".join(kept)
+    # 只有无关段落的标题时，保留第一个标题之前的内容
+    return text[:matches[0].start()].strip() or text
+
+def job_prompt_text(description, max_tokens=None):
+    """
+    构建提示词中的职位描述
+
+    Args:
+        description: 职位描述
+        max_tokens: token预算，默认 AI_CONFIG["job_tokens"]
+
+    Returns:
+        str: 精简并截断后的职位描述
+    """
+    if max_tokens is None:
+        max_tokens = AI_CONFIG["job_tokens"]
+    return truncate_tokens(extract_sections(description), max_tokens)
+
+# 简历中与匹配度无关的行
+_PROFILE_SKIP_PATTERN = re.compile(r'^\s*-\s*(姓名|年龄)\s*[:：]')
+
+_profile_cache = OrderedDict()
+_profile_lock = threading.Lock()
+_PROFILE_CACHE_SIZE = 8
+
+def profile_prompt_text(user_profile, max_tokens=None):
+    """
+    构建提示词中的简历，按简历哈希缓存
+
+    Args:
+        user_profile: 简历文本
+        max_tokens: token预算，默认 AI_CONFIG["profile_tokens"]
+
+    Returns:
+        str: 去掉姓名、年龄并截断后的简历
+    """
+    if max_tokens is None:
+        max_tokens = AI_CONFIG["profile_tokens"]
+    key = (content_hash(user_profile), max_tokens)
+    with _profile_lock:
+        if key in _profile_cache:
+            _profile_cache.move_to_end(key)
+            return _profile_cache[key]
+
+    lines = [line.rstrip() for line in (user_profile or "").splitlines()
+             if line.strip() and not _PROFILE_SKIP_PATTERN.match(line)]
+    text = truncate_tokens("\n".join(lines), max_tokens)
+
+    with _profile_lock:
+        _profile_cache[key] = text
+        while len(_profile_cache) > _PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    return text
+
+_INDENT_PATTERN = re.compile(r'^[ \t]+', re.M)
+_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+def compact_prompt(prompt):
+    """
+    去掉提示词模板中的缩进和多余空行，这些空白同样按token计费
+
+    Args:
+        prompt: 提示词
+
+    Returns:
+        str: 精简后的提示词
+    """
+    return _BLANK_LINES_PATTERN.sub("\n\n", _INDENT_PATTERN.sub("", prompt)).strip()
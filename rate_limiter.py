@@ -0,0 +1,176 @@
+"""
+按网站限制请求频率
+
+同一网站的所有请求（无论来自哪个线程）共用一个限速器，相邻两次请求之间保持
+min_interval 到 max_interval 之间的随机间隔。多个搜索条件并发搜索时，
+等待和响应时间可以互相重叠，但对网站的请求频率与逐个搜索时相同。
+
+模型接口按每分钟token数和请求数限速，由 TokenRateLimiter 控制。
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+class HostRateLimiter:
+    """
+    单个网站的请求限速器
+
+    Args:
+        host: 网站域名或地址，用于日志
+        min_interval: 相邻请求的最小间隔（秒）
+        max_interval: 相邻请求的最大间隔（秒）
+    """
+
+    def __init__(self, host, min_interval, max_interval):
+        self.host = host
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        """预约下一个请求时间并等待到该时间"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time)
+            self._next_time = slot + random.uniform(self.min_interval, self.max_interval)
+
+        delay = slot - now
+        if delay > 0:
+            logger.debug(f"{self.host} 请求前随机延迟 {delay:.2f} 秒")
+            time.sleep(delay)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(host, min_interval, max_interval):
+    """
+    获取网站的共享限速器，同一网站在进程内只有一个限速器
+
+    Args:
+        host: 网站域名或地址
+        min_interval: 相邻请求的最小间隔（秒），仅首次创建时生效
+        max_interval: 相邻请求的最大间隔（秒），仅首次创建时生效
+
+    Returns:
+        HostRateLimiter: 限速器
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostRateLimiter(host, min_interval, max_interval)
+        return limiter
+
+class TokenRateLimiter:
+    """
+    模型接口的每分钟token数和请求数限速器，同步调用（各平台线程、打招呼语预生成线程）和
+    并发的异步调用共用同一个限速器
+
+    发起请求前按预估token数预约额度，收到响应后用 usage 中的实际用量修正；
+    触发限流（429）后所有调用暂停，连续触发时暂停时间加倍，调用成功后恢复。
+
+    Args:
+        tokens_per_minute: 每分钟token上限，0表示不限
+        requests_per_minute: 每分钟请求上限，0表示不限
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, tokens_per_minute=0, requests_per_minute=0):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self._lock = threading.Lock()
+        self._window = deque()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+
+    def _try_reserve(self, tokens):
+        """尝试预约额度，成功时返回预约记录，否则返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= self.WINDOW:
+                self._window.popleft()
+
+            if now < self._paused_until:
+                return None, self._paused_until - now
+
+            used = sum(entry[1] for entry in self._window)
+            # 窗口为空时总是放行，避免单个超大请求永远等待
+            over_tokens = self.tokens_per_minute and self._window and used + tokens > self.tokens_per_minute
+            over_requests = self.requests_per_minute and len(self._window) >= self.requests_per_minute
+            if over_tokens or over_requests:
+                return None, self._window[0][0] + self.WINDOW - now
+
+            entry = [now, tokens]
+            self._window.append(entry)
+            return entry, 0
+
+    async def acquire(self, tokens):
+        """
+        等待到有足够额度并预约
+
+        Args:
+            tokens: 预估的token数（输入 + 最大输出）
+
+        Returns:
+            list: 预约记录，收到响应后传给 record 修正用量
+        """
+        while True:
+            entry, wait = self._try_reserve(tokens)
+            if entry is not None:
+                return entry
+            await asyncio.sleep(max(wait, 0.05))
+
+    def reserve(self, tokens):
+        """
+        同步等待到有足够额度并预约，供线程中的同步调用使用
+
+        Args:
+            tokens: 预估的token数（输入 + 最大输出）
+
+        Returns:
+            list: 预约记录，收到响应后传给 record 修正用量
+        """
+        while True:
+            entry, wait = self._try_reserve(tokens)
+            if entry is not None:
+                return entry
+            time.sleep(max(wait, 0.05))
+
+    def record(self, entry, tokens):
+        """
+        用响应中的实际token用量修正预约
+
+        Args:
+            entry: acquire 返回的预约记录
+            tokens: 实际用量
+        """
+        with self._lock:
+            entry[1] = tokens
+            self._backoff = 0.0
+
+    def rate_limited(self, entry=None, retry_after=None):
+        """
+        记录一次限流，暂停所有调用
+
+        Args:
+            entry: 被限流的请求的预约记录，仍计入请求数，但不占用token额度
+            retry_after: 接口返回的建议等待秒数
+
+        Returns:
+            float: 暂停秒数
+        """
+        with self._lock:
+            if entry is not None:
+                entry[1] = 0
+            self._backoff = min(60.0, self._backoff * 2 if self._backoff else 1.0)
+            delay = max(retry_after or 0, self._backoff)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            return delay
@@ -0,0 +1,188 @@
+"""
+每日请求预算
+
+按平台和请求类别（搜索、详情、投递）分配每天的请求数，消耗情况持久化到
+data/request_budget.json，同一天内多次运行、多个平台并发运行共用同一份计数。
+预算用完的类别不再发起请求；搜索前根据剩余的搜索和详情预算决定翻多少页，
+避免翻到的职位因为详情预算不足而白白搜索。
+"""
+
+import math
+import logging
+import threading
+from datetime import date
+
+from config import REQUEST_BUDGET_CONFIG
+from utils import file_lock, load_data, save_data
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 请求类别
+SEARCH_REQUEST = "search"
+DETAIL_REQUEST = "detail"
+APPLY_REQUEST = "apply"
+ENDPOINTS = (SEARCH_REQUEST, DETAIL_REQUEST, APPLY_REQUEST)
+
+ENDPOINT_NAMES = {
+    SEARCH_REQUEST: "搜索",
+    DETAIL_REQUEST: "详情",
+    APPLY_REQUEST: "投递",
+}
+
+BUDGET_FILE = "request_budget.json"
+
+class RequestBudget:
+    """
+    单个平台的每日请求预算
+
+    Args:
+        platform: 平台名称，同一网站的不同实现共用一个名称即共用预算
+        limits: {请求类别: 每日上限}，未配置或不大于0的类别不限
+        enabled: 为False时不限制也不记录
+    """
+
+    def __init__(self, platform, limits=None, enabled=None):
+        self.platform = platform
+        if limits is None:
+            limits = REQUEST_BUDGET_CONFIG["daily"].get(platform, {})
+        self.limits = {endpoint: limit for endpoint, limit in limits.items() if limit and limit > 0}
+        self.enabled = REQUEST_BUDGET_CONFIG["enabled"] if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._exhausted = set()
+
+    def _load_usage(self):
+        """读取当天的消耗记录，调用方需持有文件锁"""
+        # 每个请求都会读写一次，不输出INFO日志
+        data = load_data(BUDGET_FILE, {}, quiet=True)
+        today = date.today().isoformat()
+        if data.get("date") != today:
+            data = {"date": today, "used": {}}
+        return data
+
+    def used(self, endpoint):
+        """
+        今天已消耗的请求数
+
+        Args:
+            endpoint: 请求类别
+
+        Returns:
+            int: 已消耗的请求数
+        """
+        with file_lock(BUDGET_FILE):
+            data = self._load_usage()
+        return data["used"].get(self.platform, {}).get(endpoint, 0)
+
+    def remaining(self, endpoint):
+        """
+        今天剩余的请求数
+
+        Args:
+            endpoint: 请求类别
+
+        Returns:
+            int: 剩余请求数，不限时返回None
+        """
+        if not self.enabled or endpoint not in self.limits:
+            return None
+        return max(0, self.limits[endpoint] - self.used(endpoint))
+
+    def consume(self, endpoint, count=1):
+        """
+        发起请求前登记消耗
+
+        Args:
+            endpoint: 请求类别
+            count: 请求数
+
+        Returns:
+            bool: 预算足够并已登记返回True，预算不足返回False，此时不应发起请求
+        """
+        if not self.enabled:
+            return True
+
+        with self._lock, file_lock(BUDGET_FILE):
+            data = self._load_usage()
+            used = data["used"].setdefault(self.platform, {})
+            limit = self.limits.get(endpoint)
+            if limit is not None and used.get(endpoint, 0) + count > limit:
+                if endpoint not in self._exhausted:
+                    self._exhausted.add(endpoint)
+                    logger.warning(f"{self.platform} 今日{ENDPOINT_NAMES.get(endpoint, endpoint)}请求预算 {limit} 已用完")
+                return False
+
+            used[endpoint] = used.get(endpoint, 0) + count
+            save_data(data, BUDGET_FILE, quiet=True)
+        return True
+
+    def plan_pages(self, max_pages, page_size, detail_ratio=1.0, search_per_page=1):
+        """
+        根据剩余预算决定本次翻页数
+
+        Args:
+            max_pages: 配置的最大页数
+            page_size: 每页职位数
+            detail_ratio: 预计需要获取详情的职位比例，不需要详情时传0
+            search_per_page: 每翻一页消耗的搜索请求数
+
+        Returns:
+            int: 本次最多翻的页数
+        """
+        pages = max_pages
+        search_left = self.remaining(SEARCH_REQUEST)
+        if search_left is not None:
+            pages = min(pages, search_left // search_per_page)
+
+        detail_left = self.remaining(DETAIL_REQUEST)
+        if detail_left is not None and detail_ratio > 0:
+            # 翻到的职位超过详情预算也无法处理，多翻的页只浪费搜索请求
+            pages = min(pages, math.ceil(detail_left / (page_size * detail_ratio)))
+
+        if pages <= 0:
+            # 定时任务中预算用完后每次运行都不再搜索，明确提示而不是静默结束
+            logger.warning(f"{self.platform} 今日搜索或详情请求预算已用完，本次运行不搜索职位，"
+                           f"可在 config.py 的 REQUEST_BUDGET_CONFIG 中调整每日预算")
+        elif pages < max_pages:
+            logger.info(f"{self.platform} 受每日请求预算限制，本次最多翻 {pages} 页（配置 {max_pages} 页）")
+        return max(0, pages)
+
+    def plan_applies(self, max_apply):
+        """
+        根据剩余投递预算决定本次投递上限
+
+        Args:
+            max_apply: 配置的最大投递数
+
+        Returns:
+            int: 本次最多投递数
+        """
+        apply_left = self.remaining(APPLY_REQUEST)
+        if apply_left is None or apply_left >= max_apply:
+            return max_apply
+        logger.info(f"{self.platform} 受每日请求预算限制，本次最多投递 {apply_left} 个职位（配置 {max_apply} 个）")
+        return apply_left
+
+    def summary(self):
+        """
+        今天各类别的消耗情况
+
+        Returns:
+            dict: {请求类别: {"used", "limit"}}
+        """
+        with file_lock(BUDGET_FILE):
+            data = self._load_usage()
+        used = data["used"].get(self.platform, {})
+        return {
+            endpoint: {"used": used.get(endpoint, 0), "limit": self.limits.get(endpoint)}
+            for endpoint in ENDPOINTS
+        }
+
+    def log_summary(self):
+        """输出今天的预算消耗情况"""
+        summary = self.summary()
+        logger.info(f"{self.platform} 今日请求预算: " + "，".join(
+            f"{ENDPOINT_NAMES[endpoint]} {item['used']}/{item['limit'] or '不限'}"
+            for endpoint, item in summary.items()
+        ))
+        return summary
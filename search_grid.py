@@ -0,0 +1,102 @@
+"""
+搜索条件网格
+
+把多个关键词和城市组合成搜索条件，在线程池中并发翻页，按完成顺序逐页产出结果。
+请求频率由各平台的网站限速器控制，这里只负责并发和提前停止：结果队列有界，
+调用方（流水线）处理不过来时搜索线程暂停翻页；调用方停止读取或关闭生成器时，
+各搜索条件在下一次翻页前结束，不会多发请求。
+"""
+
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 单个搜索条件结束的标记
+_DONE = object()
+
+# 结果队列等待的轮询间隔（秒），用于及时响应停止信号
+_POLL_INTERVAL = 0.5
+
+def build_queries(keywords, cities):
+    """
+    组合关键词和城市，去掉重复和空值
+
+    Args:
+        keywords: 关键词列表
+        cities: 城市列表
+
+    Returns:
+        list: [(关键词, 城市)]
+    """
+    keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+    cities = list(dict.fromkeys(city for city in cities if city))
+    return [(keyword, city) for keyword in keywords for city in cities]
+
+def iter_grid(queries, search_func, workers=1, buffer_size=None):
+    """
+    并发执行各搜索条件的翻页
+
+    Args:
+        queries: 搜索条件列表
+        search_func: 接收一个搜索条件、逐页产出职位列表的生成器函数
+        workers: 并发数，不大于1时逐个搜索
+        buffer_size: 已搜索、尚未被读取的页数上限，默认与并发数相同
+
+    Yields:
+        tuple: (搜索条件, 一页职位列表)，按完成顺序产出
+    """
+    if workers <= 1 or len(queries) <= 1:
+        for query in queries:
+            for jobs in search_func(query):
+                yield query, jobs
+        return
+
+    results = queue.Queue(maxsize=buffer_size or workers)
+    stop = threading.Event()
+
+    def put(item):
+        """放入结果队列，队列已满时等待；调用方停止读取后放弃"""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker(query):
+        pages = search_func(query)
+        try:
+            # 每翻一页前检查调用方是否已停止读取
+            while not stop.is_set():
+                try:
+                    jobs = next(pages)
+                except StopIteration:
+                    break
+                if not put((query, jobs)):
+                    break
+        except Exception as e:
+            logger.error(f"搜索 {query} 出错: {e}")
+        finally:
+            pages.close()
+            put((query, _DONE))
+
+    executor = ThreadPoolExecutor(max_workers=min(workers, len(queries)), thread_name_prefix="search")
+    for query in queries:
+        executor.submit(worker, query)
+
+    pending = len(queries)
+    try:
+        while pending:
+            query, jobs = results.get()
+            if jobs is _DONE:
+                pending -= 1
+                continue
+            yield query, jobs
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
@@ -0,0 +1,146 @@
+"""
+职位文本规范化
+
+每个职位只做一次规范化：去除HTML残留、全角转半角、合并空白，并预先计算
+大小写折叠后的版本。过滤条件和AI提示词都直接使用规范化结果，
+不再对同一段职位描述反复调用 lower()。
+"""
+
+import re
+import html
+
+# 职位文本视图及其来源字段，按顺序取第一个非空字段
+JOB_TEXT_VIEWS = {
+    "title": ("title",),
+    "company": ("company_name", "company"),
+    "description": ("job_description", "description"),
+}
+
+_TAG_PATTERN = re.compile(r'<[^>]*>')
+_SPACE_PATTERN = re.compile(r'\s+')
+
+# 全角字符（！到～）转半角，全角空格转普通空格
+_FULLWIDTH_TABLE = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+_FULLWIDTH_TABLE[0x3000] = 0x20
+
+def normalize_text(text):
+    """
+    规范化文本
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        str: 去除HTML标签和实体、全角转半角、合并空白后的文本
+    """
+    if not text:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    if "<" in text:
+        text = _TAG_PATTERN.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+    text = text.translate(_FULLWIDTH_TABLE)
+    return _SPACE_PATTERN.sub(" ", text).strip()
+
+def fold_text(text):
+    """规范化文本并做大小写折叠"""
+    return normalize_text(text).casefold()
+
+def normalize_job(job, views=None):
+    """
+    规范化职位文本，结果保存在 job["normalized"] 和 job["folded"] 中
+
+    Args:
+        job: 职位信息
+        views: 需要（重新）计算的视图名，默认全部；获取职位详情后可只传 ("description",)
+
+    Returns:
+        dict: 传入的职位信息
+    """
+    normalized = job.setdefault("normalized", {})
+    folded = job.setdefault("folded", {})
+
+    for view in views or JOB_TEXT_VIEWS:
+        source = ""
+        for field in JOB_TEXT_VIEWS[view]:
+            if job.get(field):
+                source = job[field]
+                break
+        text = normalize_text(source)
+        normalized[view] = text
+        folded[view] = text.casefold()
+
+    return job
+
+def job_text(job, view, folded=False):
+    """
+    获取职位的规范化文本，尚未计算时先计算
+
+    Args:
+        job: 职位信息
+        view: 视图名，见 JOB_TEXT_VIEWS
+        folded: 是否返回大小写折叠后的文本
+
+    Returns:
+        str: 规范化文本
+    """
+    key = "folded" if folded else "normalized"
+    if view not in job.get(key, {}):
+        normalize_job(job, (view,))
+    return job[key][view]
+
+# 职位名称中不影响岗位类型的部分：括号内的补充说明、级别和招聘类型
+_TITLE_NOISE_PATTERN = re.compile(
+    r'[(\[【（].*?[)\]】）]|高级|资深|初级|中级|助理|实习生?|校招|社招|急招|'
+    r'\b(?:senior|junior|sr|jr|lead)\b|\b[pt]\d+\b|[\s\-_/|·,.]'
+)
+
+def title_cluster(title):
+    """
+    归并职位名称，只保留岗位类型
+
+    Args:
+        title: 职位名称
+
+    Returns:
+        str: 去掉括号说明、级别和标点后的折叠文本，如
+            "高级Python开发工程师（急招）" 和 "Python开发工程师" 都得到 "python开发工程师"
+    """
+    return _TITLE_NOISE_PATTERN.sub("", fold_text(title))
+
+class KeywordMatcher:
+    """
+    关键词匹配器
+
+    关键词在创建时规范化并编译为一个正则表达式，对已折叠的文本只扫描一遍，
+    而不是每个关键词各扫描一遍。
+    """
+
+    def __init__(self, keywords):
+        self.keywords = [kw for kw in (fold_text(k) for k in keywords or []) if kw]
+        if self.keywords:
+            # 长关键词优先，保证返回的是最具体的匹配
+            ordered = sorted(set(self.keywords), key=len, reverse=True)
+            self._pattern = re.compile("|".join(re.escape(kw) for kw in ordered))
+        else:
+            self._pattern = None
+
+    def search(self, folded_text):
+        """
+        查找折叠文本中出现的第一个关键词
+
+        Args:
+            folded_text: 经过 fold_text 或 normalize_job 折叠的文本
+
+        Returns:
+            str: 命中的关键词，未命中时返回None
+        """
+        if self._pattern is None or not folded_text:
+            return None
+        match = self._pattern.search(folded_text)
+        return match.group(0) if match else None
+
+    def __bool__(self):
+        return self._pattern is not None
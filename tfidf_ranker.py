@@ -0,0 +1,229 @@
+"""
+本地TF-IDF预排序
+
+在调用AI评分之前，先用职位描述与简历的文本相似度粗排：中文按相邻两个字切分，
+英文和数字按整词切分（如 "python"、"k8s"），计算TF-IDF向量的余弦相似度。
+与简历几乎没有共同词的职位不再发送给模型。
+
+词表把每个词映射为固定的列号，文档频率保存在与词表对应的数组中。一批职位切词后
+转换为 (行, 列) 下标数组，词频、TF-IDF权重、向量长度和与简历的点积都用numpy
+按数组一次计算，不再逐个职位、逐个词循环。
+
+文档频率（每个词出现在多少个职位描述中）跨运行累积，保存在
+data/tfidf_vocab.json 中，见过的职位越多，IDF越能反映常见套话和稀有技能的差别。
+
+预排序在流水线的评分阶段按评分窗口进行，一个窗口包含多批职位，除相似度下限外
+还只保留相似度最高的 top_k 个职位。
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from text_normalizer import fold_text
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+VOCAB_PATH = os.path.join("data", "tfidf_vocab.json")
+
+# 英文和数字整词
+_WORD_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+# 中文相邻两字，用前瞻匹配取得所有重叠的两字组合
+_BIGRAM_PATTERN = re.compile(r'(?=([\u4e00-\u9fff]{2}))')
+# 前后都不是中文的单个汉字
+_SINGLE_PATTERN = re.compile(r'(?<![\u4e00-\u9fff])[\u4e00-\u9fff](?![\u4e00-\u9fff])')
+
+def tokenize(text, folded=False):
+    """
+    切分文本
+
+    Args:
+        text: 原始文本
+        folded: 文本是否已经过 fold_text 处理（如 job["folded"] 中的文本），是时不再重复处理
+
+    Returns:
+        list: 中文相邻两字和英文整词组成的词列表（不保证原文顺序）
+    """
+    if not folded:
+        text = fold_text(text)
+    tokens = [word.rstrip(".") for word in _WORD_PATTERN.findall(text)]
+    tokens.extend(_BIGRAM_PATTERN.findall(text))
+    tokens.extend(_SINGLE_PATTERN.findall(text))
+    return tokens
+
+class TfidfRanker:
+    """
+    基于累积文档频率的TF-IDF相似度排序
+
+    Args:
+        path: 词表文件路径
+        max_docs: 记录的职位描述哈希上限，用于避免同一职位重复计入文档频率
+    """
+
+    def __init__(self, path=VOCAB_PATH, max_docs=20000):
+        self.path = path
+        self.max_docs = max_docs
+        self._lock = threading.Lock()
+        # 词到列号的映射和各列的文档频率
+        self._vocab = {}
+        self._df = np.zeros(1024, dtype=np.float64)
+        self._docs = OrderedDict()
+        self._dirty = False
+        self._profile = (None, None)
+        self._load()
+
+    def _load(self):
+        """加载累积的文档频率"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            df = data.get("df", {})
+            self._vocab = {term: index for index, term in enumerate(df)}
+            self._df = np.zeros(max(len(df), 1024), dtype=np.float64)
+            self._df[:len(df)] = list(df.values())
+            self._docs = OrderedDict((doc, None) for doc in data.get("docs", []))
+            logger.info(f"加载TF-IDF词表，{len(self._docs)} 个职位，{len(self._vocab)} 个词")
+        except Exception as e:
+            logger.error(f"加载TF-IDF词表失败: {e}")
+
+    def save(self):
+        """保存文档频率，没有新职位时不写文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # 只在简历中出现过的词文档频率为0，不保存
+                df = {term: count for term, count in zip(self._vocab, self._df[:len(self._vocab)].astype(int).tolist()) if count}
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"docs": list(self._docs), "df": df}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"保存TF-IDF词表失败: {e}")
+
+    def _columns(self, tokens):
+        """把词转换为列号，新词追加到词表末尾，调用方需持有锁"""
+        vocab = self._vocab
+        for token in set(tokens).difference(vocab):
+            vocab[token] = len(vocab)
+        if len(vocab) > len(self._df):
+            self._df = np.concatenate([self._df, np.zeros(max(len(vocab), len(self._df)), dtype=np.float64)])
+        return np.fromiter(map(vocab.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+
+    def _term_counts(self, token_lists):
+        """
+        统计各文档的词频，调用方需持有锁
+
+        Returns:
+            tuple: (行号数组, 列号数组, 词频数组)，每个文档中的每个词一项
+        """
+        lengths = [len(tokens) for tokens in token_lists]
+        columns = self._columns([token for tokens in token_lists for token in tokens])
+        rows = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+        # 按 (行, 列) 合并重复的词
+        pairs, counts = np.unique(rows * len(self._vocab) + columns, return_counts=True)
+        return pairs // len(self._vocab), pairs % len(self._vocab), counts
+
+    def _observe(self, texts, rows, columns):
+        """把新出现的职位描述计入文档频率，调用方需持有锁"""
+        new_rows = np.zeros(len(texts), dtype=bool)
+        for row, text in enumerate(texts):
+            doc = hashlib.md5(text.encode("utf-8")).hexdigest()
+            if doc in self._docs:
+                continue
+            self._docs[doc] = None
+            new_rows[row] = True
+        if new_rows.any():
+            self._df += np.bincount(columns[new_rows[rows]], minlength=len(self._df))
+            self._dirty = True
+        # 只限制去重记录的数量，文档频率本身继续累积
+        while len(self._docs) > self.max_docs:
+            self._docs.popitem(last=False)
+
+    def _weights(self, columns, counts, total_docs):
+        """计算TF-IDF权重，TF取对数平滑"""
+        return (1 + np.log(counts)) * (np.log((1 + total_docs) / (1 + self._df[columns])) + 1)
+
+    def similarities(self, texts, profile_text, folded=False):
+        """
+        计算各文本与简历的余弦相似度
+
+        Args:
+            texts: 职位描述列表
+            profile_text: 简历文本
+            folded: 职位描述是否已经过 fold_text 处理
+
+        Returns:
+            numpy.ndarray: 与 texts 等长的相似度，取值0-1
+        """
+        token_lists = [tokenize(text, folded) for text in texts]
+
+        with self._lock:
+            rows, columns, counts = self._term_counts(token_lists)
+            self._observe(texts, rows, columns)
+            total_docs = max(len(self._docs), 1)
+
+            # 简历切词结果在简历不变时复用
+            if self._profile[0] != profile_text:
+                _, profile_columns, profile_counts = self._term_counts([tokenize(profile_text)])
+                self._profile = (profile_text, (profile_columns, profile_counts))
+            profile_columns, profile_counts = self._profile[1]
+
+            weights = self._weights(columns, counts, total_docs)
+            profile_weights = self._weights(profile_columns, profile_counts, total_docs)
+            # 简历向量展开为按列号索引的稠密数组，职位中不在简历里的词对点积没有贡献
+            profile_vector = np.zeros(len(self._vocab))
+            profile_vector[profile_columns] = profile_weights
+
+        if not len(profile_weights) or not texts:
+            return np.zeros(len(texts))
+
+        dots = np.bincount(rows, weights=weights * profile_vector[columns], minlength=len(texts))
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(texts)))
+        denominators = norms * np.linalg.norm(profile_weights)
+        return np.divide(dots, denominators, out=np.zeros(len(texts)), where=denominators > 0)
+
+    def select(self, texts, profile_text, min_similarity=0.0, folded=False, top_k=0):
+        """
+        选出值得交给AI评分的文本
+
+        Args:
+            texts: 职位描述列表
+            profile_text: 简历文本
+            min_similarity: 相似度下限
+            top_k: 最多保留的数量，0表示不限
+            folded: 职位描述是否已经过 fold_text 处理
+
+        Returns:
+            tuple: (保留的下标列表（按相似度从高到低）, 全部相似度)
+        """
+        scores = self.similarities(texts, profile_text, folded)
+        order = np.argsort(-scores, kind="stable")
+        keep = [int(index) for index in order if scores[index] >= min_similarity]
+        if top_k > 0:
+            keep = keep[:top_k]
+        return keep, scores
+
+_ranker = None
+_ranker_lock = threading.Lock()
+
+def get_ranker():
+    """获取进程内共享的预排序器"""
+    global _ranker
+    with _ranker_lock:
+        if _ranker is None:
+            _ranker = TfidfRanker()
+        return _ranker
@@ -3,11 +3,30 @@ import json
 import logging
 import time
 import random
+import threading
 import requests
 from datetime import datetime
+from contextlib import contextmanager
 from wechatpy.enterprise import WeChatClient
 from config import WECHAT_CONFIG, PROXY_CONFIG
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# 创建目录
+def ensure_dir(directory):
+    """确保目录存在，如果不存在则创建，返回目录路径"""
+    if not os.path.exists(directory):
+        # 多个平台并发运行时可能同时创建同一目录
+        os.makedirs(directory, exist_ok=True)
+        logger.info(f"创建目录: {directory}")
+    return directory
+
 # 设置日志记录
 logging.basicConfig(
     level=logging.INFO,
@@ -17,14 +36,6 @@ logging.basicConfig(
         logging.StreamHandler()
     ]
 )
-logger = logging.getLogger(__name__)
-
-# 创建目录
-def ensure_dir(directory):
-    """确保目录存在，如果不存在则创建"""
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        logger.info(f"创建目录: {directory}")
 
 # 企业微信通知
 def send_wechat_notification(title, content, to_user="@all"):
@@ -56,33 +67,110 @@ def send_wechat_notification(title, content, to_user="@all"):
         logger.error(f"企业微信通知发送异常: {str(e)}")
         return False
 
+# 数据文件锁
+class _DataFileLock:
+    """单个数据文件的锁，线程之间用可重入锁互斥，进程之间用锁文件互斥"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.handle = None
+    
+    def acquire(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self.handle = open(self.path, "a+")
+                if fcntl:
+                    fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            self.handle.seek(0)
+                            msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            continue
+            except Exception:
+                if self.handle:
+                    self.handle.close()
+                    self.handle = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+    
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            try:
+                if fcntl:
+                    fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    self.handle.seek(0)
+                    msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self.handle.close()
+                self.handle = None
+        self.thread_lock.release()
+
+_data_file_locks = {}
+_data_file_locks_guard = threading.Lock()
+
+@contextmanager
+def file_lock(filename):
+    """
+    锁定data目录下的数据文件，用于“读取-修改-保存”期间的互斥
+    
+    同一进程内的线程和并发运行的多个进程之间都互斥，同一线程内可重入。
+    """
+    ensure_dir("data")
+    with _data_file_locks_guard:
+        lock = _data_file_locks.get(filename)
+        if lock is None:
+            lock = _data_file_locks[filename] = _DataFileLock(os.path.join("data", filename + ".lock"))
+    
+    lock.acquire()
+    try:
+        yield
+    finally:
+        lock.release()
+
 # 保存和加载数据
-def save_data(data, filename):
-    """保存数据到JSON文件"""
+def save_data(data, filename, quiet=False):
+    """保存数据到JSON文件，先写临时文件再替换，其他线程或进程不会读到写了一半的文件
+    
+    quiet 为True时成功信息只输出DEBUG日志，用于频繁保存的小文件
+    """
     ensure_dir("data")
     filepath = os.path.join("data", filename)
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
-        logger.info(f"数据已保存到 {filepath}")
+        os.replace(tmp_path, filepath)
+        logger.log(logging.DEBUG if quiet else logging.INFO, f"数据已保存到 {filepath}")
         return True
     except Exception as e:
         logger.error(f"保存数据到 {filepath} 失败: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
 
-def load_data(filename, default=None):
-    """从JSON文件加载数据"""
+def load_data(filename, default=None, quiet=False):
+    """从JSON文件加载数据，quiet 为True时成功信息只输出DEBUG日志"""
     filepath = os.path.join("data", filename)
+    level = logging.DEBUG if quiet else logging.INFO
     
     if not os.path.exists(filepath):
-        logger.info(f"文件 {filepath} 不存在，返回默认值")
+        logger.log(level, f"文件 {filepath} 不存在，返回默认值")
         return default if default is not None else {}
     
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        logger.info(f"从 {filepath} 加载数据成功")
+        logger.log(level, f"从 {filepath} 加载数据成功")
         return data
     except Exception as e:
         logger.error(f"从 {filepath} 加载数据失败: {str(e)}")
@@ -161,46 +249,48 @@ def is_time_between(start_time, end_time):
 # 更新黑名单
 def update_blacklist(company_name, reason):
     """更新公司黑名单"""
-    blacklist = load_data("blacklist.json", default=[])
-    
-    # 检查公司是否已在黑名单中
-    for item in blacklist:
-        if item["company"] == company_name:
-            # 更新原因和时间
-            item["reasons"].append(reason)
-            item["updated_at"] = get_current_datetime_str()
-            save_data(blacklist, "blacklist.json")
-            logger.info(f"更新黑名单公司: {company_name}, 原因: {reason}")
-            return
-    
-    # 添加新公司到黑名单
-    blacklist.append({
-        "company": company_name,
-        "reasons": [reason],
-        "created_at": get_current_datetime_str(),
-        "updated_at": get_current_datetime_str()
-    })
-    
-    save_data(blacklist, "blacklist.json")
-    logger.info(f"添加公司到黑名单: {company_name}, 原因: {reason}")
+    with file_lock("blacklist.json"):
+        blacklist = load_data("blacklist.json", default=[])
+        
+        # 检查公司是否已在黑名单中
+        for item in blacklist:
+            if item["company"] == company_name:
+                # 更新原因和时间
+                item["reasons"].append(reason)
+                item["updated_at"] = get_current_datetime_str()
+                save_data(blacklist, "blacklist.json")
+                logger.info(f"更新黑名单公司: {company_name}, 原因: {reason}")
+                return
+        
+        # 添加新公司到黑名单
+        blacklist.append({
+            "company": company_name,
+            "reasons": [reason],
+            "created_at": get_current_datetime_str(),
+            "updated_at": get_current_datetime_str()
+        })
+        
+        save_data(blacklist, "blacklist.json")
+        logger.info(f"添加公司到黑名单: {company_name}, 原因: {reason}")
 
 # 职位投递记录
 def record_job_application(platform, job_id, job_title, company, status="已投递"):
     """记录职位投递"""
-    applications = load_data("applications.json", default=[])
-    
-    # 添加新的投递记录
-    applications.append({
-        "platform": platform,
-        "job_id": job_id,
-        "job_title": job_title,
-        "company": company,
-        "status": status,
-        "applied_at": get_current_datetime_str()
-    })
-    
-    save_data(applications, "applications.json")
-    logger.info(f"记录职位投递: {platform} - {company} - {job_title}")
+    with file_lock("applications.json"):
+        applications = load_data("applications.json", default=[])
+        
+        # 添加新的投递记录
+        applications.append({
+            "platform": platform,
+            "job_id": job_id,
+            "job_title": job_title,
+            "company": company,
+            "status": status,
+            "applied_at": get_current_datetime_str()
+        })
+        
+        save_data(applications, "applications.json")
+        logger.info(f"记录职位投递: {platform} - {company} - {job_title}")
 
 # 检查是否已投递过该职位
 def is_job_applied(platform, job_id):
@@ -0,0 +1,235 @@
+"""
+增量抓取水位线
+
+为每个搜索条件记录最近一次运行看到的职位ID及其发布时间。再次运行时，某一页的职位
+全部已出现过（ID在水位线中，或发布时间早于水位线覆盖的最早时间）即停止翻页，
+定时任务每次只需抓取一两页新职位，而不是每次都翻满 max_pages。
+
+只有走完流程（被淘汰或已投递）的职位才写入水位线。运行提前结束时（达到投递上限、
+请求预算用完、搜索到的页面未被处理），未处理的职位下次运行仍会被抓取。AI分析失败、
+投递失败、留在投递队列中未投递等情况由 retry 标记为待重试，即使发布时间早于水位线
+也不会被跳过。
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 支持的发布时间格式及对应的字符串长度
+TIME_FORMATS = (
+    ("%Y-%m-%d %H:%M:%S", 19),
+    ("%Y-%m-%d %H:%M", 16),
+    ("%Y-%m-%d", 10),
+    ("%Y/%m/%d %H:%M:%S", 19),
+    ("%Y/%m/%d", 10),
+)
+
+# 水位线文件目录，每个平台一个文件，平台并发运行时互不干扰
+WATERMARK_DIR = os.path.join("data", "watermarks")
+
+def parse_publish_time(value):
+    """
+    解析职位发布时间
+
+    Args:
+        value: 发布时间，支持常见日期字符串和毫秒/秒级时间戳；"3天前"等相对时间无法解析
+
+    Returns:
+        datetime: 发布时间，无法解析时返回None
+    """
+    if not value:
+        return None
+
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        timestamp = float(value)
+        if timestamp > 1e12:
+            timestamp /= 1000
+        try:
+            return datetime.fromtimestamp(timestamp)
+        except (OverflowError, OSError, ValueError):
+            return None
+
+    text = str(value).strip()
+    for fmt, length in TIME_FORMATS:
+        try:
+            return datetime.strptime(text[:length], fmt)
+        except ValueError:
+            continue
+    return None
+
+class CrawlWatermark:
+    """
+    按搜索条件记录的抓取水位线
+
+    Args:
+        platform: 平台名称，不同平台的水位线互不影响
+        path: 水位线文件路径，默认 data/watermarks/<平台>.json
+        size: 每个搜索条件最多保留的职位ID数量
+        enabled: 为False时不判断也不记录，每次都完整翻页
+    """
+
+    def __init__(self, platform, path=None, size=200, enabled=True):
+        self.platform = platform
+        self.path = path or os.path.join(WATERMARK_DIR, f"{platform}.json")
+        self.size = size
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._watermarks = self._load() if enabled else {}
+        # 本次运行看到、尚未处理完的职位 {职位ID: {搜索条件: 发布时间}}
+        self._pending = {}
+        # 本次运行处理完的职位 {搜索条件: {职位ID: 发布时间}}，保存时合并到水位线
+        self._observed = {}
+        # 本次运行临时失败、下次需要重试的职位 {搜索条件: {职位ID}}
+        self._retry = {}
+
+    def _load(self):
+        """加载本平台的水位线"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"加载抓取水位线失败: {e}")
+            return {}
+
+    def is_seen(self, query, job_id, publish_time=None):
+        """
+        判断职位是否在上次运行中已出现过
+
+        Args:
+            query: 搜索条件标识
+            job_id: 职位ID
+            publish_time: 职位发布时间
+
+        Returns:
+            bool: 是否已出现过
+        """
+        watermark = self._watermarks.get(query)
+        if not watermark:
+            return False
+
+        # 待重试的职位总是视为未出现过
+        if str(job_id) in watermark.get("retry", ()):
+            return False
+        if str(job_id) in watermark["jobs"]:
+            return True
+
+        # 早于水位线覆盖的最早发布时间，说明在上次抓取的范围之外
+        published = parse_publish_time(publish_time)
+        oldest = parse_publish_time(watermark.get("oldest"))
+        return bool(published and oldest and published < oldest)
+
+    def unseen(self, query, jobs, id_field="id", time_field="publish_time"):
+        """
+        过滤出一页中未出现过的职位，这些职位处理完后由 commit 写入水位线
+
+        Args:
+            query: 搜索条件标识
+            jobs: 一页职位列表
+            id_field: 职位ID字段名
+            time_field: 发布时间字段名
+
+        Returns:
+            list: 未出现过的职位；为空表示这一页全部已出现过，应停止翻页
+        """
+        if not self.enabled:
+            return jobs
+
+        new_jobs = [job for job in jobs if not self.is_seen(query, job.get(id_field), job.get(time_field))]
+
+        with self._lock:
+            for job in new_jobs:
+                self._pending.setdefault(str(job.get(id_field)), {}).setdefault(query, job.get(time_field) or None)
+
+        if jobs and not new_jobs:
+            logger.info(f"{self.platform} [{query}] 本页职位均已在上次运行中出现，停止翻页")
+        return new_jobs
+
+    def commit(self, jobs, id_field="id"):
+        """
+        记录已走完流程的职位，保存时写入水位线
+
+        Args:
+            jobs: 职位信息或职位列表
+            id_field: 职位ID字段名
+        """
+        if not self.enabled:
+            return
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+
+        with self._lock:
+            for job in jobs:
+                job_id = str(job.get(id_field))
+                for query, publish_time in self._pending.pop(job_id, {}).items():
+                    self._observed.setdefault(query, {})[job_id] = publish_time
+
+    def retry(self, jobs, id_field="id"):
+        """
+        标记因临时失败（AI分析失败、投递失败）未走完流程的职位，下次运行重新处理
+
+        Args:
+            jobs: 职位信息或职位列表
+            id_field: 职位ID字段名
+        """
+        if not self.enabled:
+            return
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+
+        with self._lock:
+            for job in jobs:
+                job_id = str(job.get(id_field))
+                for query in self._pending.pop(job_id, {}):
+                    self._retry.setdefault(query, set()).add(job_id)
+
+    def save(self):
+        """把本次运行处理完的职位合并进水位线并保存，未处理完的职位不写入"""
+        if not self.enabled:
+            return
+        with self._lock:
+            skipped, self._pending = len(self._pending), {}
+        if skipped:
+            logger.info(f"{self.platform} {skipped} 个职位本次未处理完，不写入抓取水位线")
+        if not self._observed and not self._retry:
+            return
+
+        with self._lock:
+            for query in set(self._observed) | set(self._retry):
+                observed = self._observed.get(query, {})
+                previous = self._watermarks.get(query, {}).get("jobs", {})
+                # 之前待重试的职位本次处理完后不再重试
+                retry = (set(self._watermarks.get(query, {}).get("retry", ())) | self._retry.get(query, set())) - set(observed)
+                # 本次看到的职位在前，超出数量上限时丢弃最旧的记录
+                merged = dict(observed)
+                for job_id, publish_time in previous.items():
+                    merged.setdefault(job_id, publish_time)
+                merged = dict(list(merged.items())[:self.size])
+
+                times = [t for t in (parse_publish_time(v) for v in merged.values()) if t]
+                self._watermarks[query] = {
+                    "jobs": merged,
+                    "oldest": min(times).strftime("%Y-%m-%d %H:%M:%S") if times else None,
+                    "retry": sorted(retry),
+                    "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                }
+            self._observed = {}
+            self._retry = {}
+
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._watermarks, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                logger.info(f"{self.platform} 抓取水位线已保存，共 {len(self._watermarks)} 个搜索条件")
+            except Exception as e:
+                logger.error(f"保存抓取水位线失败: {e}")
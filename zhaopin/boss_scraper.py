@@ -6,11 +6,26 @@ Boss直聘平台爬虫
 
 import os
 import json
+import math
 import time
 import random
 import logging
 import requests
 from bs4 import BeautifulSoup
+
+from parse_pool import parse_page
+from text_normalizer import normalize_job, KeywordMatcher, job_text
+from tfidf_ranker import get_ranker
+from job_requirements import evaluate_jobs
+from config import USER_PREFERENCES
+from pipeline import run_pipeline
+from filter_planner import FilterPlan, FilterRule, LISTING, DETAIL
+from watermark import CrawlWatermark
+from checkpoint import RunCheckpoint, DISCOVERED, DETAILED, FILTERED, APPLIED, REJECTED
+from dedup import get_dedup_index
+from request_budget import RequestBudget, SEARCH_REQUEST, DETAIL_REQUEST, APPLY_REQUEST
+from rate_limiter import get_rate_limiter
+from search_grid import build_queries, iter_grid
 from urllib.parse import urljoin
 import re
 
@@ -25,6 +40,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.zhipin.com"
+
+def parse_search_page(text, base_url=BASE_URL):
+    """解析职位搜索接口返回的JSON
+    
+    Args:
+        text: 接口返回的原始文本
+        base_url: 职位链接的站点前缀
+        
+    Returns:
+        list: 职位信息列表，接口返回异常时为空列表
+    """
+    data = json.loads(text)
+    if not (data.get("code") == 0 and data.get("zpData") and data["zpData"].get("jobList")):
+        return []
+    
+    jobs = data["zpData"]["jobList"]
+    
+    # 提取职位信息
+    job_list = []
+    for job in jobs:
+        job_info = {
+            "jobId": job.get("encryptJobId", ""),
+            "title": job.get("jobName", ""),
+            "salary": job.get("salaryDesc", ""),
+            "company": job.get("encryptBrandId", ""),
+            "company_name": job.get("brandName", ""),
+            "city": job.get("cityName", ""),
+            "experience": job.get("experienceName", ""),
+            "education": job.get("degreeName", ""),
+            "company_size": job.get("scaleName", ""),
+            "company_type": job.get("property", {}).get("name", ""),
+            "publish_time": job.get("timeDesc", ""),
+            "welfare": job.get("welfare", []),
+            "hrInfo": {
+                "name": job.get("geekName", ""),
+                "position": job.get("brandPositionName", "")
+            },
+            "url": f"{base_url}/job_detail/{job.get('encryptJobId', '')}.html"
+        }
+        job_list.append(job_info)
+    
+    return job_list
+
+# 每页职位数，用于按请求预算估算翻页深度
+PAGE_SIZE = 30
+
+# 详情页字段，顺序与 extract_detail_fields 返回的元组一致
+DETAIL_FIELDS = ("job_description", "company_description", "company_address")
+
+def extract_detail_fields(html):
+    """提取职位详情页字段
+    
+    Args:
+        html: 职位详情页HTML
+        
+    Returns:
+        tuple: 按 DETAIL_FIELDS 顺序排列的字段值
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # 提取职位描述
+    job_desc = ""
+    job_desc_div = soup.select_one(".job-detail-section.text")
+    if job_desc_div:
+        job_desc = job_desc_div.get_text(strip=True)
+    
+    # 提取公司介绍
+    company_desc = ""
+    company_desc_div = soup.select_one(".job-sec-text")
+    if company_desc_div:
+        company_desc = company_desc_div.get_text(strip=True)
+    
+    # 提取公司地址
+    company_address = ""
+    address_div = soup.select_one(".location-address")
+    if address_div:
+        company_address = address_div.get_text(strip=True)
+    
+    return (job_desc, company_desc, company_address)
+
+def build_job_detail(fields, job_id):
+    """由字段元组构建职位详情
+    
+    Args:
+        fields: extract_detail_fields 返回的字段元组
+        job_id: 职位ID
+        
+    Returns:
+        dict: 职位详情
+    """
+    job_detail = {"jobId": job_id}
+    job_detail.update(zip(DETAIL_FIELDS, fields))
+    return job_detail
+
+def parse_job_detail(html, job_id):
+    """解析职位详情页
+    
+    Args:
+        html: 职位详情页HTML
+        job_id: 职位ID
+        
+    Returns:
+        dict: 职位详情
+    """
+    return build_job_detail(extract_detail_fields(html), job_id)
+
 class BossZhipin:
     """Boss直聘平台实现"""
     
@@ -35,7 +157,7 @@ class BossZhipin:
             config_path: 配置文件路径
         """
         logger.info("初始化Boss直聘平台")
-        self.base_url = "https://www.zhipin.com"
+        self.base_url = BASE_URL
         self.session = requests.Session()
         
         # 加载配置
@@ -58,16 +180,53 @@ class BossZhipin:
         self.experience = self.config.get("experience", "")
         self.degree = self.config.get("degree", "")
         self.salary = self.config.get("salary", "")
+        # 关键词和城市列表，未配置时使用单个关键词和城市，每个组合作为一个搜索条件
+        self.keywords = self.config.get("keywords") or [self.keyword]
+        # 按匹配度统一投递时与职位比较的求职意向文本，未配置时使用搜索关键词和求职意向
+        self.profile_text = self.config.get("profile_text") or " ".join(self.keywords + USER_PREFERENCES["job_intentions"])
+        self.cities = self.config.get("cities") or [self.city]
+        # 同时搜索的搜索条件数
+        self.search_workers = self.config.get("search_workers", 3)
         self.exclude_keywords = self.config.get("exclude_keywords", [])
         self.company_exclude_keywords = self.config.get("company_exclude_keywords", [])
         self.require_exclude_keywords = self.config.get("require_exclude_keywords", [])
         self.job_exclude_types = self.config.get("job_exclude_types", [])
+        
+        # 预先编译排除关键词
+        self.title_matcher = KeywordMatcher(self.exclude_keywords)
+        self.company_matcher = KeywordMatcher(self.company_exclude_keywords)
+        self.require_matcher = KeywordMatcher(self.require_exclude_keywords)
         self.applied_jobs_path = self.config.get("applied_jobs_path", "applied_jobs.json")
         self.applied_jobs = self._load_applied_jobs()
         
         # 设置请求间隔
         self.min_interval = self.config.get("min_interval", 5)
         self.max_interval = self.config.get("max_interval", 10)
+        self.rate_limiter = get_rate_limiter(self.base_url, self.min_interval, self.max_interval)
+        
+        # 详情页解析进程数，0表示在当前线程解析
+        self.parse_workers = self.config.get("parse_workers", 0)
+        
+        # 按规则所需数据排序的过滤规划
+        self.filter_plan = self.build_filter_plan()
+        
+        # 增量抓取水位线，翻到全部已见过的页面即停止
+        self.watermark = CrawlWatermark(
+            "zhaopin_boss",
+            path=self.config.get("watermark_path"),
+            enabled=self.config.get("incremental_crawl", True),
+        )
+        
+        # 运行检查点，中途退出后下次运行从各职位最后完成的阶段继续
+        self.checkpoint = RunCheckpoint(
+            "zhaopin_boss",
+            id_field="jobId",
+            enabled=self.config.get("resume_checkpoint", True),
+        )
+        # 跨平台重复职位索引，各平台共享
+        self.dedup = get_dedup_index()
+        # 每日请求预算，与其他Boss直聘实现共用
+        self.budget = RequestBudget("boss")
     
     def _load_config(self, config_path):
         """加载配置文件
@@ -191,43 +350,18 @@ class BossZhipin:
         if salary:
             url += f"&salary={salary}"
         
+        if not self.budget.consume(SEARCH_REQUEST):
+            return []
+        
         try:
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
+            # 同一网站的请求之间保持随机间隔，并发搜索时总频率不变
+            self.rate_limiter.wait()
             
             response = self.session.get(url, headers=self.headers)
-            data = response.json()
+            job_list = parse_search_page(response.text, self.base_url)
             
-            if data.get("code") == 0 and data.get("zpData") and data["zpData"].get("jobList"):
-                jobs = data["zpData"]["jobList"]
-                logger.info(f"搜索到 {len(jobs)} 个职位")
-                
-                # 提取职位信息
-                job_list = []
-                for job in jobs:
-                    job_info = {
-                        "jobId": job.get("encryptJobId", ""),
-                        "title": job.get("jobName", ""),
-                        "salary": job.get("salaryDesc", ""),
-                        "company": job.get("encryptBrandId", ""),
-                        "company_name": job.get("brandName", ""),
-                        "city": job.get("cityName", ""),
-                        "experience": job.get("experienceName", ""),
-                        "education": job.get("degreeName", ""),
-                        "company_size": job.get("scaleName", ""),
-                        "company_type": job.get("property", {}).get("name", ""),
-                        "publish_time": job.get("timeDesc", ""),
-                        "welfare": job.get("welfare", []),
-                        "hrInfo": {
-                            "name": job.get("geekName", ""),
-                            "position": job.get("brandPositionName", "")
-                        },
-                        "url": f"{self.base_url}/job_detail/{job.get('encryptJobId', '')}.html"
-                    }
-                    job_list.append(job_info)
-                    
+            if job_list:
+                logger.info(f"搜索到 {len(job_list)} 个职位")
                 return job_list
             else:
                 logger.warning("搜索Boss直聘职位失败")
@@ -246,43 +380,19 @@ class BossZhipin:
             dict: 职位详情
         """
         logger.info(f"获取Boss直聘职位详情: {job_id}")
+        if not self.budget.consume(DETAIL_REQUEST):
+            return {}
+        
         try:
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
+            # 同一网站的请求之间保持随机间隔，并发搜索时总频率不变
+            self.rate_limiter.wait()
             
             url = f"{self.base_url}/job_detail/{job_id}.html"
             response = self.session.get(url, headers=self.headers)
             
             if response.status_code == 200:
-                html = response.text
-                soup = BeautifulSoup(html, "html.parser")
-                
-                # 提取职位描述
-                job_desc = ""
-                job_desc_div = soup.select_one(".job-detail-section.text")
-                if job_desc_div:
-                    job_desc = job_desc_div.get_text(strip=True)
-                
-                # 提取公司介绍
-                company_desc = ""
-                company_desc_div = soup.select_one(".job-sec-text")
-                if company_desc_div:
-                    company_desc = company_desc_div.get_text(strip=True)
-                
-                # 提取公司地址
-                company_address = ""
-                address_div = soup.select_one(".location-address")
-                if address_div:
-                    company_address = address_div.get_text(strip=True)
-                
-                job_detail = {
-                    "jobId": job_id,
-                    "job_description": job_desc,
-                    "company_description": company_desc,
-                    "company_address": company_address,
-                }
+                fields = parse_page(extract_detail_fields, response.content, response.encoding, self.parse_workers)
+                job_detail = build_job_detail(fields, job_id)
                 
                 logger.info(f"获取Boss直聘职位详情成功: {job_id}")
                 return job_detail
@@ -293,6 +403,42 @@ class BossZhipin:
             logger.error(f"获取职位详情失败: {e}")
             return {}
     
+    def build_filter_plan(self):
+        """按配置构建过滤规划，未配置的规则不参与过滤
+        
+        Returns:
+            FilterPlan: 过滤规划
+        """
+        rules = [
+            FilterRule("已申请", ("jobId",),
+                       lambda job: "已申请" if job.get("jobId") in self.applied_jobs else None),
+            # 薪资、经验、学历按批量评估
+            FilterRule("求职偏好", ("salary", "experience", "education"),
+                       lambda jobs: evaluate_jobs(jobs, USER_PREFERENCES)[1], batch=True),
+        ]
+        if self.title_matcher:
+            rules.append(FilterRule("标题关键词", ("title",),
+                                    lambda job: self.title_matcher.search(job["folded"]["title"])))
+        if self.company_matcher:
+            rules.append(FilterRule("公司关键词", ("company_name",),
+                                    lambda job: self.company_matcher.search(job["folded"]["company"])))
+        if self.job_exclude_types:
+            rules.append(FilterRule("公司类型", ("company_type",),
+                                    lambda job: job.get("company_type") if job.get("company_type") in self.job_exclude_types else None))
+        if self.config.get("cross_platform_dedup", True):
+            # 其他平台已登记的同公司、同城市、同名职位，在获取详情前剔除
+            rules.append(FilterRule("跨平台重复", ("title", "company_name", "city", "salary"),
+                                    lambda job: self.dedup.check_listing("boss", job.get("jobId"), job["normalized"]["company"], job["normalized"]["title"], job.get("city"), job.get("salary"))))
+        if self.require_matcher:
+            rules.append(FilterRule("职位描述关键词", ("job_description",),
+                                    lambda job: self.require_matcher.search(job["folded"]["description"])))
+            if self.config.get("cross_platform_dedup", True):
+                # 已经需要获取详情时，再按描述的SimHash剔除改了职位名的近似重复
+                rules.append(FilterRule("描述重复", ("job_description",),
+                                        lambda job: self.dedup.check_description("boss", job.get("jobId"), job["normalized"]["company"], job["normalized"]["description"])))
+        
+        return FilterPlan(rules, DETAIL_FIELDS, name="Boss直聘")
+    
     def filter_jobs(self, jobs):
         """过滤职位
         
@@ -303,189 +449,74 @@ class BossZhipin:
             list: 过滤后的职位列表
         """
         logger.info(f"过滤Boss直聘职位，共 {len(jobs)} 个职位")
-        filtered_jobs = []
-        
-        for job in jobs:
-            # 已申请过的职位跳过
-            if job.get("jobId") in self.applied_jobs:
-                logger.debug(f"跳过已申请的职位: {job.get('title')} - {job.get('company_name')}")
-                continue
-            
-            # 标题关键词过滤
-            if any(kw.lower() in job.get("title", "").lower() for kw in self.exclude_keywords):
-                logger.debug(f"职位标题包含排除关键词，跳过: {job.get('title')}")
-                continue
-            
-            # 公司名称关键词过滤
-            if any(kw.lower() in job.get("company_name", "").lower() for kw in self.company_exclude_keywords):
-                logger.debug(f"公司名称包含排除关键词，跳过: {job.get('company_name')}")
-                continue
-            
-            # 获取职位详情
-            job_detail = self.get_job_detail(job.get("jobId"))
-            if not job_detail:
-                logger.debug(f"获取职位详情失败，跳过: {job.get('title')}")
-                continue
-            
-            # 合并职位信息
-            job.update(job_detail)
-            
-            # 职位描述关键词过滤
-            if any(kw.lower() in job.get("job_description", "").lower() for kw in self.require_exclude_keywords):
-                logger.debug(f"职位描述包含排除关键词，跳过: {job.get('title')}")
-                continue
-            
-            # 公司类型过滤
-            if job.get("company_type") in self.job_exclude_types:
-                logger.debug(f"公司类型在排除列表中，跳过: {job.get('company_type')}")
-                continue
-            
-            filtered_jobs.append(job)
+        filtered_jobs = [job for job in self.filter_listing(jobs) if self.filter_detail(job)]
+        self.filter_plan.log_report()
         
         logger.info(f"过滤后剩余 {len(filtered_jobs)} 个职位")
         return filtered_jobs
     
-    def get_chat_id(self, job_id):
-        """获取聊天ID
+    def filter_listing(self, jobs):
+        """对一批职位执行只依赖搜索结果字段的规则，不发起请求
         
         Args:
-            job_id: 职位ID
+            jobs: 职位列表
             
         Returns:
-            str: 聊天ID
+            list: 通过初筛的职位列表
         """
-        logger.info(f"获取Boss直聘职位聊天ID: {job_id}")
-        try:
-            url = f"{self.base_url}/wapi/zpgeek/message/start/v2.json"
-            payload = {
-                "jobId": job_id,
-                "brandId": "",
-                "lid": "",
-                "source": 0
-            }
-            
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
-            
-            response = self.session.post(url, json=payload, headers=self.headers)
-            data = response.json()
-            
-            if data.get("code") == 0 and data.get("zpData") and data["zpData"].get("id"):
-                chat_id = data["zpData"]["id"]
-                logger.info(f"获取Boss直聘职位聊天ID成功: {chat_id}")
-                return chat_id
+        resumed_jobs, new_jobs = [], []
+        for job in jobs:
+            # 规范化职位文本，后续过滤只使用规范化结果；检查点中不保存规范化结果，恢复的职位也需重新计算
+            normalize_job(job)
+            if self.checkpoint.state(job) in (DETAILED, FILTERED):
+                # 上次运行中已通过初筛
+                resumed_jobs.append(job)
             else:
-                logger.warning(f"获取Boss直聘职位聊天ID失败: {data.get('message', '')}")
-                return ""
-        except Exception as e:
-            logger.error(f"获取聊天ID失败: {e}")
-            return ""
-    
-    def send_greeting(self, chat_id, greeting=None):
-        """发送打招呼消息
+                new_jobs.append(job)
         
-        Args:
-            chat_id: 聊天ID
-            greeting: 打招呼消息
-            
-        Returns:
-            bool: 是否发送成功
-        """
-        if not greeting:
-            greeting = self.config.get("greeting", "您好，我对贵公司的职位很感兴趣，希望能有机会进一步了解。")
+        self.checkpoint.record(new_jobs, DISCOVERED)
+        listed_jobs = self.filter_plan.apply(LISTING, new_jobs)
+        listed_ids = {id(job) for job in listed_jobs}
+        rejected_jobs = [job for job in new_jobs if id(job) not in listed_ids]
+        self.checkpoint.record(rejected_jobs, REJECTED, "初筛未通过")
+        self.watermark.commit(rejected_jobs, id_field="jobId")
         
-        logger.info(f"发送Boss直聘打招呼消息: {chat_id}")
-        try:
-            url = f"{self.base_url}/wapi/zprelation/message/save.json"
-            payload = {
-                "contactId": chat_id,
-                "switchOn": True,
-                "replyTemplateId": "",
-                "content": greeting
-            }
-            
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
-            
-            response = self.session.post(url, json=payload, headers=self.headers)
-            data = response.json()
-            
-            if data.get("code") == 0:
-                logger.info(f"发送Boss直聘打招呼消息成功: {chat_id}")
-                return True
-            else:
-                logger.warning(f"发送Boss直聘打招呼消息失败: {data.get('message', '')}")
-                return False
-        except Exception as e:
-            logger.error(f"发送打招呼消息失败: {e}")
-            return False
+        return resumed_jobs + listed_jobs
     
-    def send_resume_image(self, chat_id):
-        """发送简历图片
+    def filter_detail(self, job):
+        """获取职位详情并执行依赖详情字段的规则，没有此类规则时不获取详情
         
         Args:
-            chat_id: 聊天ID
+            job: 通过初筛的职位
             
         Returns:
-            bool: 是否发送成功
+            bool: 是否通过过滤
         """
-        resume_path = self.config.get("resume_image_path", "")
-        if not resume_path or not os.path.exists(resume_path):
-            logger.warning(f"简历图片不存在: {resume_path}")
-            return False
+        state = self.checkpoint.state(job)
+        if state == FILTERED:
+            return True
         
-        logger.info(f"发送Boss直聘简历图片: {chat_id}")
-        try:
-            url = f"{self.base_url}/wapi/zprelation/attachment/resume/upload/image.json"
+        if not self.filter_plan.needs_detail:
+            self.checkpoint.record(job, FILTERED)
+            return True
+        
+        # 获取职位详情，上次运行已获取过的直接使用检查点中的详情
+        if state != DETAILED:
+            job_detail = self.get_job_detail(job.get("jobId"))
+            if not job_detail:
+                logger.debug(f"获取职位详情失败，跳过: {job.get('title')}")
+                return False
             
-            with open(resume_path, "rb") as f:
-                files = {"file": f}
-                
-                # 添加随机延迟
-                sleep_time = random.uniform(self.min_interval, self.max_interval)
-                logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-                time.sleep(sleep_time)
-                
-                response = self.session.post(url, files=files, headers=self.headers)
-                data = response.json()
-                
-                if data.get("code") == 0 and data.get("zpData") and data["zpData"].get("mediaId"):
-                    media_id = data["zpData"]["mediaId"]
-                    
-                    # 发送图片消息
-                    message_url = f"{self.base_url}/wapi/zprelation/message/save.json"
-                    payload = {
-                        "contactId": chat_id,
-                        "switchOn": True,
-                        "replyTemplateId": "",
-                        "attachmentMediaId": media_id,
-                        "content": "简历"
-                    }
-                    
-                    # 添加随机延迟
-                    sleep_time = random.uniform(self.min_interval, self.max_interval)
-                    logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-                    time.sleep(sleep_time)
-                    
-                    message_response = self.session.post(message_url, json=payload, headers=self.headers)
-                    message_data = message_response.json()
-                    
-                    if message_data.get("code") == 0:
-                        logger.info(f"发送Boss直聘简历图片成功: {chat_id}")
-                        return True
-                    else:
-                        logger.warning(f"发送Boss直聘简历图片消息失败: {message_data.get('message', '')}")
-                        return False
-                else:
-                    logger.warning(f"上传Boss直聘简历图片失败: {data.get('message', '')}")
-                    return False
-        except Exception as e:
-            logger.error(f"发送简历图片失败: {e}")
-            return False
+            # 合并职位信息
+            job.update(job_detail)
+            normalize_job(job, ("description",))
+            self.checkpoint.record(job, DETAILED)
+        
+        passed = bool(self.filter_plan.apply(DETAIL, [job]))
+        self.checkpoint.record(job, FILTERED if passed else REJECTED, None if passed else "详情过滤未通过")
+        if not passed:
+            self.watermark.commit(job, id_field="jobId")
+        return passed
     
     def apply_job(self, job):
         """申请职位
@@ -503,6 +534,9 @@ class BossZhipin:
         
         logger.info(f"申请Boss直聘职位: {job.get('title', '未知职位')} - {job.get('company_name', '未知公司')}")
         
+        if not self.budget.consume(APPLY_REQUEST):
+            return False
+        
         # 获取聊天ID
         chat_id = self.get_chat_id(job_id)
         if not chat_id:
@@ -525,8 +559,165 @@ class BossZhipin:
         logger.info(f"申请Boss直聘职位成功: {job.get('title', '未知职位')} - {job.get('company_name', '未知公司')}")
         return True
     
-    def run(self):
-        """执行求职流程"""
+    def search_query_pages(self, query):
+        """按一个搜索条件逐页搜索，翻到全部已见过的页面即停止
+        
+        Args:
+            query: (关键词, 城市, 最大页数)
+            
+        Yields:
+            list: 每一页上次运行之后出现的职位列表
+        """
+        keyword, city, max_pages = query
+        watermark_query = f"{keyword}|{city}|{self.experience}|{self.degree}|{self.salary}"
+        for page in range(1, max_pages + 1):
+            jobs = self.search_jobs(keyword=keyword, city=city, page=page)
+            if not jobs:
+                logger.info(f"[{keyword} {city}] 第 {page} 页没有搜索到职位，停止搜索")
+                break
+            
+            # 只处理上次运行之后出现的职位，整页都已见过时停止翻页
+            jobs = self.watermark.unseen(watermark_query, jobs, id_field="jobId")
+            if not jobs:
+                break
+            yield jobs
+    
+    def iter_search_pages(self):
+        """按关键词和城市的组合并发搜索，跨搜索条件按职位ID去重
+        
+        Yields:
+            list: 每一页中尚未出现过的职位列表
+        """
+        queries = build_queries(self.keywords, self.cities)
+        # 根据今日剩余的搜索和详情预算决定所有搜索条件合计的翻页数，再平均分给各搜索条件
+        total_pages = self.budget.plan_pages(
+            self.config.get("max_pages", 5) * len(queries),
+            PAGE_SIZE,
+            detail_ratio=1.0 if self.filter_plan.needs_detail else 0,
+        )
+        max_pages = math.ceil(total_pages / len(queries)) if queries else 0
+        max_jobs = self.config.get("max_jobs", 100)
+        total_jobs = 0
+        logger.info(f"共 {len(queries)} 个搜索条件，每个最多 {max_pages} 页，同时搜索 {self.search_workers} 个")
+        
+        # 先恢复上次中断的运行中未完成的职位
+        resumed_jobs = self.checkpoint.resumable()
+        job_ids = {job.get("jobId") for job in resumed_jobs}
+        if resumed_jobs:
+            logger.info(f"恢复上次未完成的 {len(resumed_jobs)} 个职位")
+            yield resumed_jobs
+        
+        pages = iter_grid([(keyword, city, max_pages) for keyword, city in queries], self.search_query_pages, self.search_workers)
+        try:
+            for _, jobs in pages:
+                # 跨搜索条件去重，并跳过检查点中已经处理过的职位
+                unique_jobs = []
+                for job in jobs:
+                    if job.get("jobId") not in job_ids and not self.checkpoint.known(job):
+                        job_ids.add(job.get("jobId"))
+                        unique_jobs.append(job)
+                
+                total_jobs += len(unique_jobs)
+                logger.info(f"已搜索到 {total_jobs} 个新职位")
+                if unique_jobs:
+                    yield unique_jobs
+                
+                # 判断是否达到最大职位数
+                if total_jobs >= max_jobs:
+                    logger.info(f"已达到最大职位数 {max_jobs}，停止搜索")
+                    break
+        finally:
+            # 流水线停止或达到最大职位数时立即通知搜索线程停止翻页
+            pages.close()
+    
+    def apply_and_record(self, job):
+        """申请职位并记录检查点，申请成功后随机延迟
+        
+        Args:
+            job: 职位信息
+            
+        Returns:
+            bool: 是否申请成功
+        """
+        # 按匹配度统一投递时，其他平台的同一职位可能刚在本轮申请过
+        duplicate = self.find_duplicate(job)
+        if duplicate:
+            logger.info(f"跳过其他平台已申请的同一职位: {job.get('title')}（{duplicate}）")
+            self.checkpoint.record(job, REJECTED, f"跨平台重复 {duplicate}")
+            self.watermark.commit(job, id_field="jobId")
+            return False
+        
+        # 申请失败的职位不写入水位线，标记为待重试，下次运行重新申请
+        if not self.apply_job(job):
+            self.checkpoint.record(job, REJECTED, "申请失败")
+            self.watermark.retry(job, id_field="jobId")
+            return False
+        
+        self.checkpoint.record(job, APPLIED)
+        self.register_accepted(job)
+        self.watermark.commit(job, id_field="jobId")
+        
+        # 申请间随机延迟
+        sleep_time = random.uniform(self.min_interval * 3, self.max_interval * 3)
+        logger.debug(f"申请间随机延迟 {sleep_time:.2f} 秒")
+        time.sleep(sleep_time)
+        return True
+    
+    def match_score(self, job):
+        """按职位名称和描述与求职意向文本的TF-IDF相似度计算匹配度
+        
+        Args:
+            job: 职位信息
+            
+        Returns:
+            float: 0-100的匹配度
+        """
+        text = f'{job_text(job, "title", folded=True)} {job_text(job, "description", folded=True)}'
+        similarity = get_ranker().similarities([text], self.profile_text, folded=True)[0]
+        return round(float(similarity) * 100, 1)
+    
+    def register_accepted(self, job):
+        """登记已申请的职位，其他平台的同一职位不再处理
+        
+        Args:
+            job: 职位信息
+        """
+        if self.config.get("cross_platform_dedup", True):
+            self.dedup.register("boss", job.get("jobId"), job_text(job, "company"), job_text(job, "title"),
+                                job.get("city"), job.get("salary"), job.get("normalized", {}).get("description"))
+    
+    def find_duplicate(self, job):
+        """查找其他平台已申请的同一职位
+        
+        Args:
+            job: 职位信息
+            
+        Returns:
+            str: 重复职位的描述，没有重复时返回None
+        """
+        if not self.config.get("cross_platform_dedup", True):
+            return None
+        return self.dedup.check_listing("boss", job.get("jobId"), job_text(job, "company"), job_text(job, "title"),
+                                        job.get("city"), job.get("salary"))
+    
+    def finish_run(self):
+        """结束本次运行，输出过滤统计并保存水位线、重复职位索引和TF-IDF词表，清空检查点"""
+        self.filter_plan.log_report()
+        self.watermark.save()
+        self.dedup.save()
+        get_ranker().save()
+        self.checkpoint.clear()
+        self.budget.log_summary()
+    
+    def run(self, apply_queue=None):
+        """执行求职流程
+        
+        Args:
+            apply_queue: 跨平台投递优先队列，提供时只收集通过过滤的职位，由队列统一按匹配度投递
+            
+        Returns:
+            bool: 是否申请（或收集）到职位
+        """
         logger.info("执行Boss直聘求职流程")
         
         # 检查登录状态
@@ -539,47 +730,57 @@ class BossZhipin:
         if not user_profile:
             logger.warning("获取用户简历失败，继续执行求职流程")
         
-        # 搜索职位
-        all_jobs = []
-        for page in range(1, self.config.get("max_pages", 5) + 1):
-            jobs = self.search_jobs(page=page)
-            if not jobs:
-                logger.info(f"第 {page} 页没有搜索到职位，停止搜索")
-                break
-            
-            all_jobs.extend(jobs)
-            logger.info(f"已搜索到 {len(all_jobs)} 个职位")
-            
-            # 判断是否达到最大职位数
-            if len(all_jobs) >= self.config.get("max_jobs", 100):
-                logger.info(f"已达到最大职位数 {self.config.get('max_jobs', 100)}，停止搜索")
-                break
-            
-            # 添加页面间随机延迟
-            if page < self.config.get("max_pages", 5):
-                sleep_time = random.uniform(self.min_interval * 2, self.max_interval * 2)
-                logger.debug(f"页面间随机延迟 {sleep_time:.2f} 秒")
-                time.sleep(sleep_time)
-        
-        # 过滤职位
-        filtered_jobs = self.filter_jobs(all_jobs)
-        
-        # 申请职位
+        max_apply = self.budget.plan_applies(self.config.get("max_apply", 10))
+        if max_apply <= 0:
+            logger.warning("今日投递预算已用完，退出求职流程")
+            return False
         applied_count = 0
-        for job in filtered_jobs:
-            if applied_count >= self.config.get("max_apply", 10):
-                logger.info(f"已达到最大申请数 {self.config.get('max_apply', 10)}，停止申请")
-                break
+        
+        def apply(job):
+            """投递通过过滤的职位，达到最大申请数时返回False停止流水线"""
+            nonlocal applied_count
+            if applied_count >= max_apply:
+                logger.info(f"已达到最大申请数 {max_apply}，停止申请")
+                return False
             
-            if self.apply_job(job):
+            if self.apply_and_record(job):
                 applied_count += 1
-                
-                # 申请间随机延迟
-                if applied_count < len(filtered_jobs) and applied_count < self.config.get("max_apply", 10):
-                    sleep_time = random.uniform(self.min_interval * 3, self.max_interval * 3)
-                    logger.debug(f"申请间随机延迟 {sleep_time:.2f} 秒")
-                    time.sleep(sleep_time)
-        
+                if applied_count >= max_apply:
+                    logger.info(f"已达到最大申请数 {max_apply}，停止申请")
+                    return False
+            return True
+        
+        def collect(job):
+            """收集通过过滤的职位，交给投递队列统一投递"""
+            nonlocal applied_count
+            job["match_score"] = self.match_score(job)
+            # 申请后才登记重复职位索引和写入水位线，未申请的职位下次运行仍会处理
+            apply_queue.push("boss", job, job["match_score"])
+            applied_count += 1
+            return True
+        
+        if apply_queue is not None:
+            apply_queue.register("boss", self.apply_and_record, max_apply, on_done=self.finish_run,
+                                 on_skip=lambda job: self.watermark.retry(job, id_field="jobId"))
+        
+        # 搜索、初筛、详情过滤和申请以流水线方式同时推进，职位通过过滤后立即申请
+        run_pipeline(
+            self.iter_search_pages(),
+            [
+                ("初筛", self.filter_listing),
+                ("详情", lambda job: [job] if self.filter_detail(job) else []),
+            ],
+            apply if apply_queue is None else collect,
+            buffer_size=self.config.get("pipeline_buffer", 20),
+            name="Boss直聘",
+        )
+        
+        if apply_queue is not None:
+            # 检查点保留到队列投递完成后再清空
+            logger.info(f"Boss直聘职位收集完成，共 {applied_count} 个职位进入投递队列")
+            return applied_count > 0
+        
+        self.finish_run()
         logger.info(f"Boss直聘求职流程执行完成，共申请 {applied_count} 个职位")
         return applied_count > 0
 
@@ -6,12 +6,28 @@
 
 import os
 import json
+import math
 import time
 import random
 import logging
+import re
 import requests
 from bs4 import BeautifulSoup
 
+from parse_pool import parse_page
+from text_normalizer import normalize_job, KeywordMatcher, job_text
+from tfidf_ranker import get_ranker
+from job_requirements import evaluate_jobs
+from config import USER_PREFERENCES
+from pipeline import run_pipeline
+from filter_planner import FilterPlan, FilterRule, LISTING, DETAIL
+from watermark import CrawlWatermark
+from checkpoint import RunCheckpoint, DISCOVERED, DETAILED, FILTERED, APPLIED, REJECTED
+from dedup import get_dedup_index
+from request_budget import RequestBudget, SEARCH_REQUEST, DETAIL_REQUEST, APPLY_REQUEST
+from rate_limiter import get_rate_limiter
+from search_grid import build_queries, iter_grid
+
 # 设置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +39,251 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.51job.com"
+
+# 搜索结果页内嵌的结果数据变量名
+SEARCH_RESULT_MARKER = "window.__SEARCH_RESULT__"
+
+# 匹配工作经验属性，如 "3-4年经验"、"无需经验"、"在校生/应届生"
+EXPERIENCE_PATTERN = re.compile(r'经验|应届|在校|\d+年')
+
+# 前程无忧的学历取值
+EDUCATION_LEVELS = ("初中及以下", "高中", "中技", "中专", "大专", "本科", "硕士", "博士")
+
+_json_decoder = json.JSONDecoder()
+
+def extract_search_payload(html):
+    """提取搜索结果页内嵌的结果数据
+    
+    只定位一次变量名，然后从其后的第一个大括号开始解码JSON，不构建DOM树。
+    
+    Args:
+        html: 搜索结果页HTML
+        
+    Returns:
+        dict: 结果数据，页面中没有内嵌数据或解码失败时返回None
+    """
+    start = html.find(SEARCH_RESULT_MARKER)
+    if start < 0:
+        return None
+    
+    start = html.find("{", start + len(SEARCH_RESULT_MARKER))
+    if start < 0:
+        return None
+    
+    try:
+        payload, _ = _json_decoder.raw_decode(html, start)
+    except ValueError:
+        return None
+    
+    return payload if isinstance(payload, dict) else None
+
+def parse_search_payload(payload):
+    """解析内嵌结果数据中的职位列表
+    
+    Args:
+        payload: extract_search_payload 返回的结果数据
+        
+    Returns:
+        list: 职位信息列表
+    """
+    job_list = []
+    for job in payload.get("engine_search_result") or payload.get("engine_jds") or []:
+        # attribute_text 形如 ["上海-浦东新区", "3-4年经验", "本科", "招2人"]
+        attributes = job.get("attribute_text") or []
+        experience = next((attr for attr in attributes[1:] if EXPERIENCE_PATTERN.search(attr)), "")
+        education = next((attr for attr in attributes if attr in EDUCATION_LEVELS), "")
+        
+        job_info = {
+            "jobId": str(job.get("jobid", "")),
+            "title": job.get("job_name", ""),
+            "salary": job.get("providesalary_text", ""),
+            "company_name": job.get("company_name", ""),
+            "location": job.get("workarea_text", ""),
+            "publish_time": job.get("updatedate", ""),
+            "url": job.get("job_href", ""),
+            "experience": experience,
+            "education": education,
+            "company_size": job.get("companysize_text", ""),
+            "company_type": job.get("companytype_text", ""),
+        }
+        job_list.append(job_info)
+    
+    return job_list
+
+def parse_search_page(html, mode="auto"):
+    """解析职位搜索结果页
+    
+    Args:
+        html: 搜索结果页HTML
+        mode: 解析方式，"auto" 优先使用内嵌结果数据，缺失时退回DOM解析；"dom" 只做DOM解析
+        
+    Returns:
+        list: 职位信息列表
+    """
+    if mode != "dom":
+        payload = extract_search_payload(html)
+        if payload is not None:
+            return parse_search_payload(payload)
+        logger.debug("搜索结果页中没有内嵌结果数据，使用DOM解析")
+    
+    return parse_search_dom(html)
+
+def parse_search_dom(html):
+    """通过遍历DOM解析职位搜索结果页
+    
+    Args:
+        html: 搜索结果页HTML
+        
+    Returns:
+        list: 职位信息列表
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # 提取职位列表
+    job_items = soup.select(".j_joblist .e")
+    
+    # 提取职位信息
+    job_list = []
+    for item in job_items:
+        # 提取职位ID
+        job_id = ""
+        job_link = item.select_one(".el a")
+        if job_link and "href" in job_link.attrs:
+            job_id_match = re.search(r'jobid=(\d+)', job_link["href"])
+            if job_id_match:
+                job_id = job_id_match.group(1)
+    
+        # 提取职位标题
+        title = ""
+        title_elem = item.select_one(".jname")
+        if title_elem:
+            title = title_elem.get_text(strip=True)
+    
+        # 提取公司名称
+        company_name = ""
+        company_elem = item.select_one(".cname a")
+        if company_elem:
+            company_name = company_elem.get_text(strip=True)
+    
+        # 提取薪资
+        salary = ""
+        salary_elem = item.select_one(".sal")
+        if salary_elem:
+            salary = salary_elem.get_text(strip=True)
+    
+        # 提取工作地点
+        location = ""
+        location_elem = item.select_one(".d at")
+        if location_elem:
+            location = location_elem.get_text(strip=True)
+    
+        # 提取发布时间
+        publish_time = ""
+        time_elem = item.select_one(".time")
+        if time_elem:
+            publish_time = time_elem.get_text(strip=True)
+    
+        # 构建职位URL
+        job_url = ""
+        if job_link and "href" in job_link.attrs:
+            job_url = job_link["href"]
+    
+        job_info = {
+            "jobId": job_id,
+            "title": title,
+            "salary": salary,
+            "company_name": company_name,
+            "location": location,
+            "publish_time": publish_time,
+            "url": job_url
+        }
+        job_list.append(job_info)
+    
+    return job_list
+
+# 每页职位数，用于按请求预算估算翻页深度
+PAGE_SIZE = 50
+
+# 详情页字段，顺序与 extract_detail_fields 返回的元组一致
+DETAIL_FIELDS = ("job_description", "company_description", "company_address", "experience", "education")
+
+# 只能从详情页获得的字段，经验和学历在搜索结果中已经提供
+DETAIL_ONLY_FIELDS = ("job_description", "company_description", "company_address")
+
+def extract_detail_fields(html):
+    """提取职位详情页字段
+    
+    Args:
+        html: 职位详情页HTML
+        
+    Returns:
+        tuple: 按 DETAIL_FIELDS 顺序排列的字段值
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # 提取职位描述
+    job_desc = ""
+    job_desc_div = soup.select_one(".bmsg.job_msg.inbox")
+    if job_desc_div:
+        job_desc = job_desc_div.get_text(strip=True)
+    
+    # 提取公司介绍
+    company_desc = ""
+    company_desc_div = soup.select_one(".tmsg.inbox")
+    if company_desc_div:
+        company_desc = company_desc_div.get_text(strip=True)
+    
+    # 提取工作地址
+    company_address = ""
+    address_div = soup.select_one(".bmsg.inbox.p_area")
+    if address_div:
+        company_address = address_div.get_text(strip=True)
+    
+    # 提取工作经验要求
+    experience = ""
+    exp_text = ""
+    exp_elem = soup.select_one(".msg.ltype")
+    if exp_elem:
+        exp_text = exp_elem.get_text(strip=True)
+        exp_match = re.search(r'经验：(.*?)学历', exp_text)
+        if exp_match:
+            experience = exp_match.group(1).strip()
+    
+    # 提取学历要求，到分隔符、下一个 "xx：" 标签或文本末尾为止
+    education = ""
+    edu_match = re.search(r'学历：(.*?)(?=[|｜]|[\u4e00-\u9fff]{2,4}：|$)', exp_text)
+    if edu_match:
+        education = edu_match.group(1).strip()
+    
+    return (job_desc, company_desc, company_address, experience, education)
+
+def build_job_detail(fields, job_id):
+    """由字段元组构建职位详情
+    
+    Args:
+        fields: extract_detail_fields 返回的字段元组
+        job_id: 职位ID
+        
+    Returns:
+        dict: 职位详情
+    """
+    job_detail = {"jobId": job_id}
+    job_detail.update(zip(DETAIL_FIELDS, fields))
+    return job_detail
+
+def parse_job_detail(html, job_id):
+    """解析职位详情页
+    
+    Args:
+        html: 职位详情页HTML
+        job_id: 职位ID
+        
+    Returns:
+        dict: 职位详情
+    """
+    return build_job_detail(extract_detail_fields(html), job_id)
+
 class QianChengWuYou:
     """前程无忧平台实现"""
     
@@ -33,7 +294,7 @@ class QianChengWuYou:
             config_path: 配置文件路径
         """
         logger.info("初始化前程无忧平台")
-        self.base_url = "https://www.51job.com"
+        self.base_url = BASE_URL
         self.session = requests.Session()
         
         # 加载配置
@@ -56,16 +317,56 @@ class QianChengWuYou:
         self.experience = self.config.get("qiancheng_experience", "")
         self.degree = self.config.get("qiancheng_degree", "")
         self.salary = self.config.get("qiancheng_salary", "")
+        # 关键词和城市列表，未配置时使用单个关键词和城市，每个组合作为一个搜索条件
+        self.keywords = self.config.get("keywords") or [self.keyword]
+        # 按匹配度统一投递时与职位比较的求职意向文本，未配置时使用搜索关键词和求职意向
+        self.profile_text = self.config.get("profile_text") or " ".join(self.keywords + USER_PREFERENCES["job_intentions"])
+        self.cities = self.config.get("qiancheng_cities") or [self.city]
+        # 同时搜索的搜索条件数
+        self.search_workers = self.config.get("search_workers", 3)
         self.exclude_keywords = self.config.get("exclude_keywords", [])
         self.company_exclude_keywords = self.config.get("company_exclude_keywords", [])
         self.require_exclude_keywords = self.config.get("require_exclude_keywords", [])
         self.job_exclude_types = self.config.get("job_exclude_types", [])
+        
+        # 预先编译排除关键词
+        self.title_matcher = KeywordMatcher(self.exclude_keywords)
+        self.company_matcher = KeywordMatcher(self.company_exclude_keywords)
+        self.require_matcher = KeywordMatcher(self.require_exclude_keywords)
         self.applied_jobs_path = self.config.get("qiancheng_applied_jobs_path", "qiancheng_applied_jobs.json")
         self.applied_jobs = self._load_applied_jobs()
         
         # 设置请求间隔
         self.min_interval = self.config.get("min_interval", 5)
         self.max_interval = self.config.get("max_interval", 10)
+        self.rate_limiter = get_rate_limiter(self.base_url, self.min_interval, self.max_interval)
+        
+        # 详情页解析进程数，0表示在当前线程解析
+        self.parse_workers = self.config.get("parse_workers", 0)
+        
+        # 搜索结果解析方式，auto 优先使用页面内嵌的结果数据
+        self.search_mode = self.config.get("qiancheng_search_mode", "auto")
+        
+        # 按规则所需数据排序的过滤规划
+        self.filter_plan = self.build_filter_plan()
+        
+        # 增量抓取水位线，翻到全部已见过的页面即停止
+        self.watermark = CrawlWatermark(
+            "zhaopin_qiancheng",
+            path=self.config.get("qiancheng_watermark_path"),
+            enabled=self.config.get("incremental_crawl", True),
+        )
+        
+        # 运行检查点，中途退出后下次运行从各职位最后完成的阶段继续
+        self.checkpoint = RunCheckpoint(
+            "zhaopin_qiancheng",
+            id_field="jobId",
+            enabled=self.config.get("resume_checkpoint", True),
+        )
+        # 跨平台重复职位索引，各平台共享
+        self.dedup = get_dedup_index()
+        # 每日请求预算
+        self.budget = RequestBudget("qiancheng")
     
     def _load_config(self, config_path):
         """加载配置文件
@@ -207,79 +508,19 @@ class QianChengWuYou:
         if salary:
             params["providesalary"] = salary
         
+        if not self.budget.consume(SEARCH_REQUEST):
+            return []
+        
         try:
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
+            # 同一网站的请求之间保持随机间隔，并发搜索时总频率不变
+            self.rate_limiter.wait()
             
             url = f"{self.base_url}/s/hot_search.php"
             response = self.session.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
-                html = response.text
-                soup = BeautifulSoup(html, "html.parser")
-                
-                # 提取职位列表
-                job_items = soup.select(".j_joblist .e")
-                logger.info(f"搜索到 {len(job_items)} 个职位")
-                
-                # 提取职位信息
-                job_list = []
-                for item in job_items:
-                    # 提取职位ID
-                    job_id = ""
-                    job_link = item.select_one(".el a")
-                    if job_link and "href" in job_link.attrs:
-                        job_id_match = re.search(r'jobid=(\d+)', job_link["href"])
-                        if job_id_match:
-                            job_id = job_id_match.group(1)
-                    
-                    # 提取职位标题
-                    title = ""
-                    title_elem = item.select_one(".jname")
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                    
-                    # 提取公司名称
-                    company_name = ""
-                    company_elem = item.select_one(".cname a")
-                    if company_elem:
-                        company_name = company_elem.get_text(strip=True)
-                    
-                    # 提取薪资
-                    salary = ""
-                    salary_elem = item.select_one(".sal")
-                    if salary_elem:
-                        salary = salary_elem.get_text(strip=True)
-                    
-                    # 提取工作地点
-                    location = ""
-                    location_elem = item.select_one(".d at")
-                    if location_elem:
-                        location = location_elem.get_text(strip=True)
-                    
-                    # 提取发布时间
-                    publish_time = ""
-                    time_elem = item.select_one(".time")
-                    if time_elem:
-                        publish_time = time_elem.get_text(strip=True)
-                    
-                    # 构建职位URL
-                    job_url = ""
-                    if job_link and "href" in job_link.attrs:
-                        job_url = job_link["href"]
-                    
-                    job_info = {
-                        "jobId": job_id,
-                        "title": title,
-                        "salary": salary,
-                        "company_name": company_name,
-                        "location": location,
-                        "publish_time": publish_time,
-                        "url": job_url
-                    }
-                    job_list.append(job_info)
+                job_list = parse_search_page(response.text, self.search_mode)
+                logger.info(f"搜索到 {len(job_list)} 个职位")
                 
                 return job_list
             else:
@@ -299,60 +540,19 @@ class QianChengWuYou:
             dict: 职位详情
         """
         logger.info(f"获取前程无忧职位详情: {job_id}")
+        if not self.budget.consume(DETAIL_REQUEST):
+            return {}
+        
         try:
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
+            # 同一网站的请求之间保持随机间隔，并发搜索时总频率不变
+            self.rate_limiter.wait()
             
             url = f"{self.base_url}/job_detail.php?jobid={job_id}"
             response = self.session.get(url, headers=self.headers)
             
             if response.status_code == 200:
-                html = response.text
-                soup = BeautifulSoup(html, "html.parser")
-                
-                # 提取职位描述
-                job_desc = ""
-                job_desc_div = soup.select_one(".bmsg.job_msg.inbox")
-                if job_desc_div:
-                    job_desc = job_desc_div.get_text(strip=True)
-                
-                # 提取公司介绍
-                company_desc = ""
-                company_desc_div = soup.select_one(".tmsg.inbox")
-                if company_desc_div:
-                    company_desc = company_desc_div.get_text(strip=True)
-                
-                # 提取工作地址
-                company_address = ""
-                address_div = soup.select_one(".bmsg.inbox.p_area")
-                if address_div:
-                    company_address = address_div.get_text(strip=True)
-                
-                # 提取工作经验要求
-                experience = ""
-                exp_elem = soup.select_one(".msg.ltype")
-                if exp_elem:
-                    exp_text = exp_elem.get_text(strip=True)
-                    exp_match = re.search(r'经验：(.*?)学历', exp_text)
-                    if exp_match:
-                        experience = exp_match.group(1).strip()
-                
-                # 提取学历要求
-                education = ""
-                edu_match = re.search(r'学历：(.*?)', exp_text if 'exp_text' in locals() else "")
-                if edu_match:
-                    education = edu_match.group(1).strip()
-                
-                job_detail = {
-                    "jobId": job_id,
-                    "job_description": job_desc,
-                    "company_description": company_desc,
-                    "company_address": company_address,
-                    "experience": experience,
-                    "education": education
-                }
+                fields = parse_page(extract_detail_fields, response.content, response.encoding, self.parse_workers)
+                job_detail = build_job_detail(fields, job_id)
                 
                 logger.info(f"获取前程无忧职位详情成功: {job_id}")
                 return job_detail
@@ -363,6 +563,42 @@ class QianChengWuYou:
             logger.error(f"获取职位详情失败: {e}")
             return {}
     
+    def build_filter_plan(self):
+        """按配置构建过滤规划，未配置的规则不参与过滤
+        
+        Returns:
+            FilterPlan: 过滤规划
+        """
+        rules = [
+            FilterRule("已申请", ("jobId",),
+                       lambda job: "已申请" if job.get("jobId") in self.applied_jobs else None),
+            # 薪资、经验、学历按批量评估
+            FilterRule("求职偏好", ("salary", "experience", "education"),
+                       lambda jobs: evaluate_jobs(jobs, USER_PREFERENCES)[1], batch=True),
+        ]
+        if self.title_matcher:
+            rules.append(FilterRule("标题关键词", ("title",),
+                                    lambda job: self.title_matcher.search(job["folded"]["title"])))
+        if self.company_matcher:
+            rules.append(FilterRule("公司关键词", ("company_name",),
+                                    lambda job: self.company_matcher.search(job["folded"]["company"])))
+        if self.job_exclude_types:
+            rules.append(FilterRule("公司类型", ("company_type",),
+                                    lambda job: job.get("company_type") if job.get("company_type") in self.job_exclude_types else None))
+        if self.config.get("cross_platform_dedup", True):
+            # 其他平台已登记的同公司、同城市、同名职位，在获取详情前剔除
+            rules.append(FilterRule("跨平台重复", ("title", "company_name", "location", "salary"),
+                                    lambda job: self.dedup.check_listing("qiancheng", job.get("jobId"), job["normalized"]["company"], job["normalized"]["title"], job.get("location"), job.get("salary"))))
+        if self.require_matcher:
+            rules.append(FilterRule("职位描述关键词", ("job_description",),
+                                    lambda job: self.require_matcher.search(job["folded"]["description"])))
+            if self.config.get("cross_platform_dedup", True):
+                # 已经需要获取详情时，再按描述的SimHash剔除改了职位名的近似重复
+                rules.append(FilterRule("描述重复", ("job_description",),
+                                        lambda job: self.dedup.check_description("qiancheng", job.get("jobId"), job["normalized"]["company"], job["normalized"]["description"])))
+        
+        return FilterPlan(rules, DETAIL_ONLY_FIELDS, name="前程无忧")
+    
     def filter_jobs(self, jobs):
         """过滤职位
         
@@ -373,42 +609,74 @@ class QianChengWuYou:
             list: 过滤后的职位列表
         """
         logger.info(f"过滤前程无忧职位，共 {len(jobs)} 个职位")
-        filtered_jobs = []
+        filtered_jobs = [job for job in self.filter_listing(jobs) if self.filter_detail(job)]
+        self.filter_plan.log_report()
         
-        for job in jobs:
-            # 已申请过的职位跳过
-            if job.get("jobId") in self.applied_jobs:
-                logger.debug(f"跳过已申请的职位: {job.get('title')} - {job.get('company_name')}")
-                continue
-            
-            # 标题关键词过滤
-            if any(kw.lower() in job.get("title", "").lower() for kw in self.exclude_keywords):
-                logger.debug(f"职位标题包含排除关键词，跳过: {job.get('title')}")
-                continue
+        logger.info(f"过滤后剩余 {len(filtered_jobs)} 个职位")
+        return filtered_jobs
+    
+    def filter_listing(self, jobs):
+        """对一批职位执行只依赖搜索结果字段的规则，不发起请求
+        
+        Args:
+            jobs: 职位列表
             
-            # 公司名称关键词过滤
-            if any(kw.lower() in job.get("company_name", "").lower() for kw in self.company_exclude_keywords):
-                logger.debug(f"公司名称包含排除关键词，跳过: {job.get('company_name')}")
-                continue
+        Returns:
+            list: 通过初筛的职位列表
+        """
+        resumed_jobs, new_jobs = [], []
+        for job in jobs:
+            # 规范化职位文本，后续过滤只使用规范化结果；检查点中不保存规范化结果，恢复的职位也需重新计算
+            normalize_job(job)
+            if self.checkpoint.state(job) in (DETAILED, FILTERED):
+                # 上次运行中已通过初筛
+                resumed_jobs.append(job)
+            else:
+                new_jobs.append(job)
+        
+        self.checkpoint.record(new_jobs, DISCOVERED)
+        listed_jobs = self.filter_plan.apply(LISTING, new_jobs)
+        listed_ids = {id(job) for job in listed_jobs}
+        rejected_jobs = [job for job in new_jobs if id(job) not in listed_ids]
+        self.checkpoint.record(rejected_jobs, REJECTED, "初筛未通过")
+        self.watermark.commit(rejected_jobs, id_field="jobId")
+        
+        return resumed_jobs + listed_jobs
+    
+    def filter_detail(self, job):
+        """获取职位详情并执行依赖详情字段的规则，没有此类规则时不获取详情
+        
+        Args:
+            job: 通过初筛的职位
             
-            # 获取职位详情
+        Returns:
+            bool: 是否通过过滤
+        """
+        state = self.checkpoint.state(job)
+        if state == FILTERED:
+            return True
+        
+        if not self.filter_plan.needs_detail:
+            self.checkpoint.record(job, FILTERED)
+            return True
+        
+        # 获取职位详情，上次运行已获取过的直接使用检查点中的详情
+        if state != DETAILED:
             job_detail = self.get_job_detail(job.get("jobId"))
             if not job_detail:
                 logger.debug(f"获取职位详情失败，跳过: {job.get('title')}")
-                continue
-            
-            # 合并职位信息
-            job.update(job_detail)
-            
-            # 职位描述关键词过滤
-            if any(kw.lower() in job.get("job_description", "").lower() for kw in self.require_exclude_keywords):
-                logger.debug(f"职位描述包含排除关键词，跳过: {job.get('title')}")
-                continue
+                return False
             
-            filtered_jobs.append(job)
+            # 合并职位信息，详情页没有解析到的字段保留搜索结果中的值
+            job.update({key: value for key, value in job_detail.items() if value})
+            normalize_job(job, ("description",))
+            self.checkpoint.record(job, DETAILED)
         
-        logger.info(f"过滤后剩余 {len(filtered_jobs)} 个职位")
-        return filtered_jobs
+        passed = bool(self.filter_plan.apply(DETAIL, [job]))
+        self.checkpoint.record(job, FILTERED if passed else REJECTED, None if passed else "详情过滤未通过")
+        if not passed:
+            self.watermark.commit(job, id_field="jobId")
+        return passed
     
     def apply_job(self, job):
         """申请职位
@@ -426,11 +694,12 @@ class QianChengWuYou:
         
         logger.info(f"申请前程无忧职位: {job.get('title', '未知职位')} - {job.get('company_name', '未知公司')}")
         
+        if not self.budget.consume(APPLY_REQUEST):
+            return False
+        
         try:
-            # 添加随机延迟
-            sleep_time = random.uniform(self.min_interval, self.max_interval)
-            logger.debug(f"请求前随机延迟 {sleep_time:.2f} 秒")
-            time.sleep(sleep_time)
+            # 同一网站的请求之间保持随机间隔，并发搜索时总频率不变
+            self.rate_limiter.wait()
             
             # 获取用户简历ID
             user_profile = self.get_user_profile()
@@ -461,8 +730,165 @@ class QianChengWuYou:
             logger.error(f"申请职位失败: {e}")
             return False
     
-    def run(self):
-        """执行求职流程"""
+    def search_query_pages(self, query):
+        """按一个搜索条件逐页搜索，翻到全部已见过的页面即停止
+        
+        Args:
+            query: (关键词, 城市, 最大页数)
+            
+        Yields:
+            list: 每一页上次运行之后出现的职位列表
+        """
+        keyword, city, max_pages = query
+        watermark_query = f"{keyword}|{city}|{self.experience}|{self.degree}|{self.salary}"
+        for page in range(1, max_pages + 1):
+            jobs = self.search_jobs(keyword=keyword, city=city, page=page)
+            if not jobs:
+                logger.info(f"[{keyword} {city}] 第 {page} 页没有搜索到职位，停止搜索")
+                break
+            
+            # 只处理上次运行之后出现的职位，整页都已见过时停止翻页
+            jobs = self.watermark.unseen(watermark_query, jobs, id_field="jobId")
+            if not jobs:
+                break
+            yield jobs
+    
+    def iter_search_pages(self):
+        """按关键词和城市的组合并发搜索，跨搜索条件按职位ID去重
+        
+        Yields:
+            list: 每一页中尚未出现过的职位列表
+        """
+        queries = build_queries(self.keywords, self.cities)
+        # 根据今日剩余的搜索和详情预算决定所有搜索条件合计的翻页数，再平均分给各搜索条件
+        total_pages = self.budget.plan_pages(
+            self.config.get("qiancheng_max_pages", 5) * len(queries),
+            PAGE_SIZE,
+            detail_ratio=1.0 if self.filter_plan.needs_detail else 0,
+        )
+        max_pages = math.ceil(total_pages / len(queries)) if queries else 0
+        max_jobs = self.config.get("qiancheng_max_jobs", 100)
+        total_jobs = 0
+        logger.info(f"共 {len(queries)} 个搜索条件，每个最多 {max_pages} 页，同时搜索 {self.search_workers} 个")
+        
+        # 先恢复上次中断的运行中未完成的职位
+        resumed_jobs = self.checkpoint.resumable()
+        job_ids = {job.get("jobId") for job in resumed_jobs}
+        if resumed_jobs:
+            logger.info(f"恢复上次未完成的 {len(resumed_jobs)} 个职位")
+            yield resumed_jobs
+        
+        pages = iter_grid([(keyword, city, max_pages) for keyword, city in queries], self.search_query_pages, self.search_workers)
+        try:
+            for _, jobs in pages:
+                # 跨搜索条件去重，并跳过检查点中已经处理过的职位
+                unique_jobs = []
+                for job in jobs:
+                    if job.get("jobId") not in job_ids and not self.checkpoint.known(job):
+                        job_ids.add(job.get("jobId"))
+                        unique_jobs.append(job)
+                
+                total_jobs += len(unique_jobs)
+                logger.info(f"已搜索到 {total_jobs} 个新职位")
+                if unique_jobs:
+                    yield unique_jobs
+                
+                # 判断是否达到最大职位数
+                if total_jobs >= max_jobs:
+                    logger.info(f"已达到最大职位数 {max_jobs}，停止搜索")
+                    break
+        finally:
+            # 流水线停止或达到最大职位数时立即通知搜索线程停止翻页
+            pages.close()
+    
+    def apply_and_record(self, job):
+        """申请职位并记录检查点，申请成功后随机延迟
+        
+        Args:
+            job: 职位信息
+            
+        Returns:
+            bool: 是否申请成功
+        """
+        # 按匹配度统一投递时，其他平台的同一职位可能刚在本轮申请过
+        duplicate = self.find_duplicate(job)
+        if duplicate:
+            logger.info(f"跳过其他平台已申请的同一职位: {job.get('title')}（{duplicate}）")
+            self.checkpoint.record(job, REJECTED, f"跨平台重复 {duplicate}")
+            self.watermark.commit(job, id_field="jobId")
+            return False
+        
+        # 申请失败的职位不写入水位线，标记为待重试，下次运行重新申请
+        if not self.apply_job(job):
+            self.checkpoint.record(job, REJECTED, "申请失败")
+            self.watermark.retry(job, id_field="jobId")
+            return False
+        
+        self.checkpoint.record(job, APPLIED)
+        self.register_accepted(job)
+        self.watermark.commit(job, id_field="jobId")
+        
+        # 申请间随机延迟
+        sleep_time = random.uniform(self.min_interval * 3, self.max_interval * 3)
+        logger.debug(f"申请间随机延迟 {sleep_time:.2f} 秒")
+        time.sleep(sleep_time)
+        return True
+    
+    def match_score(self, job):
+        """按职位名称和描述与求职意向文本的TF-IDF相似度计算匹配度
+        
+        Args:
+            job: 职位信息
+            
+        Returns:
+            float: 0-100的匹配度
+        """
+        text = f'{job_text(job, "title", folded=True)} {job_text(job, "description", folded=True)}'
+        similarity = get_ranker().similarities([text], self.profile_text, folded=True)[0]
+        return round(float(similarity) * 100, 1)
+    
+    def register_accepted(self, job):
+        """登记已申请的职位，其他平台的同一职位不再处理
+        
+        Args:
+            job: 职位信息
+        """
+        if self.config.get("cross_platform_dedup", True):
+            self.dedup.register("qiancheng", job.get("jobId"), job_text(job, "company"), job_text(job, "title"),
+                                job.get("location"), job.get("salary"), job.get("normalized", {}).get("description"))
+    
+    def find_duplicate(self, job):
+        """查找其他平台已申请的同一职位
+        
+        Args:
+            job: 职位信息
+            
+        Returns:
+            str: 重复职位的描述，没有重复时返回None
+        """
+        if not self.config.get("cross_platform_dedup", True):
+            return None
+        return self.dedup.check_listing("qiancheng", job.get("jobId"), job_text(job, "company"), job_text(job, "title"),
+                                        job.get("location"), job.get("salary"))
+    
+    def finish_run(self):
+        """结束本次运行，输出过滤统计并保存水位线、重复职位索引和TF-IDF词表，清空检查点"""
+        self.filter_plan.log_report()
+        self.watermark.save()
+        self.dedup.save()
+        get_ranker().save()
+        self.checkpoint.clear()
+        self.budget.log_summary()
+    
+    def run(self, apply_queue=None):
+        """执行求职流程
+        
+        Args:
+            apply_queue: 跨平台投递优先队列，提供时只收集通过过滤的职位，由队列统一按匹配度投递
+            
+        Returns:
+            bool: 是否申请（或收集）到职位
+        """
         logger.info("执行前程无忧求职流程")
         
         # 检查登录状态
@@ -475,47 +901,57 @@ class QianChengWuYou:
         if not user_profile:
             logger.warning("获取用户简历失败，继续执行求职流程")
         
-        # 搜索职位
-        all_jobs = []
-        for page in range(1, self.config.get("qiancheng_max_pages", 5) + 1):
-            jobs = self.search_jobs(page=page)
-            if not jobs:
-                logger.info(f"第 {page} 页没有搜索到职位，停止搜索")
-                break
-            
-            all_jobs.extend(jobs)
-            logger.info(f"已搜索到 {len(all_jobs)} 个职位")
-            
-            # 判断是否达到最大职位数
-            if len(all_jobs) >= self.config.get("qiancheng_max_jobs", 100):
-                logger.info(f"已达到最大职位数 {self.config.get('qiancheng_max_jobs', 100)}，停止搜索")
-                break
-            
-            # 添加页面间随机延迟
-            if page < self.config.get("qiancheng_max_pages", 5):
-                sleep_time = random.uniform(self.min_interval * 2, self.max_interval * 2)
-                logger.debug(f"页面间随机延迟 {sleep_time:.2f} 秒")
-                time.sleep(sleep_time)
-        
-        # 过滤职位
-        filtered_jobs = self.filter_jobs(all_jobs)
-        
-        # 申请职位
+        max_apply = self.budget.plan_applies(self.config.get("qiancheng_max_apply", 10))
+        if max_apply <= 0:
+            logger.warning("今日投递预算已用完，退出求职流程")
+            return False
         applied_count = 0
-        for job in filtered_jobs:
-            if applied_count >= self.config.get("qiancheng_max_apply", 10):
-                logger.info(f"已达到最大申请数 {self.config.get('qiancheng_max_apply', 10)}，停止申请")
-                break
+        
+        def apply(job):
+            """投递通过过滤的职位，达到最大申请数时返回False停止流水线"""
+            nonlocal applied_count
+            if applied_count >= max_apply:
+                logger.info(f"已达到最大申请数 {max_apply}，停止申请")
+                return False
             
-            if self.apply_job(job):
+            if self.apply_and_record(job):
                 applied_count += 1
-                
-                # 申请间随机延迟
-                if applied_count < len(filtered_jobs) and applied_count < self.config.get("qiancheng_max_apply", 10):
-                    sleep_time = random.uniform(self.min_interval * 3, self.max_interval * 3)
-                    logger.debug(f"申请间随机延迟 {sleep_time:.2f} 秒")
-                    time.sleep(sleep_time)
+                if applied_count >= max_apply:
+                    logger.info(f"已达到最大申请数 {max_apply}，停止申请")
+                    return False
+            return True
+        
+        def collect(job):
+            """收集通过过滤的职位，交给投递队列统一投递"""
+            nonlocal applied_count
+            job["match_score"] = self.match_score(job)
+            # 申请后才登记重复职位索引和写入水位线，未申请的职位下次运行仍会处理
+            apply_queue.push("qiancheng", job, job["match_score"])
+            applied_count += 1
+            return True
+        
+        if apply_queue is not None:
+            apply_queue.register("qiancheng", self.apply_and_record, max_apply, on_done=self.finish_run,
+                                 on_skip=lambda job: self.watermark.retry(job, id_field="jobId"))
+        
+        # 搜索、初筛、详情过滤和申请以流水线方式同时推进，职位通过过滤后立即申请
+        run_pipeline(
+            self.iter_search_pages(),
+            [
+                ("初筛", self.filter_listing),
+                ("详情", lambda job: [job] if self.filter_detail(job) else []),
+            ],
+            apply if apply_queue is None else collect,
+            buffer_size=self.config.get("pipeline_buffer", 20),
+            name="前程无忧",
+        )
+        
+        if apply_queue is not None:
+            # 检查点保留到队列投递完成后再清空
+            logger.info(f"前程无忧职位收集完成，共 {applied_count} 个职位进入投递队列")
+            return applied_count > 0
         
+        self.finish_run()
         logger.info(f"前程无忧求职流程执行完成，共申请 {applied_count} 个职位")
         return applied_count > 0
 